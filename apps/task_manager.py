@@ -0,0 +1,216 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+from consts import STATUS
+from utils import colors
+from utils.desktop import Window
+
+# 工作管理員：顯示 core.kernel.ProcessSimulation 的行程表（10 萬筆以上）。
+# 只畫看得到的那幾列（virtualized scrolling）；排序 / 篩選在另一個執行緒對持有中的快照做，
+# 做完才換上新的排列順序，所以 frame loop 和模擬都不會被 argsort 卡住。
+
+ROW_HEIGHT = 20
+HEADER_HEIGHT = 24
+FOOTER_HEIGHT = 24
+SCROLLBAR_WIDTH = 12
+COLUMNS = [("PID", "pid", 100), ("State", "state", 110), ("CPU %", "cpu", 80), ("Memory (MB)", "memory", 110)]
+
+
+def order_rows(snapshot, key, descending, text):
+    """Row indices of snapshot filtered by text and sorted by column key (runs off the UI thread)."""
+    columns = snapshot["columns"]
+    rows = np.arange(len(columns["pid"]))
+    text = text.strip().lower()
+    if text:
+        states = [code for code, name in enumerate(STATUS) if name.startswith(text)]
+        if states:
+            rows = rows[np.isin(columns["state"], states)]
+        elif text.isdigit():
+            # pid 以 text 開頭 <=> 落在 [text * 10^k, (text + 1) * 10^k) 其中一段
+            pid = columns["pid"]
+            prefix = int(text)
+            match = pid == prefix
+            low, high = prefix * 10, (prefix + 1) * 10
+            while low <= pid.max(initial=0):
+                match |= (pid >= low) & (pid < high)
+                low, high = low * 10, high * 10
+            rows = rows[match]
+        else:
+            rows = rows[:0]
+    order = np.argsort(columns[key][rows], kind="stable")
+    if descending:
+        order = order[::-1]
+    return rows[order]
+
+
+class TaskManager(Window):
+    def __init__(self, x=120, y=80, width=440, height=640):
+        super().__init__("Task Manager", x, y, width, height)
+        self.process_manager = None
+        self.sort_key = "cpu"
+        self.descending = True
+        self.filter_text = ""
+        self.top = 0  # 第一個看得到的列（排序後的位置）
+        self.selected_pid = None
+        self.snapshot = None  # 目前畫面用的快照（持有中）
+        self.order = np.zeros(0, dtype=np.int64)
+        self.view_version = -1
+        self.pending = None  # (future, snapshot, version)
+        self.resort_interval = 0.5  # 秒；新快照最多這麼常重新排序一次
+        self.last_request = 0.0
+        self.params_changed = True
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-manager")
+
+    def set_process_manager(self, process_manager):
+        """Links the SimulationThread whose ProcessSimulation snapshots are shown."""
+        self.process_manager = process_manager
+
+    @property
+    def visible_rows(self):
+        return max(0, (self.content_rect.height - HEADER_HEIGHT - FOOTER_HEIGHT) // ROW_HEIGHT)
+
+    def _scroll(self, top):
+        top = min(max(0, top), max(0, len(self.order) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self.dirty = True
+
+    def update(self, snapshot, version):
+        if self.process_manager is None:
+            return
+        buffer = self.process_manager.buffer
+        if self.pending is not None:
+            future, held, held_version = self.pending
+            if not future.done():
+                return
+            self.pending = None
+            if self.snapshot is not None:
+                buffer.release(self.snapshot)
+            self.snapshot, self.order, self.view_version = held, future.result(), held_version
+            self._scroll(self.top)
+            self.dirty = True
+        now = time.perf_counter()
+        if self.params_changed or (version != self.view_version and now - self.last_request >= self.resort_interval):
+            held, held_version = buffer.acquire()
+            if held is None or "columns" not in held:
+                buffer.release(held)
+                return
+            self.params_changed = False
+            self.last_request = now
+            future = self.executor.submit(order_rows, held, self.sort_key, self.descending, self.filter_text)
+            self.pending = (future, held, held_version)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.process_manager is not None:
+            for snapshot in (self.snapshot, self.pending[1] if self.pending else None):
+                if snapshot is not None:
+                    self.process_manager.buffer.release(snapshot)
+        self.snapshot = self.pending = None
+
+    def draw_content(self, surface, rect):
+        font = self.font
+        header = pygame.Rect(rect.x, rect.y, rect.width, HEADER_HEIGHT)
+        pygame.draw.rect(surface, colors.HEADER, header)
+        x = rect.x + 6
+        for title, key, width in COLUMNS:
+            if key == self.sort_key:
+                title += " v" if self.descending else " ^"
+            surface.blit(font.render(title, True, colors.TEXT), (x, header.y + 5))
+            x += width
+
+        body_y = header.bottom
+        snapshot = self.snapshot
+        if snapshot is not None:
+            columns = snapshot["columns"]
+            rows = self.order[self.top:self.top + self.visible_rows]
+            # 只取看得到的列：一次 fancy indexing，再轉成 Python 值
+            pid, state = columns["pid"][rows].tolist(), columns["state"][rows].tolist()
+            cpu, memory = columns["cpu"][rows].tolist(), columns["memory"][rows].tolist()
+            for i in range(len(rows)):
+                y = body_y + i * ROW_HEIGHT
+                row_rect = pygame.Rect(rect.x, y, rect.width - SCROLLBAR_WIDTH, ROW_HEIGHT)
+                if pid[i] == self.selected_pid:
+                    pygame.draw.rect(surface, colors.SELECTED, row_rect)
+                elif (self.top + i) % 2:
+                    pygame.draw.rect(surface, colors.ROW_ALT, row_rect)
+                x = rect.x + 6
+                for text, (_, _, width) in zip((str(pid[i]), STATUS[state[i]], f"{cpu[i]:5.1f}", f"{memory[i]:7.2f}"), COLUMNS):
+                    surface.blit(font.render(text, True, colors.TEXT), (x, y + 3))
+                    x += width
+
+        # 捲軸
+        track = pygame.Rect(rect.right - SCROLLBAR_WIDTH, body_y, SCROLLBAR_WIDTH, self.visible_rows * ROW_HEIGHT)
+        pygame.draw.rect(surface, colors.HEADER, track)
+        total = len(self.order)
+        if total > self.visible_rows:
+            height = max(16, track.height * self.visible_rows // total)
+            y = track.y + (track.height - height) * self.top // max(1, total - self.visible_rows)
+            pygame.draw.rect(surface, colors.WINDOW_BORDER, (track.x + 2, y, SCROLLBAR_WIDTH - 4, height))
+
+        footer = pygame.Rect(rect.x, rect.bottom - FOOTER_HEIGHT, rect.width, FOOTER_HEIGHT)
+        pygame.draw.rect(surface, colors.HEADER, footer)
+        counts = ""
+        if snapshot is not None:
+            counts = "  ".join(f"{name} {count}" for name, count in zip(STATUS, snapshot["states"]) if count)
+        text = f"{total} shown  {counts}  filter: {self.filter_text or '-'}"
+        surface.blit(font.render(text, True, colors.TEXT), (footer.x + 6, footer.y + 5))
+
+    def handle_content_event(self, event):
+        rect = self.content_rect
+        if event.type == pygame.MOUSEWHEEL:
+            if self.rect.collidepoint(pygame.mouse.get_pos()):
+                self._scroll(self.top - event.y * 3)
+                return True
+            return None
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and rect.collidepoint(event.pos):
+            x, y = event.pos
+            if y < rect.y + HEADER_HEIGHT:
+                left = rect.x
+                for _, key, width in COLUMNS:
+                    if left <= x < left + width:
+                        self.descending = not self.descending if key == self.sort_key else key != "pid"
+                        self.sort_key = key
+                        self.params_changed = True
+                        self.dirty = True
+                        break
+                    left += width
+            elif x >= rect.right - SCROLLBAR_WIDTH:
+                fraction = (y - rect.y - HEADER_HEIGHT) / max(1, self.visible_rows * ROW_HEIGHT)
+                self._scroll(int(fraction * len(self.order)) - self.visible_rows // 2)
+            else:
+                index = self.top + (y - rect.y - HEADER_HEIGHT) // ROW_HEIGHT
+                if 0 <= index < len(self.order) and index < self.top + self.visible_rows and self.snapshot is not None:
+                    self.selected_pid = int(self.snapshot["columns"]["pid"][self.order[index]])
+                    self.dirty = True
+            return True
+        if event.type == pygame.KEYDOWN:
+            page = max(1, self.visible_rows - 1)
+            moves = {pygame.K_UP: -1, pygame.K_DOWN: 1, pygame.K_PAGEUP: -page, pygame.K_PAGEDOWN: page}
+            if event.key in moves:
+                self._scroll(self.top + moves[event.key])
+            elif event.key == pygame.K_HOME:
+                self._scroll(0)
+            elif event.key == pygame.K_END:
+                self._scroll(len(self.order))
+            elif event.key == pygame.K_DELETE:
+                if self.selected_pid is not None and self.process_manager is not None:
+                    self.process_manager.submit(lambda simulation, pid: simulation.kill(pid), self.selected_pid)
+                    self.params_changed = True
+            elif event.key == pygame.K_BACKSPACE:
+                self.filter_text = self.filter_text[:-1]
+                self.params_changed = True
+            elif event.key == pygame.K_ESCAPE:
+                self.filter_text = ""
+                self.params_changed = True
+            elif event.unicode and event.unicode.isprintable():
+                self.filter_text += event.unicode
+                self.params_changed = True
+            else:
+                return None
+            self.dirty = True
+            return True
+        return None
@@ -0,0 +1,51 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.allocator import ALLOCATORS, make_allocator
+
+# 各種配置器在大量存活區塊下的速度、碎片率與延遲分布
+# Usage: python benchmarks/allocators.py --live 1000000 --churn 200000
+
+
+def run(name, capacity, live, churn, max_size, seed):
+    allocator = make_allocator(name, capacity)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    addresses = [allocator.alloc(rng.randint(1, max_size)) for _ in range(live)]
+    filled = time.perf_counter()
+    # 隨機釋放一半再配置 churn 次，製造碎片
+    rng.shuffle(addresses)
+    for address in addresses[: live // 2]:
+        if address is not None:
+            allocator.free(address)
+    for _ in range(churn):
+        allocator.alloc(rng.randint(1, max_size))
+    done = time.perf_counter()
+    stats = allocator.stats()
+    print(f"{name:10s} fill {(filled - start) / live * 1e6:6.2f}us/op  churn {(done - filled) / (live // 2 + churn) * 1e6:6.2f}us/op  "
+          f"live={stats['live_blocks']:<8d} ext={stats['external_fragmentation']:.3f} int={stats['internal_fragmentation']:.3f} "
+          f"failures={stats['failures']}")
+    print(f"{'':10s} alloc latency {allocator.alloc_latency.buckets()}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the RAM allocators.")
+    parser.add_argument("--allocators", nargs="+", default=list(ALLOCATORS), choices=list(ALLOCATORS))
+    parser.add_argument("--capacity", type=int, default=1 << 23, help="address space in units")
+    parser.add_argument("--live", type=int, default=200_000)
+    parser.add_argument("--churn", type=int, default=50_000)
+    parser.add_argument("--max-size", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for name in args.allocators:
+        run(name, args.capacity, args.live, args.churn, args.max_size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
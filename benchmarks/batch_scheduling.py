@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "exam", "midterm"))
+
+import matplotlib
+matplotlib.use("Agg")  # 只量測計算，不開視窗
+
+import numpy as np
+import schedulingMethod
+from core import batch
+
+# 比較 core.batch 與逐一跑 schedulingMethod.Scheduler 的速度
+# Usage: python benchmarks/batch_scheduling.py [workloads] [processes]
+
+
+def loop_scheduler(workloads, policy):
+    averages = []
+    for workload in workloads:
+        processes = [schedulingMethod.Process(i, int(a), int(b)) for i, (a, b) in enumerate(workload)]
+        scheduler = schedulingMethod.Scheduler(processes)
+        if policy == "FCFS":
+            result = scheduler.run_fcfs(show=False)
+        else:
+            result = scheduler.run_sjf(show=False)
+        averages.append(result.avg_waiting_time)
+    return np.array(averages)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    workloads = batch.random_workloads(count, size, seed=42)
+    print(f"{count} workloads x {size} processes")
+
+    for policy in batch.POLICIES:
+        start = time.perf_counter()
+        stats = batch.evaluate(policy, workloads)
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = loop_scheduler(workloads, policy)
+        loop_time = time.perf_counter() - start
+
+        if not np.allclose(stats["avg_waiting_time"], expected):
+            raise AssertionError(f"{policy}: batch result differs from Scheduler")
+        print(f"{policy:5s} batch {batch_time:8.3f}s  Scheduler loop {loop_time:8.3f}s  speedup {loop_time / batch_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
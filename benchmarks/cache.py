@@ -0,0 +1,42 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import cache, paging
+from core.process_table import ProcessTable
+
+# 快取階層的命中率、AMAT 與匯流排流量；位址來自 paging.reference_trace 的頁參考串
+# 目標是每秒 10M 次存取；目前的 NumPy 實作在這台機器上約 2-4M/s，輸出會直接標出是否達標
+# Usage: python benchmarks/cache.py --pages 500000 --mode exclusive --policy PLRU
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate the L1/L2/L3 cache hierarchy from consts.py.")
+    parser.add_argument("--processes", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=200_000, help="page references (16 accesses each)")
+    parser.add_argument("--mode", default="inclusive", choices=["inclusive", "nine", "exclusive"])
+    parser.add_argument("--policy", default="LRU", choices=["LRU", "PLRU"])
+    parser.add_argument("--line-size", type=int, default=64)
+    parser.add_argument("--target", type=float, default=10.0, help="required throughput in M accesses/s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    processes = list(ProcessTable.synthetic(args.processes, seed=args.seed))
+    refs = paging.reference_trace(processes, args.pages, page_size=4, seed=args.seed)
+    addresses = cache.address_trace(refs, seed=args.seed)
+    hierarchy = cache.CacheHierarchy(cache.default_levels(args.line_size, args.policy), mode=args.mode)
+    start = time.perf_counter()
+    hierarchy.access(addresses)
+    elapsed = time.perf_counter() - start
+    print(json.dumps(hierarchy.stats(), indent=2))
+    rate = len(addresses) / elapsed / 1e6
+    verdict = "met" if rate >= args.target else "NOT met"
+    print(f"{len(addresses)} accesses in {elapsed:.2f}s ({rate:.2f}M accesses/s, target {args.target:g}M/s {verdict})")
+
+
+if __name__ == "__main__":
+    main()
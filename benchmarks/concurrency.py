@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import concurrency
+
+# 同步問題在虛擬時間下的吞吐量、等待時間分佈、飢餓與死結：每個哲學家策略各跑一次，
+# 再跑睡覺的助教與生產者-消費者（含課本上 mutex 先拿的死結版本）。
+# Usage: python benchmarks/concurrency.py --actors 5000 --duration 300 --out sync.json
+
+
+def show(name, summary):
+    wait = summary["wait"]
+    deadlock = "-" if summary["deadlock"] is None else f"at {summary['deadlock']['time']:.2f}s"
+    print(f"{name:32s} {summary['wall_time']:6.2f}s {summary['completed']:9d} {summary['throughput']:9.2f}/s "
+          f"{wait['mean']:7.2f}s {wait['p99']:7.2f}s {wait['max']:8.2f}s {summary['fairness']:6.3f} "
+          f"{summary['starved']:7d}  {deadlock}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dining philosophers, sleeping TA and producer-consumer on asyncio.")
+    parser.add_argument("--actors", type=int, default=5000, help="philosophers / students / producers+consumers")
+    parser.add_argument("--duration", type=float, default=300.0, help="virtual seconds")
+    parser.add_argument("--chairs", type=int, default=50)
+    parser.add_argument("--tas", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the summaries as JSON")
+    args = parser.parse_args(argv)
+
+    report = []
+    print(f"{'run':32s} {'wall':>7s} {'completed':>9s} {'throughput':>11s} {'wait':>8s} {'p99':>8s} "
+          f"{'longest':>9s} {'fair':>6s} {'starved':>7s}  deadlock")
+    for strategy in concurrency.STRATEGIES:
+        summary = concurrency.dining_philosophers(args.actors, args.duration, strategy=strategy, seed=args.seed)
+        show(f"dining/{strategy}", summary)
+        report.append(summary)
+    # 五個哲學家、想很短、拿叉子很慢：naive 幾乎一定全部拿著左叉卡住
+    summary = concurrency.dining_philosophers(5, args.duration, strategy="naive", think=(0.0, 0.5), reach=0.5,
+                                              seed=args.seed)
+    show("dining/naive (n=5)", summary)
+    report.append(summary)
+    summary = concurrency.sleeping_ta(args.actors, args.chairs, args.tas, args.duration, seed=args.seed)
+    show("sleeping_ta", summary)
+    report.append(summary)
+    half = max(1, args.actors // 2)
+    for lock_first in (False, True):
+        summary = concurrency.producer_consumer(half, half, args.capacity, args.duration, lock_first=lock_first,
+                                                seed=args.seed)
+        show("producer_consumer" + (" (mutex first)" if lock_first else ""), summary)
+        report.append(summary)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
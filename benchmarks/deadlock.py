@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.deadlock import ResourceManager
+
+# 銀行家演算法在大量行程下每個請求的延遲：隨機請求 / 釋放，資源越緊（--scarcity 越大）
+# 越常走到完整的安全檢查。最後用 detect 模式跑同一批請求，看化簡演算法和復原的成本。
+# Usage: python benchmarks/deadlock.py --processes 10000 --resources 100 --requests 3000
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if len(values) else 0.0
+
+
+def drive(manager, rng, processes, requests, fraction):
+    latency = []
+    for step in range(requests):
+        pid = int(rng.integers(0, processes))
+        if pid in manager.waiting:
+            continue
+        row = manager.rows[pid]
+        if manager.mode == "avoid":
+            limit = manager.need[row]
+        else:
+            limit = manager.maximum[row] - manager.allocation[row]
+        amounts = (limit * rng.random(len(limit)) * fraction).astype(np.int64)
+        start = time.perf_counter()
+        manager.request(pid, amounts)
+        latency.append(time.perf_counter() - start)
+        if step % 3 == 0:
+            other = int(rng.integers(0, processes))
+            if other not in manager.waiting:
+                start = time.perf_counter()
+                manager.release(other)
+                latency.append(time.perf_counter() - start)
+    return latency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banker's algorithm and deadlock detection at scale.")
+    parser.add_argument("--processes", type=int, default=10_000)
+    parser.add_argument("--resources", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--max-claim", type=int, default=1000)
+    parser.add_argument("--scarcity", type=float, default=80.0,
+                        help="sum of maximum claims / total instances per resource")
+    parser.add_argument("--fraction", type=float, default=0.3, help="request size as a fraction of the remaining claim")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    total = np.full(args.resources, int(args.processes * args.max_claim / 2 / args.scarcity))
+    for mode in ("avoid", "detect"):
+        rng = np.random.default_rng(args.seed)
+        manager = ResourceManager(total, mode=mode, capacity=args.processes)
+        claims = rng.integers(0, np.minimum(args.max_claim, total), (args.processes, args.resources))
+        for pid in range(args.processes):
+            manager.add(pid, claims[pid])
+        start = time.perf_counter()
+        latency = drive(manager, rng, args.processes, args.requests, args.fraction)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:6s} {args.processes}x{args.resources}  {elapsed:6.2f}s   per call mean "
+              f"{1000 * np.mean(latency):7.2f}ms  p50 {percentile(latency, 50):7.2f}ms  "
+              f"p99 {percentile(latency, 99):7.2f}ms   waiting {len(manager.waiting)}")
+        print(f"       {manager.stats}")
+        if mode == "detect":
+            start = time.perf_counter()
+            deadlocked = manager.detect()
+            detect_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            aborted = manager.recover()
+            recover_ms = (time.perf_counter() - start) * 1000
+            print(f"       detect {detect_ms:.1f}ms -> {len(deadlocked)} deadlocked; "
+                  f"recover {recover_ms:.1f}ms -> aborted {len(aborted)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import random
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import engine
+
+# 迴歸檢查：core.engine 的排程結果必須和原本 schedulingMethod.Scheduler 的
+# list 版迴圈（逐 tick 的 SRTF、pop(0) 的 SJF...）完全一致
+# Usage: python benchmarks/engine_regression.py [workloads]
+
+
+def reference_fcfs(jobs):
+    time, schedule = 0, []
+    for pid, arrival, burst in sorted(jobs, key=lambda j: j[1]):
+        time = max(time, arrival)
+        schedule.append((pid, time, time + burst))
+        time += burst
+    return schedule
+
+
+def reference_rr(jobs, quantum):
+    processes = [[pid, arrival, burst] for pid, arrival, burst in sorted(jobs, key=lambda j: j[1])]
+    queue, schedule = deque(), []
+    index, time, completed, n = 0, 0, 0, len(processes)
+    while completed < n:
+        while index < n and processes[index][1] <= time:
+            queue.append(processes[index])
+            index += 1
+        if queue:
+            process = queue.popleft()
+            run = min(quantum, process[2])
+            schedule.append((process[0], time, time + run))
+            time += run
+            process[2] -= run
+            while index < n and processes[index][1] <= time:
+                queue.append(processes[index])
+                index += 1
+            if process[2] > 0:
+                queue.append(process)
+            else:
+                completed += 1
+        else:
+            time = processes[index][1]
+    return schedule
+
+
+def reference_sjf(jobs):
+    remaining = sorted(jobs, key=lambda j: (j[1], j[2]))
+    ready, schedule, time = [], [], 0
+    while remaining or ready:
+        while remaining and remaining[0][1] <= time:
+            ready.append(remaining.pop(0))
+        ready.sort(key=lambda j: j[2])
+        if ready:
+            pid, _, burst = ready.pop(0)
+            schedule.append((pid, time, time + burst))
+            time += burst
+        else:
+            time = remaining[0][1]
+    return schedule
+
+
+def reference_srt(jobs):
+    remaining = [[pid, arrival, burst] for pid, arrival, burst in sorted(jobs, key=lambda j: j[1])]
+    ready, schedule, time, completed, n = [], [], 0, 0, len(jobs)
+    while completed < n:
+        while remaining and remaining[0][1] <= time:
+            ready.append(remaining.pop(0))
+        if ready:
+            ready.sort(key=lambda p: p[2])
+            ready[0][2] -= 1
+            schedule.append((ready[0][0], time, time + 1))
+            time += 1
+            if ready[0][2] == 0:
+                ready.pop(0)
+                completed += 1
+        else:
+            time += 1
+    return schedule
+
+
+def merge(schedule):
+    merged = []
+    for pid, start, end in schedule:
+        if merged and merged[-1][0] == pid and merged[-1][2] == start:
+            merged[-1] = (pid, merged[-1][1], end)
+        else:
+            merged.append((pid, start, end))
+    return merged
+
+
+CASES = [
+    ("FCFS", reference_fcfs, engine.fcfs),
+    ("RR q=1", lambda jobs: reference_rr(jobs, 1), lambda jobs: engine.round_robin(jobs, 1)),
+    ("RR q=3", lambda jobs: reference_rr(jobs, 3), lambda jobs: engine.round_robin(jobs, 3)),
+    ("SJF", reference_sjf, engine.sjf),
+    ("SRTF", reference_srt, engine.srtf),
+]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    rng = random.Random(1)
+    for _ in range(count):
+        n = rng.randint(1, 12)
+        jobs = [(f"P{i}", rng.randint(0, 30), rng.randint(1, 15)) for i in range(n)]
+        for name, reference, run in CASES:
+            expected = merge(reference(jobs))
+            actual = run(jobs).segments
+            if expected != actual:
+                raise AssertionError(f"{name} differs for {jobs}:\n  expected {expected}\n  actual   {actual}")
+    print(f"engine matches the list-based schedulers on {count} workloads x {len(CASES)} policies")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.filesystem import CACHES, FileSystem
+from core.hardware import Disk, VirtualClock
+from core.process_table import ProcessTable
+
+# 每個行程開啟自己的 open_files，隨機讀寫；比較沒有快取（直接讀 Disk）與 LRU / ARC page cache 的 I/O 時間
+# Usage: python benchmarks/filesystem.py --processes 200 --ops 20000 --cache-pages 2048
+
+
+def workload(fs, processes, ops, file_size, seed):
+    rng = random.Random(seed)
+    fds = [fd for process in processes for fd in fs.attach(process, file_size)]
+    hot = fds[: max(1, len(fds) // 10)]  # 一成的檔案拿到八成的存取
+    pages = file_size // fs.block_size
+    for _ in range(ops):
+        fd = rng.choice(hot) if rng.random() < 0.8 else rng.choice(fds)
+        offset = rng.randrange(pages) * fs.block_size
+        if rng.random() < 0.2:
+            fs.write(fd, rng.choice((512, 4096)), offset)
+        elif rng.random() < 0.3:
+            for block in range(0, 16 * fs.block_size, 16384):  # 一小段循序讀，觸發預讀
+                fs.read(fd, 16384, block % file_size).wait()
+        else:
+            fs.read(fd, 4096, offset).wait()
+    fs.flush().wait()
+    fs.clock.run()
+
+
+def uncached(processes, ops, file_size, seed):
+    """Same read pattern straight on Disk.read: every read pays latency + transfer."""
+    clock = VirtualClock()
+    disk = Disk(clock)
+    names = [name for process in processes for name in process.open_files]
+    for name in names:
+        disk.files[name] = file_size / (1024 * 1024)
+    rng = random.Random(seed)
+    hot = names[: max(1, len(names) // 10)]
+    for _ in range(ops):
+        name = rng.choice(hot) if rng.random() < 0.8 else rng.choice(names)
+        if rng.random() < 0.2:
+            disk.io("write", 4096 / (1024 * 1024), name=name).wait()
+        else:
+            disk.read(name, 4096 / (1024 * 1024)).wait()
+    return clock.now
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Page cache / read-ahead / write-back on the simulated disk.")
+    parser.add_argument("--processes", type=int, default=100)
+    parser.add_argument("--ops", type=int, default=10_000)
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="bytes per open file")
+    parser.add_argument("--cache-pages", type=int, default=1024)
+    parser.add_argument("--policies", nargs="+", default=list(CACHES), choices=list(CACHES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    processes = list(ProcessTable.synthetic(args.processes, seed=args.seed))
+    print(f"no cache: {uncached(processes, args.ops, args.file_size, args.seed):.3f}s simulated")
+    for policy in args.policies:
+        clock = VirtualClock()
+        fs = FileSystem(Disk(clock), cache_pages=args.cache_pages, cache_policy=policy)
+        start = time.perf_counter()
+        workload(fs, processes, args.ops, args.file_size, args.seed)
+        elapsed = time.perf_counter() - start
+        stats = fs.stats()
+        print(f"{policy}: {clock.now:.3f}s simulated, {elapsed:.2f}s wall")
+        print(json.dumps({key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
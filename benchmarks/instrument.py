@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import bursts, engine, instrument, workloads
+
+# 量測層的成本與輸出：同一批排程 / CPU-I/O 模擬分別在「沒有 Recorder」「有 Recorder 但子系統全關」
+# 「開啟對應子系統」下各跑一次，看關閉時是否真的不花成本、開啟時慢多少；有 --trace 時最後一次的
+# 時間軸寫成 Chrome trace（chrome://tracing 或 ui.perfetto.dev 開啟），--profile 再用 cProfile 或取樣跑一次。
+# Usage: python benchmarks/instrument.py --jobs 200000 --trace sim_trace.json --profile sample
+
+
+def timed(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Overhead and output of the simulation instrumentation layer.")
+    parser.add_argument("--jobs", type=int, default=200_000, help="jobs for the core.engine runs")
+    parser.add_argument("--processes", type=int, default=20_000, help="processes for the core.bursts run")
+    parser.add_argument("--policy", default="RR")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N wall times")
+    parser.add_argument("--trace", help="write a Chrome trace of the instrumented runs to this path")
+    parser.add_argument("--summary-every", type=float, default=0.0, help="print a summary every N wall seconds")
+    parser.add_argument("--profile", choices=("cprofile", "sample"), help="also profile one engine run")
+    parser.add_argument("--profile-out", help=".prof (cprofile) or collapsed stacks (sample)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the timings and the instrumented summary as JSON")
+    args = parser.parse_args(argv)
+
+    jobs = workloads.generate("poisson", args.jobs, seed=args.seed)
+    mixed = bursts.mixed(args.processes, seed=args.seed)
+    runs = {
+        "engine": lambda: engine.simulate(args.policy, jobs),
+        "bursts": lambda: bursts.simulate(args.policy, mixed),
+    }
+    subsystems = {"engine": ("engine",), "bursts": ("bursts", "clock")}
+    report = {}
+    print(f"{'run':8s} {'plain':>9s} {'disabled':>9s} {'enabled':>9s} {'overhead':>9s}")
+    for name, run in runs.items():
+        plain = timed(run, args.repeat)
+
+        def disabled():
+            with instrument.Recorder(()):
+                run()
+
+        off = timed(disabled, args.repeat)
+
+        def enabled():
+            with instrument.Recorder(subsystems[name], max_events=0):
+                run()
+
+        on = timed(enabled, args.repeat)
+        report[name] = {"plain": plain, "disabled": off, "enabled": on}
+        print(f"{name:8s} {plain:8.3f}s {off:8.3f}s {on:8.3f}s {on / plain - 1:8.1%}")
+
+    # 留一份完整的時間軸與摘要
+    with instrument.Recorder(trace=args.trace, summary_every=args.summary_every or None) as recorder:
+        for run in runs.values():
+            run()
+    if not args.summary_every:
+        print(recorder.format())
+    if args.trace:
+        print(f"trace: {len(recorder.events)} events ({recorder.dropped} dropped) in {os.path.abspath(args.trace)}")
+    report["summary"] = recorder.summary()
+
+    if args.profile:
+        instrument.profile(engine.simulate, args.policy, jobs, mode=args.profile, out=args.profile_out)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import bursts
+
+# CPU / I/O 交替的工作負載（core.bursts.mixed）在每個排程策略下的 CPU 使用率、裝置使用率、
+# 回應時間；I/O 走 core.hardware 的 Disk / Network 與各自的等待佇列。
+# Usage: python benchmarks/io_bursts.py --processes 100000 --cores 4 --out io.json
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scheduling policies on a mixed CPU/I-O burst workload.")
+    parser.add_argument("--processes", type=int, default=100_000)
+    parser.add_argument("--cores", type=int, default=4)
+    parser.add_argument("--mean-gap", type=float, default=0.02, help="mean seconds between arrivals")
+    parser.add_argument("--io-bound", type=float, default=0.7, help="fraction of I/O-bound processes")
+    parser.add_argument("--policies", nargs="+", default=list(bursts.POLICIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the summaries as JSON")
+    args = parser.parse_args(argv)
+
+    jobs = bursts.mixed(args.processes, seed=args.seed, mean_interarrival=args.mean_gap, io_bound=args.io_bound)
+    report = []
+    print(f"{'policy':14s} {'wall':>7s} {'response':>10s} {'p99 resp':>10s} {'turnaround':>11s} "
+          f"{'CPU':>6s} {'disk':>6s} {'net':>6s} {'switches':>9s}")
+    for policy in args.policies:
+        start = time.perf_counter()
+        summary = bursts.simulate(policy, jobs, cores=args.cores).summary()
+        summary["wall_time"] = time.perf_counter() - start
+        devices = summary["devices"]
+        print(f"{policy:14s} {summary['wall_time']:6.1f}s {summary['avg_response_time'] * 1000:8.2f}ms "
+              f"{summary['p99_response_time'] * 1000:8.2f}ms {summary['avg_turnaround_time'] * 1000:9.1f}ms "
+              f"{summary['cpu_utilization']:6.1%} {devices['disk']['utilization']:6.1%} "
+              f"{devices['net']['utilization']:6.1%} {summary['context_switches']:9d}")
+        report.append(summary)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
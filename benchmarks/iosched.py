@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.hardware import Disk, VirtualClock
+from core.iosched import POLICIES, IOScheduler
+
+# 各種 I/O 排程在同一批隨機請求下的平均尋軌距離、延遲百分位數與吞吐量
+# Usage: python benchmarks/iosched.py --requests 1000000 --policies SSTF LOOK
+
+
+def run(policy, requests, depth, sequential, seed):
+    clock = VirtualClock()
+    scheduler = IOScheduler(Disk(clock), policy, depth=depth)
+    rng = random.Random(seed)
+    block = 0
+    start = time.perf_counter()
+    for _ in range(requests):  # 一次全部送出：佇列裡最多有 requests 個待處理請求
+        if rng.random() < sequential:
+            block += 1  # 接在上一個後面，可以合併
+        else:
+            block = rng.randrange(scheduler.total_blocks - 1)
+        scheduler.io("read" if rng.random() < 0.7 else "write", scheduler.block_mb, block)
+    queued = time.perf_counter()
+    clock.run()
+    done = time.perf_counter()
+    stats = scheduler.stats()
+    stats["submit_us"] = (queued - start) / requests * 1e6
+    stats["dispatch_us"] = (done - queued) / requests * 1e6
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare disk I/O scheduling policies.")
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=1, help="outstanding requests (NOOP always uses at least 4)")
+    parser.add_argument("--sequential", type=float, default=0.2, help="chance a request continues the previous one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write all results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for policy in args.policies:
+        depth = max(args.depth, 4) if policy == "NOOP" else args.depth
+        stats = results[policy] = run(policy, args.requests, depth, args.sequential, args.seed)
+        print(f"{policy:9s} seek={stats['avg_seek_distance']:12.1f} blocks  p50={stats['latency_p50']:9.3f}s  "
+              f"p99={stats['latency_p99']:9.3f}s  {stats['throughput_mb_s']:7.3f}MB/s  merged={stats['merged']:<7d} "
+              f"submit {stats['submit_us']:.1f}us  dispatch {stats['dispatch_us']:.1f}us per request")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from consts import CPU_CORES, CPU_THREADS
+from core import multicore, stream, workloads
+
+# 預測同一組工作在 1 到 64 顆核心上的吞吐量、使用率與負載不平衡
+# Usage:
+#   python benchmarks/multicore_scaling.py --generator heavy_tailed -n 50000 --policy RR --quantum 4
+#   python benchmarks/multicore_scaling.py --trace jobs.csv --global-queue --out scaling.json
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict throughput scaling over core counts.")
+    parser.add_argument("--trace", help="CSV/JSONL trace read with core.stream.read_trace")
+    parser.add_argument("--generator", default="heavy_tailed", choices=list(workloads.GENERATORS))
+    parser.add_argument("-n", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", default="FCFS", choices=list(multicore.QUEUES))
+    parser.add_argument("--quantum", type=float, default=3)
+    parser.add_argument("--cores", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--threads-per-core", type=int, default=CPU_THREADS // CPU_CORES)
+    parser.add_argument("--smt-factor", type=float, default=1.3)
+    parser.add_argument("--migration-cost", type=float, default=0.5)
+    parser.add_argument("--global-queue", action="store_true")
+    parser.add_argument("--no-stealing", action="store_true")
+    parser.add_argument("--out", help="write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    jobs = list(stream.read_trace(args.trace)) if args.trace else workloads.generate(args.generator, args.n, seed=args.seed)
+    rows = multicore.scaling(jobs, args.cores, args.threads_per_core, policy=args.policy, quantum=args.quantum,
+                             global_queue=args.global_queue, work_stealing=not args.no_stealing,
+                             smt_factor=args.smt_factor, migration_cost=args.migration_cost)
+    base = rows[0]["throughput"] or 1
+    print(f"{'cores':>5} {'throughput':>11} {'speedup':>8} {'avg wait':>10} {'util':>6} {'imbalance':>10} {'migr':>6}")
+    for row in rows:
+        print(f"{row['cores']:5d} {row['throughput']:11.4f} {row['throughput'] / base:8.2f} {row['avg_waiting_time']:10.2f} "
+              f"{row['mean_core_utilization']:6.1%} {row['load_imbalance']:10.3f} {row['migrations']:6d}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.hardware import VirtualClock
+from core.network import Cluster, FlowNetwork, Topology
+
+# 流量層級網路模型的規模與用途：
+#   flows      大量同時進行的傳輸（隨機的來源 / 目的節點與大小），看每次重算速率的成本、
+#              多少次走「沿用上次瓶頸連結重解」的快路徑，以及傳輸完成時間比單獨傳輸慢幾倍
+#   placement  同一批讀取分散資料的工作用不同的放置策略跑，看總完成時間與網路用量
+# Usage: python benchmarks/network.py --nodes 50 --flows 100000 --topology two_tier
+
+
+def build(args):
+    if args.topology == "star":
+        return Topology.star(args.nodes, bandwidth=args.bandwidth)
+    racks = max(1, args.nodes // args.per_rack)
+    return Topology.two_tier(racks, args.per_rack, bandwidth=args.bandwidth,
+                             uplink=args.per_rack * args.bandwidth / args.oversubscription / args.spines,
+                             spines=args.spines)
+
+
+def flows(args, rng):
+    topology = build(args)
+    clock = VirtualClock()
+    network = FlowNetwork(clock, topology, resolution=args.resolution)
+    n = len(topology.nodes)
+    src = rng.integers(0, n, args.flows)
+    dst = (src + rng.integers(1, n, args.flows)) % n
+    size = rng.uniform(1, args.max_mb, args.flows)
+    start = np.sort(rng.uniform(0, args.window, args.flows))
+    names = topology.nodes
+    ops = []
+    for s, d, mb, t in zip(src.tolist(), dst.tolist(), size.tolist(), start.tolist()):
+        clock.schedule(t, lambda s=s, d=d, mb=mb: ops.append((network.transfer(names[s], names[d], mb), s, d)))
+    peak = [0]
+
+    def sample():
+        peak[0] = max(peak[0], network.active)
+        if clock.events:
+            clock.schedule(args.window / 20, sample)
+
+    clock.schedule(0, sample)
+    wall = time.perf_counter()
+    clock.run()
+    wall = time.perf_counter() - wall
+    # 慢了幾倍：實際傳輸時間 / 路徑上最慢連結單獨傳的時間
+    alone = np.array([op.size * 8 / min(topology.bandwidth[link] for link in topology.route(names[s], names[d]))
+                      for op, s, d in ops])
+    took = np.array([op.finished - op.started for op, _, _ in ops])
+    slowdown = took / alone
+    utilization = network.utilization()
+    stats = network.stats
+    return {
+        "topology": args.topology, "nodes": n, "flows": args.flows, "peak_concurrent": peak[0],
+        "wall_time": wall, "virtual_time": clock.now,
+        "per_reallocation_ms": 1000 * wall / max(1, stats["allocations"]),
+        "fast_path": stats["solved"] / max(1, stats["allocations"]),
+        "slowdown_mean": float(slowdown.mean()), "slowdown_p99": float(np.percentile(slowdown, 99)),
+        "max_link_utilization": max(utilization.values()), **stats,
+    }
+
+
+def placement(args, rng):
+    report = []
+    n = len(build(args).nodes)
+    # 每個工作讀 3 份分散在隨機節點上的輸入，算 1-3 秒
+    jobs = [([(f"node{int(node)}", float(mb)) for node, mb in zip(rng.integers(0, n, 3), rng.uniform(50, 500, 3))],
+             int(rng.integers(1, 4)) * 1_000_000_000) for _ in range(args.tasks)]
+    for policy in Cluster.PLACEMENTS:
+        cluster = Cluster(build(args), seed=args.seed)
+        finished = []
+        for i, (inputs, cycles) in enumerate(jobs):
+            cluster.submit(cycles, inputs, policy=policy, name=f"job{i}").then(finished.append)
+        wall = time.perf_counter()
+        cluster.run()
+        wall = time.perf_counter() - wall
+        moved = sum(cluster.network.carried) / 8
+        report.append({"policy": policy, "makespan": cluster.clock.now, "wall_time": wall,
+                       "mean_task_time": float(np.mean([op.duration for op in finished])),
+                       "network_mb_link_hops": moved})
+        print(f"  {policy:13s} makespan {cluster.clock.now:8.2f}s  mean task {report[-1]['mean_task_time']:7.2f}s  "
+              f"network {moved / 1024:8.1f} GB*hops  ({wall:.2f}s wall)")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flow-level network with max-min fair sharing on a simulated cluster.")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--topology", choices=("star", "two_tier"), default="star")
+    parser.add_argument("--per-rack", type=int, default=10)
+    parser.add_argument("--spines", type=int, default=2)
+    parser.add_argument("--oversubscription", type=float, default=2.0, help="two_tier: rack bandwidth / uplink bandwidth")
+    parser.add_argument("--bandwidth", type=float, default=10_000, help="Mbps per node link")
+    parser.add_argument("--flows", type=int, default=100_000)
+    parser.add_argument("--window", type=float, default=1.0, help="flows arrive uniformly over this many seconds")
+    parser.add_argument("--max-mb", type=float, default=100.0)
+    parser.add_argument("--resolution", type=float, default=0.0, help="recompute rates at most every N seconds")
+    parser.add_argument("--tasks", type=int, default=500, help="tasks for the placement comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    summary = flows(args, rng)
+    print(f"{summary['flows']} flows on {summary['nodes']} nodes ({summary['topology']}), "
+          f"peak {summary['peak_concurrent']} concurrent: {summary['wall_time']:.1f}s wall for "
+          f"{summary['virtual_time']:.2f}s virtual")
+    print(f"  {summary['allocations']} reallocations, {summary['per_reallocation_ms']:.2f}ms each, "
+          f"{summary['fast_path']:.1%} re-solved with the previous bottlenecks")
+    print(f"  slowdown vs alone: mean {summary['slowdown_mean']:.1f}x  p99 {summary['slowdown_p99']:.1f}x  "
+          f"busiest link {summary['max_link_utilization']:.1%}")
+    print("placement:")
+    report = {"flows": summary, "placement": placement(args, rng)}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import paging
+from core.process_table import ProcessTable
+
+# 頁面置換的分頁錯誤曲線：LRU / OPT 一次走完參考串就得到所有頁框數的結果
+# Usage: python benchmarks/paging.py --refs 10000000 --max-frames 1024 --policies LRU FIFO
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Page fault curves for synthetic process traces.")
+    parser.add_argument("--processes", type=int, default=50)
+    parser.add_argument("--refs", type=int, default=1_000_000)
+    parser.add_argument("--max-frames", type=int, default=512)
+    parser.add_argument("--policies", nargs="+", default=["LRU"], choices=list(paging.POLICIES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    processes = list(ProcessTable.synthetic(args.processes, seed=args.seed))
+    refs = paging.reference_trace(processes, args.refs, seed=args.seed)
+    frames = sorted({f for f in (1, 8, 32, 128, 512, args.max_frames) if f <= args.max_frames})
+    for policy in args.policies:
+        start = time.perf_counter()
+        curve = paging.fault_curve(refs, policy, args.max_frames)
+        elapsed = time.perf_counter() - start
+        points = ", ".join(f"{f}:{curve[f]}" for f in frames)
+        print(f"{policy:5s} {elapsed:8.2f}s  faults by frames {{{points}}}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from consts import STATUS
+from core.pcb import CSVSink, JSONLSink, PCBRegistry
+
+# 記錄大量 PCB 狀態轉換的成本：record_many（整批欄位）、record（一次一筆），
+# 以及接上批次寫檔的 sink 後的成本。ring buffer 的記憶體固定在 capacity 筆。
+# Usage: python benchmarks/pcb_log.py --transitions 1000000 --processes 10000
+
+
+class Job:
+    def __init__(self, pid):
+        self.pid = pid
+        self.state = "new"
+        self.program_counter = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time PCB state-transition logging.")
+    parser.add_argument("--transitions", type=int, default=1_000_000)
+    parser.add_argument("--processes", type=int, default=10_000)
+    parser.add_argument("--capacity", type=int, default=1 << 16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    pids = rng.integers(0, args.processes, args.transitions)
+    states = rng.integers(0, len(STATUS), args.transitions)
+    times = np.arange(args.transitions, dtype=np.float64)
+
+    registry = PCBRegistry(args.capacity)
+    for pid in range(args.processes):
+        registry.pid_code(pid)
+    start = time.perf_counter()
+    registry.record_many(pids, states, times)
+    bulk = time.perf_counter() - start
+    print(f"record_many  {args.transitions:>9} transitions  {bulk * 1000:8.1f}ms   "
+          f"ring {registry.ring.nbytes / 2**20:.1f}MB")
+
+    single = min(args.transitions, 200_000)
+    jobs = [Job(pid) for pid in range(args.processes)]
+    registry = PCBRegistry(args.capacity)
+    start = time.perf_counter()
+    for i in range(single):
+        registry.record(jobs[pids[i]], STATUS[states[i]], times[i])
+    elapsed = time.perf_counter() - start
+    print(f"record       {single:>9} transitions  {elapsed * 1000:8.1f}ms   {elapsed / single * 1e6:.2f}us each")
+
+    with tempfile.TemporaryDirectory() as folder:
+        sinks = [JSONLSink(os.path.join(folder, "pcb.jsonl")), CSVSink(os.path.join(folder, "pcb.csv"))]
+        registry = PCBRegistry(args.capacity, sinks)
+        for pid in range(args.processes):
+            registry.pid_code(pid)
+        start = time.perf_counter()
+        registry.record_many(pids, states, times)
+        registry.close()
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(folder, name)) for name in ("pcb.jsonl", "pcb.csv"))
+        print(f"+ JSONL/CSV  {args.transitions:>9} transitions  {elapsed * 1000:8.1f}ms   {size / 2**20:.1f}MB written")
+
+
+if __name__ == "__main__":
+    main()
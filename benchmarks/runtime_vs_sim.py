@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from consts import CPU_THREADS
+from core.runtime import POLICIES, Runtime
+
+# 同一批行程在真正的 worker 執行緒上跑一次，再用量到的 CPU 時間丟給 core.multicore 模擬，
+# 比較平均等待 / 周轉時間；兩者的差距就是 dispatch 延遲和 context switch 的開銷。
+# Usage: python benchmarks/runtime_vs_sim.py --processes 200 --policy RR --quantum 0.01
+
+
+class Job:
+    def __init__(self, pid, burst_time):
+        self.pid = pid
+        self.burst_time = burst_time
+        self.interactive = False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare real concurrent execution with the multicore simulation.")
+    parser.add_argument("--processes", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=CPU_THREADS)
+    parser.add_argument("--policy", default="RR", choices=list(POLICIES))
+    parser.add_argument("--quantum", type=float, default=0.02, help="seconds")
+    parser.add_argument("--max-burst", type=float, default=0.1, help="seconds")
+    parser.add_argument("--mean-gap", type=float, default=0.005, help="mean seconds between arrivals")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    runtime = Runtime(args.workers, args.policy, args.quantum)
+    for pid in range(args.processes):
+        runtime.submit(Job(pid, rng.uniform(0.005, args.max_burst)))
+        time.sleep(rng.expovariate(1 / args.mean_gap))
+    runtime.join()
+    runtime.shutdown()
+    report = runtime.report()
+
+    real = report.summary()
+    simulated = report.simulated().summary()
+    # 模擬的時間單位是毫秒
+    print(json.dumps(real, indent=2))
+    for key in ("avg_waiting_time", "avg_turnaround_time", "makespan"):
+        print(f"{key:20s} real {real[key] * 1000:10.2f}ms   simulated {simulated[key]:10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import engine, workloads
+from engine_regression import reference_sjf, reference_srt
+
+# O(log n) 派工的排程器（MLFQ / CFS / Priority，以及 heap 版 SJF / SRTF）和原本
+# schedulingMethod.Scheduler 的 list.sort + pop(0) 寫法隨行程數的成長比較。
+# list 版是 O(n^2)（SRTF 還是逐 tick），超過 --reference-limit 就不跑。
+# Usage: python benchmarks/scheduler_scaling.py --sizes 1e3 1e4 1e5 1e6 --reference-limit 20000
+
+CASES = {
+    "SJF (list.sort)": lambda jobs: reference_sjf(jobs),
+    "SRTF (list.sort)": lambda jobs: reference_srt(jobs),
+    "SJF": lambda jobs: engine.sjf(jobs),
+    "SRTF": lambda jobs: engine.srtf(jobs),
+    "MLFQ": lambda jobs: engine.mlfq(jobs),
+    "CFS": lambda jobs: engine.cfs(jobs, nice=lambda pid: pid % 5 - 2),
+    "Priority+aging": lambda jobs: engine.priority(jobs, priorities=lambda pid: pid % 8, aging=10),
+    "Priority preemptive": lambda jobs: engine.priority(jobs, priorities=lambda pid: pid % 8, aging=10, preemptive=True),
+}
+REFERENCE = {"SJF (list.sort)", "SRTF (list.sort)"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dispatch cost of the schedulers as the process count grows.")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--generator", default="bursty", choices=list(workloads.GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5])
+    parser.add_argument("--reference-limit", type=int, default=10_000, help="largest n for the list-sorting versions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the timings to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in (int(size) for size in args.sizes):
+        jobs = workloads.generate(args.generator, n, seed=args.seed)
+        for case in args.cases:
+            if case in REFERENCE and n > args.reference_limit:
+                continue
+            start = time.perf_counter()
+            CASES[case](jobs)
+            elapsed = time.perf_counter() - start
+            results.append({"case": case, "n": n, "wall_time": elapsed, "us_per_process": elapsed / n * 1e6})
+            print(f"{case:20s} n={n:<9d} {elapsed:9.3f}s {elapsed / n * 1e6:9.2f}us/process")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
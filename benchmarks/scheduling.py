@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import engine, workloads
+
+try:
+    import resource  # Linux / macOS：用子行程的 max RSS 當作尖峰記憶體
+except ImportError:
+    resource = None
+    import tracemalloc
+
+# 排程演算法的效能基準：每個 (policy, generator, n) 在獨立的子行程裡跑，
+# 量測 wall time、尖峰記憶體與 events/sec，輸出 JSON 報告；
+# 給 --baseline 時和舊報告比較，變慢超過 --tolerance 倍就回傳非 0。
+# Usage:
+#   python benchmarks/scheduling.py --sizes 1e2 1e3 1e4 1e5 1e6 --out bench.json
+#   python benchmarks/scheduling.py --baseline bench.json --out new.json
+
+CASES = {
+    "FCFS": ("FCFS", {}),
+    "RR q=2": ("RR", {"quantum": 2}),
+    "RR q=8": ("RR", {"quantum": 8}),
+    "RR q=32": ("RR", {"quantum": 32}),
+    "SJF": ("SJF", {}),
+    "SRTF": ("SRTF", {}),
+    "Interrupt SJF": ("INTERRUPT_SJF", {}),
+}
+
+
+def _interrupt_every_third(pid):
+    # 和 interruptSJF 的 {"D", "G"} 一樣，讓一部分行程被中斷
+    return pid % 3 == 0
+
+
+def _max_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def run_case(case, generator, n, seed):
+    """Runs in a fresh child process so peak memory belongs to this case only."""
+    policy, options = CASES[case]
+    if policy == "INTERRUPT_SJF":
+        options = dict(options, interrupted=_interrupt_every_third)
+    jobs = workloads.generate(generator, n, seed=seed)
+
+    if resource is not None:
+        before = _max_rss_mb()
+    else:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = engine.simulate(policy, jobs, **options)
+    wall_time = time.perf_counter() - start
+    if resource is not None:
+        peak_mb = max(0.0, _max_rss_mb() - before)
+    else:
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    events = result.dispatches + n  # 每個 dispatch 加上每個 arrival
+    return {
+        "case": case,
+        "generator": generator,
+        "n": n,
+        "seed": seed,
+        "wall_time": wall_time,
+        "peak_memory_mb": peak_mb,
+        "events": events,
+        "events_per_sec": events / wall_time if wall_time else None,
+        "avg_waiting_time": result.avg_waiting_time,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Cases whose wall time grew by more than tolerance x the baseline."""
+    old = {(r["case"], r["generator"], r["n"]): r for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        before = old.get((r["case"], r["generator"], r["n"]))
+        if before and before["wall_time"] > 0.01 and r["wall_time"] > before["wall_time"] * tolerance:
+            regressions.append({"case": r["case"], "generator": r["generator"], "n": r["n"],
+                                "baseline": before["wall_time"], "current": r["wall_time"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduling engine.")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--generators", nargs="+", default=["poisson", "heavy_tailed", "bursty"],
+                        choices=list(workloads.GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e2, 1e3, 1e4, 1e5],
+                        help="process counts, e.g. 1e2 1e3 ... 1e7")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "memory_source": "ru_maxrss" if resource is not None else "tracemalloc",
+        },
+        "results": [],
+    }
+    for n in (int(size) for size in args.sizes):
+        for generator in args.generators:
+            for case in args.cases:
+                # max_tasks_per_child=1：每個 case 都是全新的子行程
+                with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+                    record = pool.submit(run_case, case, generator, n, args.seed).result()
+                report["results"].append(record)
+                print(f"{case:14s} {generator:13s} n={n:<9d} {record['wall_time']:9.3f}s "
+                      f"{record['peak_memory_mb']:9.1f}MB {record['events_per_sec']:12.0f} events/s")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['case']} {r['generator']} n={r['n']}: {r['baseline']:.3f}s -> {r['current']:.3f}s")
+        status = 1 if report["regressions"] else 0
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {os.path.abspath(args.out)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
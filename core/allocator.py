@@ -0,0 +1,405 @@
+import bisect
+import heapq
+import time
+from array import array
+
+# 記憶體配置器：位址空間以整數「單位」表示（RAM 用 MB 或 KB 當單位），
+# 空閒空間存在緊湊的陣列 / dict 裡，而不是每個區塊一個 Python 物件。
+#   first-fit  線段樹（array）記錄每段的最長連續空閒，找最左邊夠大的位置 O(log N)
+#   best-fit   依大小分類的 heap + 排序過的大小陣列，相鄰空閒區塊用 dict O(1) 合併
+#   buddy      每個 order 一個空閒位址集合，分裂 / 合併 O(log N)
+#   slab       小物件依 2 的次方分類，從底層 first-fit 一次拿一整個 slab
+
+
+class Histogram:
+    """Latency histogram with power-of-two nanosecond buckets."""
+
+    def __init__(self):
+        self.counts = [0] * 64
+        self.total = 0
+        self.count = 0
+
+    def add(self, ns):
+        self.counts[ns.bit_length()] += 1
+        self.total += ns
+        self.count += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Upper bound (ns) of the bucket holding the q-th percentile."""
+        if not self.count:
+            return 0
+        target = q / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return 1 << bucket
+        return 1 << 63
+
+    def buckets(self):
+        """{"<=ns": count} for the non-empty buckets."""
+        return {f"<={1 << bucket}ns": count for bucket, count in enumerate(self.counts) if count}
+
+
+class Allocator:
+    """Base class: alloc(size) -> address or None, free(address) -> size.
+
+    Subclasses implement _alloc(size) returning (address, granted units),
+    _free(address, granted) and largest_free(). Sizes and addresses are in units.
+    """
+
+    name = None
+
+    def __init__(self, capacity, measure=True):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.measure = measure
+        self.blocks = {}  # address -> (requested, granted)
+        self.requested = 0
+        self.granted = 0
+        self.failures = 0
+        self.alloc_latency = Histogram()
+        self.free_latency = Histogram()
+
+    def alloc(self, size):
+        if size <= 0:
+            raise ValueError("allocation size must be positive")
+        start = time.perf_counter_ns() if self.measure else 0
+        found = self._alloc(size)
+        if self.measure:
+            self.alloc_latency.add(time.perf_counter_ns() - start)
+        if found is None:
+            self.failures += 1
+            return None
+        address, granted = found
+        self.blocks[address] = (size, granted)
+        self.requested += size
+        self.granted += granted
+        return address
+
+    def free(self, address):
+        try:
+            size, granted = self.blocks.pop(address)
+        except KeyError:
+            raise ValueError(f"address {address} is not allocated") from None
+        start = time.perf_counter_ns() if self.measure else 0
+        self._free(address, granted)
+        if self.measure:
+            self.free_latency.add(time.perf_counter_ns() - start)
+        self.requested -= size
+        self.granted -= granted
+        return size
+
+    @property
+    def free_space(self):
+        return self.capacity - self.granted
+
+    def external_fragmentation(self):
+        """1 - largest free block / total free space (0 = all free space is contiguous)."""
+        free = self.free_space
+        return 1 - self.largest_free() / free if free else 0.0
+
+    def internal_fragmentation(self):
+        """Share of granted units the callers did not ask for (rounding, buddy / slab classes)."""
+        return (self.granted - self.requested) / self.granted if self.granted else 0.0
+
+    def stats(self):
+        return {
+            "allocator": self.name,
+            "capacity": self.capacity,
+            "live_blocks": len(self.blocks),
+            "requested": self.requested,
+            "granted": self.granted,
+            "free": self.free_space,
+            "largest_free": self.largest_free(),
+            "external_fragmentation": self.external_fragmentation(),
+            "internal_fragmentation": self.internal_fragmentation(),
+            "failures": self.failures,
+            "alloc_ns_mean": self.alloc_latency.mean,
+            "alloc_ns_p99": self.alloc_latency.percentile(99),
+            "free_ns_mean": self.free_latency.mean,
+            "free_ns_p99": self.free_latency.percentile(99),
+        }
+
+
+class FirstFitAllocator(Allocator):
+    """Lowest-address fit via a segment tree of (prefix, suffix, best) free runs."""
+
+    name = "first_fit"
+
+    def __init__(self, capacity, measure=True):
+        super().__init__(capacity, measure)
+        size = 2 << max(capacity - 1, 0).bit_length()  # 遞迴對半切，節點編號不會超過 2 * 2^ceil(log2 N)
+        typecode = "i" if capacity < 2 ** 31 else "q"
+        self.pre = array(typecode, [0]) * size
+        self.suf = array(typecode, [0]) * size
+        self.best = array(typecode, [0]) * size
+        self.lazy = array("b", [-1]) * size  # -1 無標記，0 全部使用中，1 全部空閒
+        self._set(1, 0, capacity, 1)
+
+    def _set(self, node, lo, hi, free):
+        value = hi - lo if free else 0
+        self.pre[node] = self.suf[node] = self.best[node] = value
+        self.lazy[node] = free
+
+    def _push(self, node, lo, mid, hi):
+        free = self.lazy[node]
+        if free != -1:
+            self._set(2 * node, lo, mid, free)
+            self._set(2 * node + 1, mid, hi, free)
+            self.lazy[node] = -1
+
+    def _update(self, node, lo, hi, a, b, free):
+        # 熱點：_set / _push / _pull 都展開成區域變數操作
+        pre, suf, best, lazy = self.pre, self.suf, self.best, self.lazy
+        if a <= lo and hi <= b:
+            pre[node] = suf[node] = best[node] = hi - lo if free else 0
+            lazy[node] = free
+            return
+        mid = (lo + hi) // 2
+        left, right = 2 * node, 2 * node + 1
+        tag = lazy[node]
+        if tag != -1:
+            pre[left] = suf[left] = best[left] = mid - lo if tag else 0
+            pre[right] = suf[right] = best[right] = hi - mid if tag else 0
+            lazy[left] = lazy[right] = tag
+            lazy[node] = -1
+        if a < mid:
+            self._update(left, lo, mid, a, b, free)
+        if b > mid:
+            self._update(right, mid, hi, a, b, free)
+        pl, pr, sl, sr = pre[left], pre[right], suf[left], suf[right]
+        pre[node] = pl + pr if pl == mid - lo else pl
+        suf[node] = sr + sl if sr == hi - mid else sr
+        best[node] = max(best[left], best[right], sl + pr)
+
+    def _find(self, size):
+        node, lo, hi = 1, 0, self.capacity
+        if self.best[node] < size:
+            return None
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            self._push(node, lo, mid, hi)
+            left = 2 * node
+            if self.best[left] >= size:
+                node, hi = left, mid
+            elif self.suf[left] + self.pre[left + 1] >= size:
+                return mid - self.suf[left]
+            else:
+                node, lo = left + 1, mid
+        return lo
+
+    def _alloc(self, size):
+        address = self._find(size)
+        if address is None:
+            return None
+        self._update(1, 0, self.capacity, address, address + size, 0)
+        return address, size
+
+    def _free(self, address, granted):
+        self._update(1, 0, self.capacity, address, address + granted, 1)
+
+    def largest_free(self):
+        return self.best[1]
+
+
+class BestFitAllocator(Allocator):
+    """Smallest free block that fits (lowest address among equals); neighbours coalesce on free."""
+
+    name = "best_fit"
+
+    def __init__(self, capacity, measure=True):
+        super().__init__(capacity, measure)
+        self.free_start = {}  # start -> size
+        self.free_end = {}  # end -> start
+        self.by_size = {}  # size -> heap of starts（可能有重複的舊項目，取出時再檢查）
+        self.size_count = {}  # size -> 目前有效的空閒區塊數
+        self.sizes = []  # 排序過的 size（by_size 的 key）
+        self._insert(0, capacity)
+
+    def _insert(self, start, size):
+        self.free_start[start] = size
+        self.free_end[start + size] = start
+        heap = self.by_size.get(size)
+        if heap is None:
+            self.by_size[size] = heap = []
+            self.size_count[size] = 0
+            bisect.insort(self.sizes, size)
+        heapq.heappush(heap, start)
+        self.size_count[size] += 1
+
+    def _remove(self, start):
+        size = self.free_start.pop(start)
+        del self.free_end[start + size]
+        self.size_count[size] -= 1
+        if not self.size_count[size]:  # 立刻移除，sizes 只留下真的有空閒區塊的大小
+            del self.sizes[bisect.bisect_left(self.sizes, size)]
+            del self.by_size[size]
+            del self.size_count[size]
+        return size
+
+    def _alloc(self, size):
+        i = bisect.bisect_left(self.sizes, size)
+        if i == len(self.sizes):
+            return None
+        block = self.sizes[i]
+        heap = self.by_size[block]
+        while self.free_start.get(heap[0]) != block:
+            heapq.heappop(heap)  # 已經被合併或拿走的舊項目
+        start = heapq.heappop(heap)
+        self._remove(start)
+        if block > size:
+            self._insert(start + size, block - size)
+        return start, size
+
+    def _free(self, address, granted):
+        start, end = address, address + granted
+        before = self.free_end.get(start)
+        if before is not None:
+            self._remove(before)
+            start = before
+        if end in self.free_start:
+            end += self._remove(end)
+        self._insert(start, end - start)
+
+    def largest_free(self):
+        return self.sizes[-1] if self.sizes else 0
+
+
+class BuddyAllocator(Allocator):
+    """Power-of-two blocks; capacity is rounded down to a power of two times min_block."""
+
+    name = "buddy"
+
+    def __init__(self, capacity, measure=True, min_block=1):
+        self.min_block = min_block
+        self.max_order = (capacity // min_block).bit_length() - 1
+        if self.max_order < 0:
+            raise ValueError("capacity is smaller than min_block")
+        super().__init__(min_block << self.max_order, measure)
+        self.free_lists = [set() for _ in range(self.max_order + 1)]
+        self.free_lists[self.max_order].add(0)
+
+    def _order(self, size):
+        return max(0, (-(-size // self.min_block) - 1).bit_length())
+
+    def _alloc(self, size):
+        order = self._order(size)
+        for j in range(order, self.max_order + 1):
+            if self.free_lists[j]:
+                break
+        else:
+            return None
+        address = self.free_lists[j].pop()
+        while j > order:  # 分裂：後半塊放回低一階的空閒集合
+            j -= 1
+            self.free_lists[j].add(address + (self.min_block << j))
+        return address, self.min_block << order
+
+    def _free(self, address, granted):
+        order = (granted // self.min_block).bit_length() - 1
+        while order < self.max_order:
+            buddy = address ^ (self.min_block << order)
+            if buddy not in self.free_lists[order]:
+                break
+            self.free_lists[order].remove(buddy)
+            address = min(address, buddy)
+            order += 1
+        self.free_lists[order].add(address)
+
+    def largest_free(self):
+        for order in range(self.max_order, -1, -1):
+            if self.free_lists[order]:
+                return self.min_block << order
+        return 0
+
+
+class SlabAllocator(Allocator):
+    """Small objects from per-size-class slabs; larger requests go straight to first-fit.
+
+    Empty slabs stay cached for reuse until shrink() hands them back.
+    """
+
+    name = "slab"
+
+    def __init__(self, capacity, measure=True, max_object=64, objects_per_slab=64):
+        if max_object & (max_object - 1):
+            raise ValueError("max_object must be a power of two")
+        super().__init__(capacity, measure)
+        self.backing = FirstFitAllocator(capacity, measure=False)
+        self.max_object = max_object
+        self.objects_per_slab = objects_per_slab
+        self.free_objects = {}  # class size -> stack of free object addresses
+        self.slab_starts = []  # 排序過的 slab 起始位址，用 bisect 找物件屬於哪個 slab
+        self.slab_class = {}  # slab start -> class size
+        self.slab_used = {}  # slab start -> 使用中的物件數
+
+    def _alloc(self, size):
+        cls = 1 << (size - 1).bit_length()
+        if cls > self.max_object:
+            address = self.backing.alloc(size)
+            return None if address is None else (address, size)
+        stack = self.free_objects.setdefault(cls, [])
+        if not stack:
+            slab = self.backing.alloc(cls * self.objects_per_slab)
+            if slab is None:
+                return None
+            bisect.insort(self.slab_starts, slab)
+            self.slab_class[slab] = cls
+            self.slab_used[slab] = 0
+            stack.extend(range(slab + cls * (self.objects_per_slab - 1), slab - 1, -cls))
+        address = stack.pop()
+        self.slab_used[self._slab(address)] += 1
+        return address, cls
+
+    def _slab(self, address):
+        return self.slab_starts[bisect.bisect_right(self.slab_starts, address) - 1]
+
+    def _free(self, address, granted):
+        if granted > self.max_object:
+            self.backing.free(address)
+            return
+        self.slab_used[self._slab(address)] -= 1
+        self.free_objects[granted].append(address)
+
+    def shrink(self):
+        """Return empty slabs to the backing allocator; returns how many were released."""
+        empty = {slab for slab, used in self.slab_used.items() if used == 0}
+        if not empty:
+            return 0
+        for cls, stack in self.free_objects.items():
+            stack[:] = [address for address in stack if self._slab(address) not in empty]
+        for slab in empty:
+            self.backing.free(slab)
+            del self.slab_used[slab]
+            del self.slab_class[slab]
+        self.slab_starts = [slab for slab in self.slab_starts if slab not in empty]
+        return len(empty)
+
+    @property
+    def free_space(self):
+        return self.backing.free_space
+
+    def largest_free(self):
+        return self.backing.largest_free()
+
+
+ALLOCATORS = {
+    "first_fit": FirstFitAllocator,
+    "best_fit": BestFitAllocator,
+    "buddy": BuddyAllocator,
+    "slab": SlabAllocator,
+}
+
+
+def make_allocator(name, capacity, **options):
+    try:
+        cls = ALLOCATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown allocator: {name}") from None
+    return cls(capacity, **options)
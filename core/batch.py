@@ -0,0 +1,122 @@
+import numpy as np
+
+# 一次評估上千組工作負載的 FCFS / 非搶佔 SJF
+# workloads: array of shape (W, N, 2), workloads[w, i] = (arrival, burst)
+
+
+def _split(workloads):
+    workloads = np.asarray(workloads)
+    if workloads.ndim == 2 and workloads.shape[-1] == 2:
+        workloads = workloads[np.newaxis]  # 單一工作負載
+    if workloads.ndim != 3 or workloads.shape[-1] != 2:
+        raise ValueError("workloads must have shape (W, N, 2) of (arrival, burst)")
+    return workloads[..., 0], workloads[..., 1]
+
+
+class BatchResult:
+    def __init__(self, policy, arrival, burst, completion):
+        self.policy = policy
+        self.arrival = arrival
+        self.burst = burst
+        self.completion = completion
+        self.turnaround = completion - arrival
+        self.waiting = self.turnaround - burst
+
+    def __len__(self):
+        return self.completion.shape[0]
+
+    def stats(self):
+        """Aggregate statistics per workload, each value is an array of length W."""
+        n = self.completion.shape[1]
+        first_arrival = self.arrival.min(axis=1)
+        makespan = self.completion.max(axis=1)
+        span = makespan - first_arrival
+        with np.errstate(divide="ignore", invalid="ignore"):
+            throughput = np.where(span > 0, n / span, 0.0)
+            utilization = np.where(span > 0, self.burst.sum(axis=1) / span, 1.0)
+        return {
+            "avg_waiting_time": self.waiting.mean(axis=1),
+            "max_waiting_time": self.waiting.max(axis=1),
+            "p95_waiting_time": np.percentile(self.waiting, 95, axis=1),
+            "avg_turnaround_time": self.turnaround.mean(axis=1),
+            "makespan": makespan,
+            "throughput": throughput,
+            "cpu_utilization": utilization,
+        }
+
+
+def fcfs(workloads):
+    """FCFS for every workload at once, no Python-level loop.
+
+    With jobs in arrival order and S_k the running sum of bursts, the
+    recurrence C_k = max(C_{k-1}, a_k) + b_k unrolls to
+    C_k = S_k + max_{j<=k}(a_j - S_{j-1}).
+    """
+    arrival, burst = _split(workloads)
+    order = np.argsort(arrival, axis=1, kind="stable")
+    a = np.take_along_axis(arrival, order, axis=1)
+    b = np.take_along_axis(burst, order, axis=1)
+    s = np.cumsum(b, axis=1)
+    slack = np.maximum.accumulate(a - (s - b), axis=1)
+    sorted_completion = s + np.maximum(slack, 0)  # 時間從 0 開始
+
+    completion = np.empty_like(sorted_completion)
+    np.put_along_axis(completion, order, sorted_completion, axis=1)
+    return BatchResult("FCFS", arrival, burst, completion)
+
+
+def sjf(workloads):
+    """Non-preemptive SJF for every workload at once.
+
+    SJF has no closed form, so this steps through the N dispatches and
+    vectorizes each decision across the W workloads: O(N^2 * W) work but
+    only N Python iterations. Ties go to the earlier (arrival, burst) job,
+    matching core.engine.sjf.
+    """
+    arrival, burst = _split(workloads)
+    w, n = arrival.shape
+    order = np.lexsort((burst, arrival), axis=1)
+    a = np.take_along_axis(arrival, order, axis=1).astype(np.float64)
+    b = np.take_along_axis(burst, order, axis=1).astype(np.float64)
+
+    rows = np.arange(w)
+    time = np.zeros(w)
+    done = np.zeros((w, n), dtype=bool)
+    sorted_completion = np.empty((w, n))
+    for _ in range(n):
+        # CPU 閒置時跳到下一個尚未完成行程的到達時間
+        next_arrival = np.where(done, np.inf, a).min(axis=1)
+        time = np.maximum(time, next_arrival)
+        ready = ~done & (a <= time[:, np.newaxis])
+        pick = np.where(ready, b, np.inf).argmin(axis=1)
+        time = time + b[rows, pick]
+        sorted_completion[rows, pick] = time
+        done[rows, pick] = True
+
+    completion = np.empty_like(sorted_completion)
+    np.put_along_axis(completion, order, sorted_completion, axis=1)
+    return BatchResult("SJF", arrival, burst, completion.astype(np.result_type(arrival, burst)))
+
+
+POLICIES = {
+    "FCFS": fcfs,
+    "SJF": sjf,
+}
+
+
+def evaluate(policy, workloads):
+    """Run one batch policy by name and return its per-workload statistics."""
+    try:
+        run = POLICIES[policy.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown batch policy: {policy}") from None
+    return run(workloads).stats()
+
+
+def random_workloads(count, size, seed=0, mean_interarrival=5, burst_range=(1, 20)):
+    """count random workloads of size processes each, shape (count, size, 2)."""
+    rng = np.random.default_rng(seed)
+    gaps = rng.poisson(mean_interarrival, (count, size))
+    arrival = np.cumsum(gaps, axis=1) - gaps[:, :1]
+    burst = rng.integers(burst_range[0], burst_range[1] + 1, (count, size))
+    return np.stack([arrival, burst], axis=-1)
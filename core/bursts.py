@@ -0,0 +1,623 @@
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+
+from core import instrument
+from core.engine import NICE_0_WEIGHT, nice_to_weight
+from core.hardware import Disk, Network, VirtualClock
+
+# CPU / I/O 交替的行程模型：行程是 (pid, arrival, bursts)，bursts = [cpu, (device, size_mb), cpu, ...]，
+# CPU burst 單位是秒，I/O burst 交給 core.hardware 的 Disk / Network（或 IOScheduler）處理。
+# 每個裝置有自己的等待佇列（depth 個請求同時在裝置上，其餘排隊）；I/O 完成時由 VirtualClock
+# 的事件把行程叫醒放回 ready queue，可能搶佔正在跑的行程。取代 interruptSJF 寫死的 {"D", "G"}。
+
+EPSILON = 1e-12
+DEFAULT_DEPTH = {"disk": 1, "net": 32}  # 網路可以同時開很多連線；磁碟一次服務一個請求
+
+
+class _Task:
+    __slots__ = ("i", "bursts", "index", "remaining", "ready_since", "run_start", "event",
+                 "level", "used", "epoch", "vruntime", "weight", "key", "estimate")
+
+    def __init__(self, i, bursts):
+        self.i = i
+        self.bursts = bursts
+        self.index = 0  # 目前的 burst
+        self.remaining = bursts[0]  # 目前 CPU burst 還剩多少
+        self.ready_since = 0.0
+        self.run_start = 0.0
+        self.event = None
+        self.level = 0
+        self.used = 0.0
+        self.epoch = 0
+        self.vruntime = 0.0
+        self.weight = None  # CFS 第一次排進來時才設定
+        self.key = 0.0
+        self.estimate = None
+
+
+# --- ready queue：每個策略實作 push / pop / slice / ran / preempts ---
+# push 的 reason："new"、"woken"（I/O 完成）、"expired"（時間片用完）、"preempted"
+
+class _FifoQueue:
+    """FCFS (quantum=inf) and round robin."""
+
+    preemptive = False
+
+    def __init__(self, quantum=math.inf):
+        if quantum <= 0:
+            raise ValueError("quantum must be positive")
+        self.quantum = quantum
+        self.items = deque()
+
+    def __len__(self):
+        return len(self.items)
+
+    def push(self, task, now, reason):
+        self.items.append(task)
+
+    def pop(self, now):
+        return self.items.popleft()
+
+    def slice(self, task):
+        return self.quantum
+
+    def ran(self, task, elapsed, now):
+        pass
+
+    def preempts(self, task, running, elapsed):
+        return False
+
+
+class _ShortestQueue(_FifoQueue):
+    """SJF / SRTF on the current CPU burst.
+
+    With alpha the burst length is not known in advance: the key is the
+    exponential average tau = alpha * last burst + (1 - alpha) * tau.
+    """
+
+    def __init__(self, preemptive=False, alpha=None, initial=0.01):
+        self.items = []
+        self.preemptive = preemptive
+        self.alpha = alpha
+        self.initial = initial
+
+    def _key(self, task):
+        if self.alpha is None:
+            return task.remaining
+        if task.estimate is None:
+            task.estimate = self.initial
+        return task.estimate
+
+    def push(self, task, now, reason):
+        # 同樣長度時依到達順序，和 core.engine 一樣：被搶佔的行程保留原本的順位
+        heapq.heappush(self.items, (self._key(task), task.i, task))
+
+    def pop(self, now):
+        return heapq.heappop(self.items)[2]
+
+    def slice(self, task):
+        return math.inf
+
+    def ran(self, task, elapsed, now):
+        if self.alpha is not None and task.remaining <= EPSILON:
+            burst = task.bursts[task.index]
+            task.estimate = self.alpha * burst + (1 - self.alpha) * (task.estimate or self.initial)
+
+    def preempts(self, task, running, elapsed):
+        if not self.preemptive:
+            return False
+        if self.alpha is None:
+            return task.remaining < running.remaining - elapsed
+        return self._key(task) < self._key(running) - elapsed
+
+
+class _PriorityQueue(_FifoQueue):
+    """Smaller number first; with aging the key is base * aging + time entered (see engine.priority_events)."""
+
+    def __init__(self, priority, aging=None, preemptive=False):
+        self.items = []
+        self.priority = priority
+        self.aging = aging
+        self.preemptive = preemptive
+        self.seq = 0
+
+    def push(self, task, now, reason):
+        base = self.priority(task.i)
+        task.key = base * self.aging + now if self.aging else base
+        self.seq += 1
+        heapq.heappush(self.items, (task.key, self.seq, task))
+
+    def pop(self, now):
+        return heapq.heappop(self.items)[2]
+
+    def slice(self, task):
+        return math.inf
+
+    def preempts(self, task, running, elapsed):
+        return self.preemptive and task.key < running.key
+
+
+class _MLFQueue(_FifoQueue):
+    """Multi-level feedback queue: a job that uses up its level's allotment (across
+    I/O waits) drops a level; arrivals and wake-ups on a higher level preempt.
+    Every boost seconds everything goes back to level 0."""
+
+    preemptive = True
+
+    def __init__(self, quanta=(0.002, 0.004, 0.008), boost=1.0):
+        if not quanta or min(quanta) <= 0:
+            raise ValueError("quanta must be positive")
+        self.quanta = quanta
+        self.boost = boost
+        self.levels = [deque() for _ in quanta]
+        self.count = 0
+        self.epoch = 0
+
+    def __len__(self):
+        return self.count
+
+    def _boost(self, now):
+        epoch = int(now // self.boost) if self.boost else 0
+        if epoch != self.epoch:
+            self.epoch = epoch
+            for level in self.levels[1:]:
+                for task in level:
+                    task.level, task.used = 0, 0.0
+                self.levels[0].extend(level)
+                level.clear()
+
+    def push(self, task, now, reason):
+        self._boost(now)
+        if task.epoch != self.epoch:  # 在 CPU 上或在等 I/O 時錯過了 boost
+            task.epoch, task.level, task.used = self.epoch, 0, 0.0
+        if reason == "preempted":  # 被搶佔：留在這一層的最前面，配額照舊
+            self.levels[task.level].appendleft(task)
+        else:
+            self.levels[task.level].append(task)
+        self.count += 1
+
+    def pop(self, now):
+        self._boost(now)
+        self.count -= 1
+        for level in self.levels:
+            if level:
+                return level.popleft()
+
+    def slice(self, task):
+        return self.quanta[task.level] - task.used
+
+    def ran(self, task, elapsed, now):
+        task.used += elapsed
+        if task.used >= self.quanta[task.level] - EPSILON:
+            task.level = min(task.level + 1, len(self.quanta) - 1)
+            task.used = 0.0
+
+    def preempts(self, task, running, elapsed):
+        return task.level < running.level
+
+
+class _FairQueue(_FifoQueue):
+    """CFS-style vruntime heap; woken tasks get at most sched_latency / 2 of credit."""
+
+    preemptive = True
+
+    def __init__(self, nice=None, sched_latency=0.006, min_granularity=0.00075):
+        self.items = []
+        self.nice = nice
+        self.sched_latency = sched_latency
+        self.min_granularity = min_granularity
+        self.min_vruntime = 0.0
+        self.total_weight = 0.0  # ready 的權重總和
+        self.seq = 0
+
+    def push(self, task, now, reason):
+        if task.weight is None:  # 新行程
+            task.weight = nice_to_weight(self.nice(task.i)) if self.nice is not None else NICE_0_WEIGHT
+            task.vruntime = self.min_vruntime
+        elif reason == "woken":
+            task.vruntime = max(task.vruntime, self.min_vruntime - self.sched_latency / 2)
+        self.total_weight += task.weight
+        self.seq += 1
+        heapq.heappush(self.items, (task.vruntime, self.seq, task))
+
+    def pop(self, now):
+        task = heapq.heappop(self.items)[2]
+        self.total_weight -= task.weight
+        self.min_vruntime = max(self.min_vruntime, task.vruntime)
+        return task
+
+    def slice(self, task):
+        total = self.total_weight + task.weight
+        return max(self.min_granularity, self.sched_latency * task.weight / total)
+
+    def ran(self, task, elapsed, now):
+        task.vruntime += elapsed * NICE_0_WEIGHT / task.weight
+
+    def preempts(self, task, running, elapsed):
+        current = running.vruntime + elapsed * NICE_0_WEIGHT / running.weight
+        return task.vruntime + self.min_granularity < current
+
+
+def _lookup(jobs, values, default):
+    if callable(values):
+        return lambda i: values(jobs[i][0])
+    if values is not None:
+        return lambda i: values.get(jobs[i][0], default)
+    return lambda i: default
+
+
+QUEUES = {
+    "FCFS": lambda jobs, **o: _FifoQueue(),
+    "RR": lambda jobs, quantum=0.004, **o: _FifoQueue(quantum),
+    "SJF": lambda jobs, alpha=None, **o: _ShortestQueue(False, alpha),
+    "SRTF": lambda jobs, alpha=None, **o: _ShortestQueue(True, alpha),
+    # 有了真正的 I/O burst，中斷就是一般的 I/O 阻塞，不需要另外寫死要中斷誰
+    "INTERRUPT_SJF": lambda jobs, alpha=None, **o: _ShortestQueue(False, alpha),
+    "MLFQ": lambda jobs, quanta=(0.002, 0.004, 0.008), boost=1.0, **o: _MLFQueue(tuple(quanta), boost),
+    "CFS": lambda jobs, nice=None, sched_latency=0.006, min_granularity=0.00075, **o: _FairQueue(
+        _lookup(jobs, nice, 0) if nice is not None else None, sched_latency, min_granularity),
+    "PRIORITY": lambda jobs, priorities=None, aging=0.01, preemptive=False, **o: _PriorityQueue(
+        _lookup(jobs, priorities, 0), aging, preemptive),
+}
+POLICIES = tuple(QUEUES)
+
+
+class _Device:
+    """Per-device wait queue in front of a hardware model: depth requests in service, the rest wait FIFO."""
+
+    def __init__(self, name, model, depth, clock):
+        self.name = name
+        self.model = model
+        self.depth = depth or math.inf
+        self.clock = clock
+        self.queue = deque()  # (task, size, kind, queued, callback)
+        self.outstanding = 0
+        self.requests = 0
+        self.queue_wait = 0.0
+        self.service_time = 0.0
+        self.max_queue = 0
+        self.busy_time = 0.0
+        self._busy_since = None
+        if hasattr(model, "io"):
+            self._start_io = lambda size, kind, name: model.io(kind, size, name=name)
+        elif hasattr(model, "download"):
+            self._start_io = lambda size, kind, name: model.download(size, name=name)
+        else:
+            raise TypeError(f"device {name!r} has neither io() nor download()")
+
+    def submit(self, task, size, kind, callback):
+        self.requests += 1
+        if self.outstanding < self.depth:
+            self._start(task, size, kind, self.clock.now, callback)
+        else:
+            self.queue.append((task, size, kind, self.clock.now, callback))
+            self.max_queue = max(self.max_queue, len(self.queue))
+
+    def _start(self, task, size, kind, queued, callback):
+        now = self.clock.now
+        self.queue_wait += now - queued
+        if self.outstanding == 0:
+            self._busy_since = now
+        self.outstanding += 1
+        self._start_io(size, kind, task.i).then(lambda op: self._done(op, now, task, callback))
+
+    def _done(self, op, started, task, callback):
+        now = self.clock.now
+        self.service_time += now - started
+        self.outstanding -= 1
+        if self.outstanding == 0:
+            self.busy_time += now - self._busy_since
+            self._busy_since = None
+        if self.queue:
+            self._start(*self.queue.popleft())
+        callback(task)
+
+    def summary(self, makespan):
+        busy = self.busy_time + (self.clock.now - self._busy_since if self._busy_since is not None else 0)
+        channel = self.model.utilization() if hasattr(self.model, "utilization") else None
+        return {
+            "requests": self.requests,
+            "utilization": busy / makespan if makespan else 0.0,
+            "channel_utilization": channel,
+            "avg_queue_wait": self.queue_wait / self.requests if self.requests else 0.0,
+            "avg_service_time": self.service_time / self.requests if self.requests else 0.0,
+            "max_queue": self.max_queue,
+        }
+
+
+class BurstResult:
+    """Per-process times (seconds) and CPU / device statistics of one run."""
+
+    def __init__(self, policy, pids, cores):
+        n = len(pids)
+        self.policy = policy
+        self.pids = pids
+        self.cores = cores
+        self.arrival = np.zeros(n)
+        self.start = np.full(n, np.nan)  # 第一次拿到 CPU
+        self.completion = np.full(n, np.nan)
+        self.cpu_time = np.zeros(n)
+        self.io_time = np.zeros(n)  # 被 I/O 擋住的時間（含裝置佇列）
+        self.ready_time = np.zeros(n)  # 在 ready queue 的時間
+        self.cpu_segments = []  # record=True 時：(pid, start, end, core)
+        self.io_segments = []  # record=True 時：(pid, start, end, device)
+        self.transitions = []  # record=True 時：(time, pid, state)
+        self.dispatches = 0
+        self.context_switches = 0
+        self.preemptions = 0
+        self.busy_time = 0.0
+        self.makespan = 0.0
+        self.devices = {}
+
+    @property
+    def turnaround(self):
+        return self.completion - self.arrival
+
+    @property
+    def response(self):
+        return self.start - self.arrival
+
+    def summary(self):
+        n = len(self.pids)
+        span = self.makespan - (float(self.arrival.min()) if n else 0.0)
+        return {
+            "policy": self.policy,
+            "processes": n,
+            "cores": self.cores,
+            "avg_waiting_time": float(self.ready_time.mean()) if n else 0.0,
+            "avg_turnaround_time": float(self.turnaround.mean()) if n else 0.0,
+            "avg_response_time": float(self.response.mean()) if n else 0.0,
+            "p99_response_time": float(np.percentile(self.response, 99)) if n else 0.0,
+            "avg_io_time": float(self.io_time.mean()) if n else 0.0,
+            "makespan": self.makespan,
+            "throughput": n / span if span else 0.0,
+            "cpu_utilization": self.busy_time / (span * self.cores) if span else 0.0,
+            "dispatches": self.dispatches,
+            "context_switches": self.context_switches,
+            "preemptions": self.preemptions,
+            "devices": {name: device.summary(span) for name, device in self.devices.items()},
+        }
+
+
+class _Simulation:
+    def __init__(self, policy, jobs, clock, devices, depth, cores, record, options):
+        self.jobs = jobs
+        self.clock = clock
+        self.cores = [None] * cores
+        self.last = [None] * cores  # 每個核心上一個跑的行程（算 context switch）
+        self.idle = list(range(cores - 1, -1, -1))
+        self.ready = QUEUES[policy](jobs, **options)
+        self.record = record
+        self.result = BurstResult(policy, [job[0] for job in jobs], cores)
+        depth = depth if isinstance(depth, dict) else DEFAULT_DEPTH if depth is None else dict.fromkeys(devices, depth)
+        self.devices = {name: _Device(name, model, depth.get(name, DEFAULT_DEPTH.get(name, 1)), clock)
+                        for name, model in devices.items()}
+        self.result.devices = self.devices
+        self.next_job = 0
+        self._arrival_event = None
+        self.unfinished = len(jobs)
+        self.probe = instrument.probe("bursts")
+        if self.probe is not None:
+            self._dispatch = self._probed(self._dispatch)
+
+    def _state(self, task, state):
+        if self.record:
+            self.result.transitions.append((self.clock.now, self.jobs[task.i][0], state))
+
+    def run(self):
+        if self.jobs:
+            self._arrival_event = self.clock.schedule(max(0.0, self.jobs[0][1] - self.clock.now), self._arrive)
+        self.clock.run(stop=lambda: not self.unfinished)
+        self.result.makespan = self.clock.now
+        if self.probe is not None:
+            for name in ("dispatches", "context_switches", "preemptions"):
+                self.probe.count(f"bursts.{name}", getattr(self.result, name))
+        return self.result
+
+    def _probed(self, dispatch):
+        # 只有開啟量測時才換上這個版本：每次 dispatch 前取樣 ready queue 與各裝置的佇列長度
+        probe, ready = self.probe, self.ready
+        devices = [(f"bursts.{name}.queue", device) for name, device in self.devices.items()]
+
+        def probed():
+            probe.gauge("bursts.ready", len(ready))
+            for name, device in devices:
+                probe.gauge(name, len(device.queue) + device.outstanding)
+            dispatch()
+        return probed
+
+    # --- 事件 ---
+
+    def _arrive(self):
+        self._arrival_event = None
+        self._ingest()
+        self._dispatch()
+
+    def _ingest(self):
+        """Admit every job that has arrived by now (arrivals go before completions at the same time)."""
+        now = self.clock.now
+        jobs = self.jobs
+        if self.next_job >= len(jobs) or jobs[self.next_job][1] > now:
+            return
+        while self.next_job < len(jobs) and jobs[self.next_job][1] <= now:
+            i = self.next_job
+            self.next_job += 1
+            bursts = jobs[i][2]
+            self.result.arrival[i] = jobs[i][1]
+            task = _Task(i, bursts)
+            self._state(task, "new")
+            if isinstance(bursts[0], tuple):  # 一開始就做 I/O
+                task.remaining = 0.0
+                task.index = -1
+                self._next_burst(task)
+            else:
+                self._make_ready(task, "new")
+        # 一次只排下一個到達事件，事件 heap 不會塞滿幾十萬個到達
+        if self._arrival_event is not None:
+            self._arrival_event.cancel()
+            self._arrival_event = None
+        if self.next_job < len(jobs):
+            self._arrival_event = self.clock.schedule(jobs[self.next_job][1] - now, self._arrive)
+
+    def _make_ready(self, task, reason):
+        now = self.clock.now
+        task.ready_since = now
+        self.ready.push(task, now, reason)
+        self._state(task, "ready")
+        if not self.idle and self.ready.preemptive:
+            self._preempt(task)
+
+    def _preempt(self, task):
+        now = self.clock.now
+        for core, running in enumerate(self.cores):
+            if running is not None and self.ready.preempts(task, running, now - running.run_start):
+                running.event.cancel()
+                self._stop(core)
+                self.result.preemptions += 1
+                self._make_ready(running, "preempted")
+                return
+
+    def _dispatch(self):
+        now = self.clock.now
+        result = self.result
+        while self.idle and len(self.ready):
+            core = self.idle.pop()
+            task = self.ready.pop(now)
+            i = task.i
+            result.ready_time[i] += now - task.ready_since
+            if math.isnan(result.start[i]):
+                result.start[i] = now
+            if self.last[core] is not None and self.last[core] is not task:
+                result.context_switches += 1
+            self.last[core] = task
+            result.dispatches += 1
+            self.cores[core] = task
+            task.run_start = now
+            run = min(task.remaining, self.ready.slice(task))
+            task.event = self.clock.schedule(max(run, 0.0), self._expire, core)
+            self._state(task, "running")
+
+    def _stop(self, core):
+        task = self.cores[core]
+        now = self.clock.now
+        elapsed = now - task.run_start
+        task.remaining -= elapsed
+        self.result.busy_time += elapsed
+        self.result.cpu_time[task.i] += elapsed
+        if self.record and elapsed > 0:
+            self.result.cpu_segments.append((self.jobs[task.i][0], task.run_start, now, core))
+        self.ready.ran(task, elapsed, now)
+        self.cores[core] = None
+        self.idle.append(core)
+        return task
+
+    def _expire(self, core):
+        task = self._stop(core)
+        self._ingest()  # 和 engine 一樣：同一時間到達的行程排在被搶佔的行程前面
+        if task.remaining <= EPSILON:
+            self._next_burst(task)
+        else:
+            self._make_ready(task, "expired")  # 時間片用完
+        self._dispatch()
+
+    def _next_burst(self, task):
+        task.index += 1
+        if task.index >= len(task.bursts):
+            self._finish(task)
+            return
+        burst = task.bursts[task.index]
+        if not isinstance(burst, tuple):  # 連續兩個 CPU burst
+            task.remaining = burst
+            self._make_ready(task, "new")
+            return
+        device, size = burst[0], burst[1]
+        kind = burst[2] if len(burst) > 2 else "read"
+        task.ready_since = self.clock.now  # 這裡借來記開始等 I/O 的時間
+        self._state(task, "waiting")
+        self.devices[device].submit(task, size, kind, self._wake)
+
+    def _wake(self, task):
+        now = self.clock.now
+        i = task.i
+        self.result.io_time[i] += now - task.ready_since
+        if self.record:
+            self.result.io_segments.append((self.jobs[i][0], task.ready_since, now,
+                                            task.bursts[task.index][0]))
+        task.index += 1
+        if task.index >= len(task.bursts):
+            self._finish(task)
+        elif isinstance(task.bursts[task.index], tuple):
+            task.index -= 1  # 連續兩個 I/O burst：從 I/O 直接接下一個
+            task.remaining = 0.0
+            self._next_burst(task)
+        else:
+            task.remaining = task.bursts[task.index]
+            self._make_ready(task, "woken")
+        self._ingest()
+        self._dispatch()
+
+    def _finish(self, task):
+        self.result.completion[task.i] = self.clock.now
+        self._state(task, "terminated")
+        self.unfinished -= 1
+
+
+def simulate(policy, jobs, clock=None, devices=None, depth=None, cores=1, record=False, **options):
+    """Run (pid, arrival, bursts) jobs under policy; returns a BurstResult.
+
+    devices maps the device names used in I/O bursts to hardware models on
+    clock (anything with io(kind, size_mb) or download(size_mb)); the
+    default is one Disk and one Network. depth is the number of requests a
+    device serves at once (int, or {name: depth}; default DEFAULT_DEPTH).
+    Policy options: quantum (RR), alpha (SJF/SRTF burst prediction),
+    quanta/boost (MLFQ), nice/sched_latency/min_granularity (CFS),
+    priorities/aging/preemptive (PRIORITY). Times are in seconds.
+    """
+    policy = policy.upper()
+    if policy not in QUEUES:
+        raise ValueError(f"Unknown scheduling policy: {policy}")
+    if cores < 1:
+        raise ValueError("need at least one core")
+    if clock is None:
+        clock = VirtualClock()
+    if devices is None:
+        devices = {"disk": Disk(clock), "net": Network(clock)}
+    jobs = sorted(jobs, key=lambda job: job[1])
+    return _Simulation(policy, jobs, clock, devices, depth, cores, record, options).run()
+
+
+def mixed(n, seed=0, mean_interarrival=0.02, io_bound=0.7, disk_share=0.7):
+    """Reproducible mix of I/O-bound and CPU-bound processes.
+
+    I/O-bound processes alternate short CPU bursts (mean 2ms) with 3-8
+    small disk reads or network downloads; CPU-bound ones have 1-4 long
+    bursts (mean 50ms) separated by larger disk reads.
+    """
+    rng = np.random.default_rng(seed)
+    arrival = np.cumsum(rng.exponential(mean_interarrival, n))
+    arrival -= arrival[0] if n else 0
+    interactive = rng.random(n) < io_bound
+    counts = np.where(interactive, rng.integers(3, 9, n), rng.integers(1, 5, n))
+    total = int(counts.sum())
+    owner = np.repeat(interactive, counts + 1)  # 每個 CPU burst 屬於哪一種行程
+    cpu = np.where(owner, rng.exponential(0.002, total + n), rng.exponential(0.05, total + n))
+    cpu = np.maximum(cpu, 1e-5).tolist()
+    io_owner = np.repeat(interactive, counts)
+    on_disk = (rng.random(total) < disk_share).tolist()
+    disk_size = np.where(io_owner, rng.lognormal(-3, 1, total), rng.lognormal(0, 1, total)).tolist()
+    net_size = rng.lognormal(-3.5, 1, total).tolist()
+    jobs = []
+    k = c = 0
+    for pid in range(n):
+        bursts = [cpu[c]]
+        c += 1
+        for _ in range(int(counts[pid])):
+            bursts.append(("disk", disk_size[k]) if on_disk[k] else ("net", net_size[k]))
+            bursts.append(cpu[c])
+            k += 1
+            c += 1
+        jobs.append((pid, float(arrival[pid]), bursts))
+    return jobs
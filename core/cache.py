@@ -0,0 +1,259 @@
+import numpy as np
+
+from consts import CACHE_L1, CACHE_L2, CACHE_L3, CPU_CLOCK, SYSTEM_BUS_SPEED
+
+# 多層快取模擬：L1 / L2 / L3 大小取自 consts.py，set-associative，LRU 或 tree-PLRU，
+# inclusive / exclusive / NINE。位址以 NumPy 批次送入：同一批中每個 set 的存取依時間排好，
+# 每一「輪」同時處理所有 set 的下一筆存取（不同 set 彼此獨立），所以迴圈次數只跟
+# 「一批裡最忙的 set 被存取幾次」有關，而不是存取總數。
+
+LOOKUP, PROBE, INSERT = 0, 1, 2  # 一般查詢（miss 時配置）、exclusive 查詢（hit 時搬走）、放入下一層的 victim
+
+
+class CacheLevel:
+    def __init__(self, name, size_bytes, line_size=64, ways=8, policy="LRU", latency=4):
+        sets = size_bytes // (line_size * ways)
+        if sets < 1 or sets & (sets - 1) or line_size & (line_size - 1):
+            raise ValueError(f"{name}: size / (line_size * ways) and line_size must be powers of two")
+        policy = policy.upper()
+        if policy not in ("LRU", "PLRU"):
+            raise ValueError(f"Unknown cache replacement policy: {policy}")
+        if policy == "PLRU" and ways & (ways - 1):
+            raise ValueError("PLRU needs a power-of-two number of ways")
+        self.name = name
+        self.size_bytes = size_bytes
+        self.line_size = line_size
+        self.ways = ways
+        self.sets = sets
+        self.set_bits = sets.bit_length() - 1
+        self.policy = policy
+        self.latency = latency  # cycles
+        self.tags = np.full((sets, ways), -1, dtype=np.int64)
+        self.stamps = np.zeros((sets, ways), dtype=np.int64)  # LRU：最後使用時間
+        self.tree = np.zeros((sets, max(ways - 1, 1)), dtype=np.int8)  # PLRU：0 = 往左找 victim
+        self.time = 1
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def _victim(self, sets):
+        if self.policy == "LRU":
+            return self.stamps[sets].argmin(axis=1)
+        node = np.zeros(len(sets), dtype=np.int64)
+        for _ in range(self.ways.bit_length() - 1):
+            node = 2 * node + 1 + self.tree[sets, node]
+        return node - (self.ways - 1)
+
+    def _touch(self, sets, ways, stamps):
+        if self.policy == "LRU":
+            self.stamps[sets, ways] = stamps
+            return
+        node = np.zeros(len(sets), dtype=np.int64)
+        for level in range(self.ways.bit_length() - 2, -1, -1):
+            direction = (ways >> level) & 1
+            self.tree[sets, node] = 1 - direction  # 指向另一邊，下次從那邊找 victim
+            node = 2 * node + 1 + direction
+
+    def process(self, lines, kinds):
+        """Run time-ordered (line, kind) requests through this level.
+
+        Returns (hit mask, evicted line per request or -1). Requests of the
+        same set are applied in order; different sets run side by side.
+        """
+        n = len(lines)
+        hit = np.zeros(n, dtype=bool)
+        evicted = np.full(n, -1, dtype=np.int64)
+        if not n:
+            return hit, evicted
+        sets = lines & (self.sets - 1)
+        tags = lines >> self.set_bits
+        order = np.argsort(sets.astype(np.uint16) if self.sets <= 1 << 16 else sets, kind="stable")
+        counts = np.bincount(sets, minlength=self.sets)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        busiest = np.argsort(-counts, kind="stable")
+        active = np.searchsorted(-counts[busiest], 0)  # 有存取的 set 數
+        busiest = busiest[:active]
+        depth = counts[busiest]
+        stamps = self.time + np.arange(n)
+        for r in range(int(depth[0]) if active else 0):
+            while depth[active - 1] <= r:
+                active -= 1
+            index = order[starts[busiest[:active]] + r]
+            s, tag, kind = sets[index], tags[index], kinds[index]
+            resident = self.tags[s]
+            match = resident == tag[:, None]
+            found = match.any(axis=1)
+            way = match.argmax(axis=1)
+            allocate = ~found & (kind != PROBE)
+            if allocate.any():
+                empty = resident == -1
+                has_empty = empty.any(axis=1)
+                victim = np.where(has_empty, empty.argmax(axis=1), self._victim(s))
+                way = np.where(found, way, victim)
+                evict = allocate & ~has_empty
+                evicted[index[evict]] = (resident[evict, victim[evict]] << self.set_bits) | s[evict]
+            hit[index] = found
+            keep = found & (kind != PROBE) | allocate
+            self.tags[s[allocate], way[allocate]] = tag[allocate]
+            self._touch(s[keep], way[keep], stamps[index[keep]])
+            moved = found & (kind == PROBE)  # exclusive：行搬到上一層，這裡作廢
+            if moved.any():
+                self.tags[s[moved], way[moved]] = -1
+                self.stamps[s[moved], way[moved]] = 0
+        self.time += n
+        lookups = kinds != INSERT
+        self.hits += int(np.count_nonzero(hit & lookups))
+        self.misses += int(np.count_nonzero(~hit & lookups))
+        self.evictions += int(np.count_nonzero(evicted >= 0))
+        return hit, evicted
+
+    def contains(self, lines):
+        sets = lines & (self.sets - 1)
+        return (self.tags[sets] == (lines >> self.set_bits)[:, None]).any(axis=1)
+
+    def invalidate(self, lines):
+        sets = lines & (self.sets - 1)
+        match = self.tags[sets] == (lines >> self.set_bits)[:, None]
+        rows, ways = np.nonzero(match)
+        self.tags[sets[rows], ways] = -1
+        self.stamps[sets[rows], ways] = 0
+        return len(rows)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size_bytes": self.size_bytes,
+            "sets": self.sets,
+            "ways": self.ways,
+            "policy": self.policy,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class CacheHierarchy:
+    """L1 -> L2 -> L3 -> memory over a system bus.
+
+    mode is "inclusive" (lines evicted from the last level are invalidated
+    in the upper levels at the end of each batch), "nine" (no
+    back-invalidation) or "exclusive" (a line lives in one level only;
+    victims move down, hits in lower levels move up).
+    """
+
+    def __init__(self, levels=None, mode="inclusive", memory_latency=200, bus_speed=SYSTEM_BUS_SPEED,
+                 clock_ghz=CPU_CLOCK, batch=1 << 16):
+        if mode not in ("inclusive", "nine", "exclusive"):
+            raise ValueError(f"Unknown inclusion mode: {mode}")
+        self.levels = levels if levels is not None else default_levels()
+        line_sizes = {level.line_size for level in self.levels}
+        if len(line_sizes) != 1:
+            raise ValueError("every level must use the same line size")
+        self.line_size = line_sizes.pop()
+        self.line_bits = self.line_size.bit_length() - 1
+        self.mode = mode
+        self.memory_latency = memory_latency  # cycles
+        self.bus_speed = bus_speed  # MB/s
+        self.clock_ghz = clock_ghz
+        self.batch = batch
+        self.accesses = 0
+        self.memory_fetches = 0
+        self.back_invalidations = 0
+        self._last_line = None
+
+    def access(self, addresses):
+        """Feed byte addresses (any iterable / array) through the hierarchy in batches."""
+        addresses = np.asarray(addresses, dtype=np.int64)
+        for begin in range(0, len(addresses), self.batch):
+            self._access_batch(addresses[begin:begin + self.batch] >> self.line_bits)
+        return self
+
+    def _access_batch(self, lines):
+        self.accesses += len(lines)
+        # 連續存取同一行（循序讀同一個 cache line）一定是 L1 hit，也不改變 LRU / PLRU 狀態
+        repeat = np.zeros(len(lines), dtype=bool)
+        repeat[1:] = lines[1:] == lines[:-1]
+        if len(lines) and self._last_line == lines[0]:
+            repeat[0] = True
+        if len(lines):
+            self._last_line = lines[-1]
+        self.levels[0].hits += int(np.count_nonzero(repeat))
+        lines = lines[~repeat]
+        exclusive = self.mode == "exclusive"
+        kinds = np.full(len(lines), LOOKUP, dtype=np.int8)
+        times = np.arange(len(lines), dtype=np.int64) * 2
+        llc_victims = []
+        for depth, level in enumerate(self.levels):
+            if depth > 0 and exclusive:
+                kinds = np.where(kinds == LOOKUP, PROBE, kinds).astype(np.int8)
+            hit, evicted = level.process(lines, kinds)
+            last = depth == len(self.levels) - 1
+            lookups = kinds != INSERT
+            miss = lookups & ~hit
+            if last:
+                self.memory_fetches += int(np.count_nonzero(miss))
+                llc_victims.append(evicted[evicted >= 0])
+                break
+            # 下一層的請求：這一層 miss 的查詢，exclusive 時再加上被擠出來的 victim（在同一時間點之後）
+            next_lines, next_kinds, next_times = [lines[miss]], [kinds[miss]], [times[miss]]
+            if exclusive:
+                victims = evicted >= 0
+                next_lines.append(evicted[victims])
+                next_kinds.append(np.full(np.count_nonzero(victims), INSERT, dtype=np.int8))
+                next_times.append(times[victims] + 1)
+            lines, kinds, times = (np.concatenate(part) for part in (next_lines, next_kinds, next_times))
+            order = np.argsort(times, kind="stable")
+            lines, kinds, times = lines[order], kinds[order], times[order]
+        if self.mode == "inclusive" and llc_victims:
+            victims = np.unique(np.concatenate(llc_victims))
+            victims = victims[~self.levels[-1].contains(victims)]  # 同一批裡又被抓回來的不算
+            for level in self.levels[:-1]:
+                self.back_invalidations += level.invalidate(victims)
+            if self._last_line is not None and np.isin(self._last_line, victims):
+                self._last_line = None
+
+    def stats(self):
+        levels = {level.name: level.stats() for level in self.levels}
+        cycles = self.accesses * self.levels[0].latency
+        for upper, lower in zip(self.levels, self.levels[1:]):
+            cycles += upper.misses * lower.latency
+        bus_bytes = self.memory_fetches * self.line_size
+        line_transfer_ns = self.line_size / (self.bus_speed * 1e6) * 1e9
+        memory_ns = self.memory_latency / self.clock_ghz + line_transfer_ns
+        amat_ns = (cycles / self.clock_ghz + self.memory_fetches * memory_ns) / self.accesses if self.accesses else 0.0
+        return {
+            "mode": self.mode,
+            "accesses": self.accesses,
+            "levels": levels,
+            "memory_fetches": self.memory_fetches,
+            "back_invalidations": self.back_invalidations,
+            "amat_ns": amat_ns,
+            "amat_cycles": amat_ns * self.clock_ghz,
+            "bus_bytes": bus_bytes,
+            "bus_seconds": bus_bytes / (self.bus_speed * 1e6),  # 以 SYSTEM_BUS_SPEED 傳完所需時間
+        }
+
+
+def default_levels(line_size=64, policy="LRU"):
+    """L1 / L2 / L3 sized from consts.py (KB, KB, MB)."""
+    return [
+        CacheLevel("L1", CACHE_L1 * 1024, line_size, ways=8, policy=policy, latency=4),
+        CacheLevel("L2", CACHE_L2 * 1024, line_size, ways=8, policy=policy, latency=12),
+        CacheLevel("L3", CACHE_L3 * 1024 * 1024, line_size, ways=16, policy=policy, latency=40),
+    ]
+
+
+def address_trace(pages, page_size=4096, seed=0, run=16, stride=8):
+    """Byte addresses for a page reference string (e.g. core.paging.reference_trace).
+
+    Each page reference becomes a short sequential run of stride-byte
+    accesses inside that page, starting at a random offset.
+    """
+    pages = np.asarray(pages, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    offsets = rng.integers(0, page_size - run * stride + 1, size=len(pages)) // stride * stride
+    return (np.repeat(pages * page_size + offsets, run) + np.tile(np.arange(run) * stride, len(pages)))
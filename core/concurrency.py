@@ -0,0 +1,440 @@
+import asyncio
+import collections
+import random
+import selectors
+import time as _time
+
+import numpy as np
+
+from core.deadlock import WaitForGraph
+
+# 同步問題的 asyncio runtime：哲學家用餐、睡覺的助教、生產者-消費者。
+# C# 版（DiningPhilosophersSimulationService / SleepingTASimulationService）每個角色一個 Task.Run，
+# 用 Task.Delay(...).Wait() 真的睡 1-5 秒；這裡每個角色是一個 coroutine，全部跑在同一個
+# VirtualTimeLoop 上：loop.time() 是虛擬時間，沒有事可做時 select() 直接把時間跳到下一個
+# timer，所以 asyncio.sleep(3) 不花真實時間，幾千個哲學家 / 學生也只是幾千個 task。
+# 同步只用 asyncio 的 Lock / Semaphore / Future，和 C# 的 SemaphoreSlim / ManualResetEvent 對應。
+#
+# 偵測：
+#   死結  叉子是 _TrackedLock，被擋住時在 core.deadlock.WaitForGraph 加一條等待邊，形成環就回報；
+#         另外 loop 沒有任何 ready callback 也沒有 timer、但還有角色沒結束（全部卡住）也算死結。
+#   飢餓  每個角色最長一次等待超過 starvation 秒，或整段時間一次都沒被服務。
+
+STRATEGIES = ("naive", "ordered", "waiter", "backoff")
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    """Selector that never blocks: waiting for timeout seconds moves the loop's clock instead."""
+
+    def __init__(self):
+        self.loop = None
+        self._keys = {}
+
+    def register(self, fileobj, events, data=None):
+        fd = fileobj if isinstance(fileobj, int) else fileobj.fileno()
+        key = self._keys[fileobj] = selectors.SelectorKey(fileobj, fd, events, data)
+        return key
+
+    def unregister(self, fileobj):
+        return self._keys.pop(fileobj)
+
+    def get_map(self):
+        return self._keys
+
+    def select(self, timeout=None):
+        if timeout is None:  # 沒有 ready 也沒有 timer：所有 task 都在等別人
+            self.loop._stalled()
+        elif timeout > 0:
+            self.loop._advance(timeout)
+        return []
+
+    def close(self):
+        self._keys.clear()
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """asyncio event loop on virtual time.
+
+    time() starts at 0 and only moves when every task is waiting on a
+    timer; it then jumps straight to the earliest one. When nothing is
+    ready and no timer is pending, the `stalled` future is resolved with
+    the current time so a supervising task can notice the deadlock.
+    """
+
+    def __init__(self):
+        self._now = 0.0
+        selector = _VirtualSelector()
+        selector.loop = self
+        super().__init__(selector)
+        self.stalled = self.create_future()
+
+    def time(self):
+        return self._now
+
+    def _advance(self, timeout):
+        if self._scheduled and timeout < asyncio.base_events.MAXIMUM_SELECT_TIMEOUT:
+            self._now = max(self._now, self._scheduled[0]._when)  # 直接對齊最早的 timer，避免浮點誤差
+        else:
+            self._now += timeout
+
+    def _stalled(self):
+        if self.stalled.done():
+            raise RuntimeError("virtual-time loop has nothing left to run")
+        self.stalled.set_result(self._now)
+
+
+def run_virtual(coro):
+    """Run coro to completion on a fresh VirtualTimeLoop; returns its result."""
+    loop = VirtualTimeLoop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class _TrackedLock:
+    """asyncio.Lock that knows its holder and keeps a wait-for graph current.
+
+    A task that has to wait adds the edge waiter -> holder; when the lock
+    changes hands the remaining waiters are re-pointed at the new holder.
+    A closed cycle is passed to on_cycle right away.
+    """
+
+    def __init__(self, graph, on_cycle):
+        self.lock = asyncio.Lock()
+        self.graph = graph
+        self.on_cycle = on_cycle
+        self.holder = None
+        self.waits = {}  # waiter -> 目前等待的對象（依排隊順序）
+
+    def locked(self):
+        return self.lock.locked()
+
+    def _wait_for(self, waiter, target):
+        previous = self.waits.get(waiter)
+        if previous is not None:
+            self.graph.remove_edge(waiter, previous)
+        self.waits[waiter] = target
+        cycle = self.graph.add_edge(waiter, target)
+        if cycle:
+            self.on_cycle(cycle)
+
+    async def acquire(self, who):
+        if self.lock.locked() or self.waits:
+            # 剛被釋放、還沒交到下一個人手上時，實際上等的是排第一個的 waiter
+            self._wait_for(who, self.holder if self.lock.locked() else next(iter(self.waits)))
+            try:
+                await self.lock.acquire()
+            finally:
+                self.graph.remove_edge(who, self.waits.pop(who))
+        else:
+            await self.lock.acquire()  # 沒人拿著：不會讓出執行權
+        self.holder = who
+        for waiter in self.waits:
+            self._wait_for(waiter, who)
+
+    def release(self):
+        self.lock.release()
+
+
+class Metrics:
+    """Per-actor service counts and wait times for one run.
+
+    begin(actor) marks the actor as waiting (a second call while already
+    waiting is ignored), end(actor) closes the wait, served(actor) counts
+    one unit of service. Waits still open when the run stops count towards
+    the longest wait, so an actor blocked forever shows up as starved.
+    """
+
+    def __init__(self, actors, clock):
+        self.clock = clock
+        self.served_count = np.zeros(actors, dtype=np.int64)
+        self.longest = np.zeros(actors)
+        self.since = np.full(actors, np.nan)  # 開始等待的時間，沒在等就是 NaN
+        self.waits = []
+        self.counters = collections.Counter()
+
+    def begin(self, actor):
+        if self.since[actor] != self.since[actor]:
+            self.since[actor] = self.clock()
+
+    def end(self, actor):
+        wait = self.clock() - self.since[actor]
+        self.since[actor] = np.nan
+        self.waits.append(wait)
+        if wait > self.longest[actor]:
+            self.longest[actor] = wait
+        return wait
+
+    def served(self, actor):
+        self.served_count[actor] += 1
+
+    def summary(self, elapsed, starvation):
+        waits = np.asarray(self.waits)
+        longest = np.fmax(self.longest, self.clock() - self.since)  # 還在等的也算進去
+        served = self.served_count
+        starved = np.flatnonzero((longest > starvation) | (served == 0))
+        total = int(served.sum())
+        squares = float(np.square(served, dtype=np.float64).sum())
+        return {
+            "completed": total,
+            "throughput": total / elapsed if elapsed > 0 else 0.0,
+            "wait": {
+                "mean": float(waits.mean()) if len(waits) else 0.0,
+                "p50": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+                "p90": float(np.percentile(waits, 90)) if len(waits) else 0.0,
+                "p99": float(np.percentile(waits, 99)) if len(waits) else 0.0,
+                "max": float(longest.max()) if len(longest) else 0.0,
+            },
+            # Jain's fairness index：1 = 每個角色被服務一樣多次，1/n = 只有一個角色被服務
+            "fairness": total * total / (len(served) * squares) if squares else 0.0,
+            "starved": len(starved),
+            "starved_actors": starved[:10].tolist(),
+            **dict(self.counters),
+        }
+
+
+class _Run:
+    """Shared plumbing of the three problems: clock, rng, metrics, deadlock and stop handling."""
+
+    def __init__(self, problem, actors, duration, seed, starvation):
+        self.problem = problem
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.starvation = starvation
+        self.loop = asyncio.get_running_loop()
+        self.metrics = Metrics(actors, self.loop.time)
+        self.graph = WaitForGraph()
+        self.deadlock = None
+        self._stop = self.loop.create_future()
+
+    def running(self):
+        return self.loop.time() < self.duration and not self._stop.done()
+
+    def sleep(self, bounds):
+        return asyncio.sleep(self.rng.uniform(*bounds))
+
+    def found_cycle(self, cycle):
+        if self.deadlock is None:
+            self.deadlock = {"time": self.loop.time(), "cycle": cycle}
+        if not self._stop.done():
+            self._stop.set_result(None)
+
+    async def supervise(self, actors, helpers=()):
+        """Wait for the actors to finish, a wait-for cycle, or a stalled loop; then cancel everything."""
+        start = _time.perf_counter()
+        everyone = asyncio.gather(*actors)
+        waiting = [everyone, self._stop]
+        if isinstance(self.loop, VirtualTimeLoop):
+            waiting.append(self.loop.stalled)
+        await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+        if self.deadlock is None and not everyone.done():
+            self.deadlock = {"time": self.loop.time(), "cycle": None}  # 全部卡住，但不是等待圖上的環
+        elapsed = self.loop.time()
+        summary = self.metrics.summary(elapsed, self.starvation)
+        for task in (*actors, *helpers):
+            task.cancel()
+        await asyncio.gather(everyone, *helpers, return_exceptions=True)
+        summary.update({
+            "problem": self.problem,
+            "elapsed": elapsed,
+            "wall_time": _time.perf_counter() - start,
+            "deadlock": self.deadlock,
+        })
+        return summary
+
+
+async def _dining(n, duration, strategy, think, eat, reach, retry, seed, starvation):
+    run = _Run("dining_philosophers", n, duration, seed, starvation)
+    metrics = run.metrics
+    forks = [_TrackedLock(run.graph, run.found_cycle) for _ in range(n)]
+    seats = asyncio.Semaphore(n - 1)  # waiter：最多 n-1 人同時上桌，一定有人拿得到兩支叉子
+
+    async def philosopher(i):
+        left, right = i, (i + 1) % n
+        if strategy == "ordered":  # 資源排序：先拿編號小的
+            left, right = min(left, right), max(left, right)
+        while run.running():
+            await run.sleep(think)
+            metrics.begin(i)
+            if strategy == "backoff":
+                # C# 的做法：拿不到左叉就稍後再試；拿到左叉但右叉被占用就放回左叉再試
+                while True:
+                    if not forks[left].locked():
+                        await forks[left].acquire(i)
+                        await asyncio.sleep(reach)
+                        if not forks[right].locked():
+                            await forks[right].acquire(i)
+                            break
+                        forks[left].release()
+                    metrics.counters["retries"] += 1
+                    await run.sleep(retry)
+                    if not run.running():
+                        return
+            else:
+                if strategy == "waiter":
+                    await seats.acquire()
+                await forks[left].acquire(i)
+                await asyncio.sleep(reach)
+                await forks[right].acquire(i)
+            metrics.end(i)
+            await run.sleep(eat)
+            metrics.served(i)
+            forks[right].release()
+            forks[left].release()
+            if strategy == "waiter":
+                seats.release()
+
+    actors = [asyncio.create_task(philosopher(i)) for i in range(n)]
+    summary = await run.supervise(actors)
+    summary["strategy"] = strategy
+    return summary
+
+
+def dining_philosophers(n=5, duration=60.0, strategy="ordered", think=(1.0, 5.0), eat=(1.0, 5.0), reach=0.1,
+                        retry=(0.5, 1.5), seed=0, starvation=None):
+    """Dining philosophers in virtual seconds; returns the run summary.
+
+    strategy: "naive" (left then right, can deadlock), "ordered" (lower
+    numbered fork first), "waiter" (at most n-1 seated), "backoff" (the C#
+    service: put the left fork back and retry after `retry` seconds).
+    reach is the time between picking up the first and the second fork.
+    Wait = hungry until holding both forks; throughput = meals per second.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}; expected one of {STRATEGIES}")
+    if n < 2:
+        raise ValueError("need at least two philosophers")
+    starvation = starvation if starvation is not None else 10 * (think[1] + eat[1])
+    return run_virtual(_dining(n, duration, strategy, think, eat, reach, retry, seed, starvation))
+
+
+async def _sleeping_ta(students, chairs, tas, duration, program, help, retry, rest, seed, starvation):
+    run = _Run("sleeping_ta", students, duration, seed, starvation)
+    metrics = run.metrics
+    seats = asyncio.Semaphore(chairs)  # 走廊上的椅子
+    wake = asyncio.Semaphore(0)  # 學生叫醒助教
+    line = collections.deque()
+    busy = [0.0]
+
+    async def student(i):
+        while run.running():
+            await run.sleep(program)
+            metrics.begin(i)  # 從第一次來找助教開始算，被拒絕的來回也算等待
+            if seats.locked():
+                metrics.counters["turned_away"] += 1
+                await run.sleep(retry)
+                continue
+            await seats.acquire()
+            helped = run.loop.create_future()
+            line.append((i, helped))
+            wake.release()
+            await helped
+            metrics.served(i)
+            await run.sleep(rest)
+
+    async def ta():
+        while True:
+            if not line:
+                metrics.counters["ta_naps"] += 1
+            await wake.acquire()  # 沒有學生就睡覺
+            i, helped = line.popleft()
+            seats.release()
+            metrics.end(i)
+            seconds = run.rng.uniform(*help)
+            busy[0] += seconds
+            await asyncio.sleep(seconds)
+            helped.set_result(None)
+
+    helpers = [asyncio.create_task(ta()) for _ in range(tas)]
+    actors = [asyncio.create_task(student(i)) for i in range(students)]
+    summary = await run.supervise(actors, helpers)
+    summary["ta_utilization"] = busy[0] / (tas * summary["elapsed"]) if summary["elapsed"] else 0.0
+    return summary
+
+
+def sleeping_ta(students=10, chairs=3, tas=1, duration=60.0, program=(2.0, 5.0), help=(1.0, 3.0),
+                retry=(5.0, 10.0), rest=(2.0, 5.0), seed=0, starvation=None):
+    """Sleeping TA in virtual seconds; returns the run summary.
+
+    Same timings as the C# service: program 2-5 s, get helped 1-3 s, come
+    back after 5-10 s when every chair is taken, rest 2-5 s after help.
+    Wait = first attempt to get help until the TA starts helping.
+    """
+    starvation = starvation if starvation is not None else 10 * (program[1] + retry[1])
+    return run_virtual(_sleeping_ta(students, chairs, tas, duration, program, help, retry, rest, seed, starvation))
+
+
+async def _producer_consumer(producers, consumers, capacity, duration, produce, consume, lock_first, seed,
+                             starvation):
+    run = _Run("producer_consumer", consumers, duration, seed, starvation)
+    metrics = run.metrics
+    empty = asyncio.Semaphore(capacity)
+    full = asyncio.Semaphore(0)
+    mutex = asyncio.Lock()
+    buffer = collections.deque()
+    latency = []
+    blocked = [0.0]
+
+    async def producer():
+        while run.running():
+            await run.sleep(produce)
+            start = run.loop.time()
+            if lock_first:  # 課本上的錯誤順序：拿著 mutex 等空位，緩衝區滿了就死結
+                async with mutex:
+                    await empty.acquire()
+                    buffer.append(run.loop.time())
+            else:
+                await empty.acquire()
+                async with mutex:
+                    buffer.append(run.loop.time())
+            blocked[0] += run.loop.time() - start
+            metrics.counters["produced"] += 1
+            full.release()
+
+    async def consumer(i):
+        while True:
+            metrics.begin(i)
+            await full.acquire()
+            async with mutex:
+                made = buffer.popleft()
+            empty.release()
+            metrics.end(i)
+            latency.append(run.loop.time() - made)
+            await run.sleep(consume)
+            metrics.served(i)
+
+    helpers = [asyncio.create_task(consumer(i)) for i in range(consumers)]
+    actors = [asyncio.create_task(producer()) for _ in range(producers)]
+    summary = await run.supervise(actors, helpers)
+    latency = np.asarray(latency)
+    summary.update({
+        "left_in_buffer": len(buffer),
+        "producer_blocked": blocked[0] / producers,
+        "item_latency": {
+            "mean": float(latency.mean()) if len(latency) else 0.0,
+            "p99": float(np.percentile(latency, 99)) if len(latency) else 0.0,
+        },
+    })
+    return summary
+
+
+def producer_consumer(producers=4, consumers=4, capacity=8, duration=60.0, produce=(0.5, 1.5), consume=(0.5, 1.5),
+                      lock_first=False, seed=0, starvation=None):
+    """Bounded buffer with the empty / full / mutex semaphores; returns the run summary.
+
+    Wait = a consumer waiting for an item; completed = items consumed;
+    item_latency = produced until taken out of the buffer. lock_first=True
+    takes the mutex before the empty slot, which deadlocks once the buffer
+    fills up.
+    """
+    starvation = starvation if starvation is not None else 10 * (produce[1] + consume[1])
+    return run_virtual(_producer_consumer(producers, consumers, capacity, duration, produce, consume, lock_first,
+                                          seed, starvation))
+
+
+PROBLEMS = {
+    "dining_philosophers": dining_philosophers,
+    "sleeping_ta": sleeping_ta,
+    "producer_consumer": producer_consumer,
+}
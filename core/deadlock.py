@@ -0,0 +1,435 @@
+import numpy as np
+
+# 死結子系統：銀行家演算法（避免）與等待圖 / 化簡演算法（偵測 + 復原）。
+# 所有矩陣都是 NumPy：列 = 行程，欄 = 資源種類；安全檢查一輪同時讓「所有」
+# need <= work 的行程完成（完成只會讓 work 變大，所以和一次挑一個的結果相同）。
+# 另外記住上一次的安全序列：行程 i 請求 r 時，排在 i 後面的行程可用的 work 不變，
+# 只要重新檢查 i 前面的那段；i 拿到資源後若能立刻完成，就把 i 移到序列最前面（O(m)）。
+
+MODES = ("avoid", "detect")
+
+
+def _set_state(process, state):
+    # core.process.Process 用 status，其他 Process 類別用 state
+    if hasattr(process, "status"):
+        process.status = state
+    if hasattr(process, "state"):
+        process.state = state
+
+
+class WaitForGraph:
+    """Directed wait-for graph with incremental cycle checks.
+
+    add_edge(u, v) means u waits for v; it returns the cycle it closes, if
+    any, by searching only what is reachable from v. cycles() runs one
+    iterative DFS over the whole graph.
+    """
+
+    def __init__(self):
+        self.edges = {}  # pid -> {pid, ...}
+
+    def add_edge(self, waiter, holder):
+        self.edges.setdefault(waiter, set()).add(holder)
+        self.edges.setdefault(holder, set())
+        return self.path(holder, waiter)
+
+    def remove_edge(self, waiter, holder):
+        self.edges.get(waiter, set()).discard(holder)
+
+    def remove(self, pid):
+        self.edges.pop(pid, None)
+        for targets in self.edges.values():
+            targets.discard(pid)
+
+    def path(self, source, target):
+        """A path source -> ... -> target as a list (the cycle when target waits for source), or None."""
+        parent = {source: None}
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+            for nxt in self.edges.get(node, ()):
+                if nxt not in parent:
+                    parent[nxt] = node
+                    stack.append(nxt)
+        return None
+
+    def cycles(self):
+        """One cycle per strongly connected group found by DFS (back edges)."""
+        WHITE, GREY, BLACK = 0, 1, 2
+        colour = dict.fromkeys(self.edges, WHITE)
+        found = []
+        for root in self.edges:
+            if colour[root] != WHITE:
+                continue
+            colour[root] = GREY
+            path = [root]
+            stack = [iter(self.edges[root])]
+            while stack:
+                for nxt in stack[-1]:
+                    if colour.get(nxt, WHITE) == WHITE:
+                        colour[nxt] = GREY
+                        path.append(nxt)
+                        stack.append(iter(self.edges.get(nxt, ())))
+                        break
+                    if colour.get(nxt) == GREY:  # back edge：path 上從 nxt 到結尾就是一個環
+                        found.append(path[path.index(nxt):])
+                else:
+                    colour[path.pop()] = BLACK
+                    stack.pop()
+        return found
+
+    def deadlocked(self):
+        return sorted({pid for cycle in self.cycles() for pid in cycle}, key=str)
+
+
+class ResourceManager:
+    """Multi-instance resources shared by processes, with deadlock avoidance or detection.
+
+    mode="avoid" runs the banker's algorithm: a request is granted only
+    if the state stays safe, otherwise the process waits. mode="detect"
+    grants whatever is available; detect() finds deadlocked processes and
+    recover() aborts victims until none remain. Waiting requests are
+    retried whenever resources are released.
+
+    Vectors are sequences in `names` order or {name: amount} dicts.
+    """
+
+    def __init__(self, total, names=None, mode="avoid", capacity=64):
+        if mode not in MODES:
+            raise ValueError(f"Unknown deadlock mode: {mode}")
+        if isinstance(total, dict):
+            names = list(total) if names is None else list(names)
+            total = [total[name] for name in names]
+        self.total = np.asarray(total, dtype=np.int64).copy()
+        self.names = list(names) if names is not None else [f"R{j}" for j in range(len(self.total))]
+        self.mode = mode
+        m = len(self.total)
+        self.available = self.total.copy()
+        self.maximum = np.zeros((capacity, m), dtype=np.int64)
+        self.allocation = np.zeros((capacity, m), dtype=np.int64)
+        self.need = np.zeros((capacity, m), dtype=np.int64)
+        self.requested = np.zeros((capacity, m), dtype=np.int64)  # 等待中的請求
+        self.active = np.zeros(capacity, dtype=bool)
+        self.rows = {}  # pid -> 列
+        self.processes = []  # 列 -> Process（或 pid）
+        self.free_rows = []
+        self.waiting = {}  # pid -> 列，依等待先後
+        self.sequence = np.zeros(0, dtype=np.int64)  # 目前的安全序列（列編號）
+        self.stats = {"requests": 0, "granted": 0, "waited": 0, "fast_path": 0, "prefix_checks": 0,
+                      "full_checks": 0, "aborted": 0}
+
+    @classmethod
+    def from_machine(cls, machine, mode="avoid", ram_unit_mb=1, disk_unit_mb=1024, **options):
+        """CPU threads, RAM (ram_unit_mb blocks) and Disk space (disk_unit_mb blocks) of a core.hardware.Machine."""
+        total = {
+            "cpu": machine.cpu.threads,
+            "ram": int(machine.ram.total_memory // ram_unit_mb),
+            "disk": int(machine.disk.total_storage // disk_unit_mb),
+        }
+        return cls(total, mode=mode, **options)
+
+    def vector(self, amounts):
+        if isinstance(amounts, dict):
+            vector = np.zeros(len(self.names), dtype=np.int64)
+            for name, amount in amounts.items():
+                vector[self.names.index(name)] = amount
+            return vector
+        vector = np.asarray(amounts, dtype=np.int64)
+        if vector.shape != self.total.shape:
+            raise ValueError(f"expected {len(self.names)} resource amounts, got {vector.shape}")
+        return vector
+
+    def _row(self, process):
+        pid = getattr(process, "pid", process)
+        row = self.rows.get(pid)
+        if row is None:
+            raise KeyError(f"process {pid} is not registered")
+        return pid, row
+
+    # --- 行程 ---
+
+    def add(self, process, maximum):
+        """Register process with its maximum claim (banker's Max row)."""
+        pid = getattr(process, "pid", process)
+        if pid in self.rows:
+            raise ValueError(f"process {pid} is already registered")
+        maximum = self.vector(maximum)
+        if (maximum > self.total).any() or (maximum < 0).any():
+            raise ValueError(f"maximum claim of {pid} exceeds the system's resources")
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.processes[row] = process
+        else:
+            row = len(self.processes)
+            if row == len(self.active):
+                self._grow()
+            self.processes.append(process)
+        self.rows[pid] = row
+        self.maximum[row] = maximum
+        self.allocation[row] = 0
+        self.need[row] = maximum
+        self.requested[row] = 0
+        self.active[row] = True
+        # 新行程沒有配置，need <= total = 所有人完成後的 work：接在序列尾端一定安全
+        self.sequence = np.append(self.sequence, row)
+        _set_state(process, "ready")
+        return row
+
+    def _grow(self):
+        size = 2 * len(self.active)
+        for name in ("maximum", "allocation", "need", "requested"):
+            matrix = getattr(self, name)
+            grown = np.zeros((size, matrix.shape[1]), dtype=matrix.dtype)
+            grown[:len(matrix)] = matrix
+            setattr(self, name, grown)
+        active = np.zeros(size, dtype=bool)
+        active[:len(self.active)] = self.active
+        self.active = active
+
+    def remove(self, process):
+        """Process finished (or was aborted): return everything it holds and retry waiting requests."""
+        pid, row = self._row(process)
+        self.available += self.allocation[row]
+        self.allocation[row] = self.need[row] = self.maximum[row] = self.requested[row] = 0
+        self.active[row] = False
+        self.waiting.pop(pid, None)
+        del self.rows[pid]
+        self.processes[row] = None
+        self.free_rows.append(row)
+        self.sequence = self.sequence[self.sequence != row]
+        _set_state(process, "terminated")
+        return self._wake()
+
+    # --- 請求 / 釋放 ---
+
+    def request(self, process, amounts):
+        """Ask for amounts; True if granted now, False if the process has to wait."""
+        pid, row = self._row(process)
+        request = self.vector(amounts)
+        if (request < 0).any():
+            raise ValueError("request amounts must be non-negative")
+        if self.mode == "avoid" and (request > self.need[row]).any():
+            raise ValueError(f"process {pid} exceeds its maximum claim")
+        if self.mode == "detect" and (self.allocation[row] + request > self.total).any():
+            raise ValueError(f"process {pid} requests more than the system has")
+        self.stats["requests"] += 1
+        if pid in self.waiting:  # 等待中的行程又發出請求：合併成一個
+            self.requested[row] += request
+            return False
+        if self._try_grant(row, request):
+            return True
+        self.requested[row] = request
+        self.waiting[pid] = row
+        self.stats["waited"] += 1
+        _set_state(self.processes[row], "waiting")
+        return False
+
+    def release(self, process, amounts=None):
+        """Give back amounts (default: everything held) and wake waiting processes that can proceed."""
+        pid, row = self._row(process)
+        amounts = self.allocation[row].copy() if amounts is None else self.vector(amounts)
+        if (amounts > self.allocation[row]).any() or (amounts < 0).any():
+            raise ValueError(f"process {pid} releases more than it holds")
+        self.allocation[row] -= amounts
+        self.available += amounts
+        if self.mode == "avoid":
+            self.need[row] += amounts  # 釋放後可能再要回來
+        return self._wake()
+
+    def _try_grant(self, row, request):
+        if (request > self.available).any():
+            return False
+        if self.mode == "avoid" and not self._safe_after(row, request):
+            return False
+        self.available -= request
+        self.allocation[row] += request
+        if self.mode == "avoid":
+            self.need[row] -= request
+        self.stats["granted"] += 1
+        _set_state(self.processes[row], "ready")
+        return True
+
+    def _wake(self):
+        """Retry waiting requests; returns the pids that were granted.
+
+        Requests that let the process finish at once are granted first
+        (no safety scan needed); the rest are tried in FIFO order and the
+        first refusal stops the pass, so one release costs at most one
+        full safety check and older waiters are not overtaken.
+        """
+        woken = []
+        if not self.waiting:
+            return woken
+        rows = np.fromiter(self.waiting.values(), dtype=np.int64, count=len(self.waiting))
+        fits = (self.requested[rows] <= self.available).all(axis=1)
+        if self.mode == "avoid":
+            finishing = fits & (self.need[rows] <= self.available).all(axis=1)
+            order = np.concatenate((rows[finishing], rows[fits & ~finishing]))
+        else:
+            order = rows[fits]
+        for row in order.tolist():
+            request = self.requested[row].copy()
+            if not self._try_grant(row, request):
+                if self.mode == "avoid":
+                    break
+                continue
+            self.requested[row] = 0
+            pid = getattr(self.processes[row], "pid", self.processes[row])
+            del self.waiting[pid]
+            woken.append(pid)
+        return woken
+
+    # --- 銀行家演算法 ---
+
+    def _safe_after(self, row, request):
+        """Would granting request to row keep the state safe? Updates self.sequence when it does."""
+        # 1) 行程拿到後馬上就能跑完：它完成後 work = available + allocation >= 原本的 available，
+        #    原本的安全序列照樣成立，把它移到最前面就好
+        if (self.need[row] <= self.available).all():
+            self.stats["fast_path"] += 1
+            self.sequence = np.concatenate(([row], self.sequence[self.sequence != row]))
+            return True
+        # 先就地套用，不安全再還原（不複製整個矩陣）
+        self.available -= request
+        self.allocation[row] += request
+        self.need[row] -= request
+        # 2) 原序列中 row 之後的行程 work 不變；只重新檢查 row 前面那段（含 row 自己）
+        position = np.flatnonzero(self.sequence == row)
+        k = int(position[0]) + 1 if len(position) else len(self.sequence)
+        safe, sequence = self._safety(self.sequence, k)
+        self.available += request
+        self.allocation[row] -= request
+        self.need[row] += request
+        if safe:
+            self.sequence = sequence
+        return safe
+
+    def _safety(self, hint=None, checked=None):
+        """Vectorized safety algorithm over the active rows: (safe, safe sequence of rows).
+
+        hint is a previous safe sequence: rows are first completed along it
+        (one cumulative sum) up to the first one that cannot finish, then
+        the rest goes through rounds that finish every ready row at once.
+        Only hint[:checked] is verified; the caller guarantees the tail
+        still holds once the prefix does.
+        """
+        available, allocation, need = self.available, self.allocation, self.need
+        work = available.copy()
+        order = []
+        if hint is not None and len(hint):
+            checked = len(hint) if checked is None else checked
+            prefix = hint[:checked]
+            held = allocation[prefix]
+            works = np.cumsum(held, axis=0)
+            works -= held
+            works += available
+            ok = (need[prefix] <= works).all(axis=1)
+            if ok.all():
+                self.stats["prefix_checks"] += 1
+                return True, hint
+            failed = int(np.argmin(ok))
+            order.append(hint[:failed])
+            work = works[failed]
+            remaining = hint[failed:]  # 序列裡一定有所有 active 的列
+        else:
+            remaining = np.flatnonzero(self.active)
+        self.stats["full_checks"] += 1
+        while len(remaining):
+            ready = (need[remaining] <= work).all(axis=1)
+            if not ready.any():
+                return False, None
+            done = remaining[ready]
+            order.append(done)
+            work += allocation[done].sum(axis=0)
+            remaining = remaining[~ready]
+            if (work >= self.total).all():  # 資源全部回收了，剩下的一定都能完成
+                order.append(remaining)
+                break
+        return True, np.concatenate(order) if order else np.zeros(0, dtype=np.int64)
+
+    def is_safe(self):
+        """Full safety check of the current state; returns (safe, [pid, ...] safe sequence or None)."""
+        safe, sequence = self._safety()
+        if not safe:
+            return False, None
+        self.sequence = sequence
+        return True, [getattr(self.processes[row], "pid", self.processes[row]) for row in sequence.tolist()]
+
+    # --- 偵測與復原 ---
+
+    def detect(self):
+        """Pids that can never proceed (reduction algorithm with pending requests instead of Need)."""
+        remaining = np.flatnonzero(self.active)
+        work = self.available.copy()
+        while len(remaining):
+            ready = (self.requested[remaining] <= work).all(axis=1)
+            if not ready.any():
+                break
+            work += self.allocation[remaining[ready]].sum(axis=0)
+            remaining = remaining[~ready]
+        return [getattr(self.processes[row], "pid", self.processes[row]) for row in remaining.tolist()]
+
+    def wait_for_graph(self):
+        """Wait-for graph: a waiting process points at every holder of a resource it is short of.
+
+        With several instances per resource a cycle is necessary but not
+        sufficient for deadlock; detect() is exact. The edges are filled in
+        directly rather than through add_edge(), so building costs O(E);
+        call cycles() once on the result.
+        """
+        graph = WaitForGraph()
+        edges = graph.edges
+        pids = [getattr(process, "pid", process) for process in self.processes]
+        holders = [[pids[row] for row in np.flatnonzero(self.allocation[:, j] > 0).tolist()]
+                   for j in range(len(self.names))]
+        for pid, row in self.waiting.items():
+            targets = edges.setdefault(pid, set())
+            for j in np.flatnonzero(self.requested[row] > self.available).tolist():
+                targets.update(holders[j])
+            targets.discard(pid)
+            for holder in targets:
+                edges.setdefault(holder, set())
+        return graph
+
+    def recover(self, victim="min_allocation"):
+        """Abort deadlocked processes until detect() is empty; returns the aborted pids.
+
+        victim picks among the deadlocked: "min_allocation" (cheapest to
+        redo), "max_allocation" (frees the most) or "youngest".
+        """
+        aborted = []
+        while True:
+            deadlocked = self.detect()
+            if not deadlocked:
+                return aborted
+            rows = np.array([self.rows[pid] for pid in deadlocked])
+            held = self.allocation[rows].sum(axis=1)
+            if victim == "min_allocation":
+                index = int(np.argmin(held))
+            elif victim == "max_allocation":
+                index = int(np.argmax(held))
+            elif victim == "youngest":
+                index = len(deadlocked) - 1
+            else:
+                raise ValueError(f"Unknown victim policy: {victim}")
+            pid = deadlocked[index]
+            self.remove(self.processes[self.rows[pid]])
+            self.stats["aborted"] += 1
+            aborted.append(pid)
+
+    def snapshot(self):
+        """Available / Max / Allocation / Need as dicts, like BankersAlgorithmStatus on the C# side."""
+        return {
+            "available": dict(zip(self.names, self.available.tolist())),
+            "processes": [
+                {"pid": pid, "max": self.maximum[row].tolist(), "allocation": self.allocation[row].tolist(),
+                 "need": self.need[row].tolist(), "waiting": pid in self.waiting}
+                for pid, row in self.rows.items()
+            ],
+        }
@@ -0,0 +1,596 @@
+import heapq
+import time
+from collections import deque
+
+from core import instrument
+
+# 事件驅動的排程引擎：不碰 pyplot，只回傳排程結果與每個行程的統計資料
+# Jobs are given as (pid, arrival_time, burst_time) sequences or any object
+# with pid / arrival_time / burst_time attributes.
+
+
+def _unpack(jobs):
+    """Split jobs into parallel pid / arrival / burst lists."""
+    pids, arrival, burst = [], [], []
+    for job in jobs:
+        if hasattr(job, "arrival_time"):
+            pid, at, bt = job.pid, job.arrival_time, job.burst_time
+        else:
+            pid, at, bt = job[:3]  # tuple、list（例如 JSON 解出來的）都可以
+        pids.append(pid)
+        arrival.append(at)
+        burst.append(bt)
+    return pids, arrival, burst
+
+
+class ScheduleResult:
+    def __init__(self, policy, pids, arrival, burst):
+        n = len(pids)
+        self.policy = policy
+        self.pids = pids
+        self.arrival = arrival
+        self.burst = burst
+        self.start = [None] * n  # 第一次拿到 CPU 的時間
+        self.completion = [None] * n
+        self.waiting = [0] * n
+        self.turnaround = [0] * n
+        self.segments = []  # [(pid, start, end), ...]，相鄰同 pid 的區段會合併
+        self.dispatches = 0
+        self.context_switches = 0
+
+    def run(self, i, start, end):
+        """Record job i running on the CPU during [start, end)."""
+        pid = self.pids[i]
+        self.dispatches += 1
+        if self.start[i] is None:
+            self.start[i] = start
+        if self.segments:
+            last_pid, last_start, last_end = self.segments[-1]
+            if last_pid == pid and last_end == start:
+                self.segments[-1] = (pid, last_start, end)
+                return
+            self.context_switches += 1
+        self.segments.append((pid, start, end))
+
+    def finish(self, i, time):
+        self.completion[i] = time
+        self.turnaround[i] = time - self.arrival[i]
+        self.waiting[i] = self.turnaround[i] - self.burst[i]
+
+    @property
+    def avg_waiting_time(self):
+        return sum(self.waiting) / len(self.waiting) if self.waiting else 0
+
+    @property
+    def avg_turnaround_time(self):
+        return sum(self.turnaround) / len(self.turnaround) if self.turnaround else 0
+
+    @property
+    def avg_response_time(self):
+        n = len(self.start)
+        return sum(s - a for s, a in zip(self.start, self.arrival)) / n if n else 0
+
+    @property
+    def makespan(self):
+        return self.segments[-1][2] if self.segments else 0
+
+    @property
+    def busy_time(self):
+        return sum(self.burst)
+
+    @property
+    def cpu_utilization(self):
+        if not self.segments:
+            return 0
+        span = self.makespan - min(self.arrival)
+        return self.busy_time / span if span else 1
+
+    @property
+    def throughput(self):
+        span = self.makespan - min(self.arrival) if self.segments else 0
+        return len(self.pids) / span if span else 0
+
+    def metrics(self):
+        """Per-process metrics as a list of dicts, in input order."""
+        return [
+            {
+                "pid": self.pids[i],
+                "arrival_time": self.arrival[i],
+                "burst_time": self.burst[i],
+                "start_time": self.start[i],
+                "completion_time": self.completion[i],
+                "waiting_time": self.waiting[i],
+                "turnaround_time": self.turnaround[i],
+            }
+            for i in range(len(self.pids))
+        ]
+
+    def summary(self):
+        return {
+            "policy": self.policy,
+            "processes": len(self.pids),
+            "avg_waiting_time": self.avg_waiting_time,
+            "avg_turnaround_time": self.avg_turnaround_time,
+            "avg_response_time": self.avg_response_time,
+            "makespan": self.makespan,
+            "throughput": self.throughput,
+            "cpu_utilization": self.cpu_utilization,
+            "dispatches": self.dispatches,
+            "context_switches": self.context_switches,
+        }
+
+
+class Arrivals:
+    """Arrival-ordered job iterator with one job of lookahead.
+
+    Jobs are (id, arrival_time, burst_time) tuples. Policies only ever
+    look at ``next`` and ``pop()``, so the source can be a lazy stream.
+    """
+
+    __slots__ = ("_source", "next", "count")
+
+    def __init__(self, source):
+        self._source = iter(source)
+        self.next = next(self._source, None)
+        self.count = 0
+
+    def pop(self):
+        job = self.next
+        self.next = next(self._source, None)
+        if self.next is not None and self.next[1] < job[1]:
+            raise ValueError(f"jobs must be in arrival order: {self.next[0]} arrives before {job[0]}")
+        self.count += 1
+        return job
+
+
+# 每個排程策略都是一個 generator，產生 (job, start, end, finished) 事件；
+# 清單版（fcfs/round_robin/...）與串流版（core.stream）共用這些迴圈
+
+
+def fcfs_events(arrivals):
+    time = 0
+    while arrivals.next is not None:
+        job = arrivals.pop()
+        if time < job[1]:
+            time = job[1]  # CPU 閒置時跳到下一個到達時間
+        end = time + job[2]
+        yield job, time, end, True
+        time = end
+
+
+def round_robin_events(arrivals, quantum=3):
+    if quantum <= 0:
+        raise ValueError("quantum must be positive")
+    queue = deque()  # [job, remaining]
+    time = 0
+
+    while arrivals.next is not None or queue:
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            queue.append([job, job[2]])
+        if not queue:
+            time = arrivals.next[1]  # 沒有可執行的行程，跳到下一個到達事件
+            continue
+
+        entry = queue.popleft()
+        remaining = entry[1]
+        run = min(quantum, remaining)
+        if not queue:
+            # 只有自己在跑：連續的 quantum 到期事件之間不會有人插隊，
+            # 直接跳到下一個到達時間之後的第一個 quantum 邊界或完成時間
+            next_arrival = arrivals.next[1] if arrivals.next is not None else None
+            if next_arrival is None or time + remaining <= next_arrival:
+                run = remaining
+            elif next_arrival > time + quantum:
+                slices = -(-(next_arrival - time) // quantum)
+                run = min(slices * quantum, remaining)
+        start = time
+        time += run
+        entry[1] = remaining - run
+
+        # 先把執行期間到達的行程排進佇列，再把被搶佔的行程放回隊尾
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            queue.append([job, job[2]])
+        if entry[1] > 0:
+            queue.append(entry)
+        yield entry[0], start, time, entry[1] <= 0
+
+
+def sjf_events(arrivals):
+    ready = []  # heap of (burst, arrival rank, job)
+    time = 0
+
+    while arrivals.next is not None or ready:
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            heapq.heappush(ready, (job[2], arrivals.count, job))
+        if not ready:
+            time = arrivals.next[1]
+            continue
+        job = heapq.heappop(ready)[2]
+        start = time
+        time += job[2]
+        yield job, start, time, True
+
+
+def srtf_events(arrivals):
+    ready = []  # heap of (remaining, arrival rank, job)
+    time = 0
+    current = None  # [remaining, arrival rank, job]
+
+    while arrivals.next is not None or ready or current is not None:
+        if current is None:
+            if not ready:
+                time = max(time, arrivals.next[1])
+                while arrivals.next is not None and arrivals.next[1] <= time:
+                    job = arrivals.pop()
+                    heapq.heappush(ready, (job[2], arrivals.count, job))
+            current = list(heapq.heappop(ready))
+
+        # 執行到「完成」或「下一個到達」兩個事件中較早的那一個
+        next_arrival = arrivals.next[1] if arrivals.next is not None else None
+        if next_arrival is None or time + current[0] <= next_arrival:
+            end = time + current[0]
+        else:
+            end = next_arrival
+        start = time
+        current[0] -= end - time
+        time = end
+        finished = current[0] == 0
+        job = current[2]
+        if finished:
+            current = None
+
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            arrived = arrivals.pop()
+            heapq.heappush(ready, (arrived[2], arrivals.count, arrived))
+
+        # 只有嚴格更短的剩餘時間才會搶佔目前行程
+        if current is not None and ready and ready[0][0] < current[0]:
+            heapq.heappush(ready, tuple(current))
+            current = None
+        yield job, start, end, finished
+
+
+def interrupt_sjf_events(arrivals, interrupted=None, interrupt_time=2):
+    """SJF where marked jobs are interrupted once after interrupt_time units.
+
+    Headless version of exam/midterm/interruptSJF: interrupted(pid) picks
+    the jobs, and an interrupted job goes back to the head of the ready
+    queue and runs to completion next.
+    """
+    ready = []  # heap of (burst, arrival rank, job)
+    resumed = None  # (job, remaining) 被中斷後排在 ready queue 最前面
+    time = 0
+
+    while arrivals.next is not None or ready or resumed is not None:
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            heapq.heappush(ready, (job[2], arrivals.count, job))
+        if resumed is not None:
+            job, remaining = resumed
+            resumed = None
+            start = time
+            time += remaining
+            yield job, start, time, True
+            continue
+        if not ready:
+            time = arrivals.next[1]
+            continue
+        job = heapq.heappop(ready)[2]
+        start = time
+        if interrupted is not None and job[2] > interrupt_time and interrupted(job[0]):
+            time += interrupt_time
+            resumed = (job, job[2] - interrupt_time)
+            yield job, start, time, False
+        else:
+            time += job[2]
+            yield job, start, time, True
+
+
+def mlfq_events(arrivals, quanta=(2, 4, 8), boost=50):
+    """Multi-level feedback queue.
+
+    New jobs enter level 0; a job that uses up the quantum of its level
+    drops one level (the last level is round robin). A job on a lower level
+    is preempted when a new job arrives, keeps its place at the head of its
+    level and the rest of its allotment. Every boost time units all jobs go
+    back to level 0 (None disables the boost).
+    """
+    if not quanta or min(quanta) <= 0:
+        raise ValueError("quanta must be positive")
+    levels = [deque() for _ in quanta]  # [job, remaining, level, used, epoch]
+    last = len(quanta) - 1
+    waiting = 0
+    epoch = 0
+    next_boost = boost if boost else None
+    time = 0
+
+    while arrivals.next is not None or waiting:
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            levels[0].append([job, job[2], 0, 0, epoch])
+            waiting += 1
+        if next_boost is not None and time >= next_boost:
+            # 提升：整個 deque 接到第 0 層（C 速度），等級與已用配額在取出時依 epoch 才重設
+            epoch += 1
+            next_boost += ((time - next_boost) // boost + 1) * boost
+            for queue in levels[1:]:
+                levels[0].extend(queue)
+                queue.clear()
+        if not waiting:
+            time = arrivals.next[1]
+            continue
+
+        level = 0
+        while not levels[level]:
+            level += 1
+        entry = levels[level].popleft()
+        waiting -= 1
+        if entry[4] != epoch:
+            entry[2], entry[3], entry[4] = 0, 0, epoch
+        level = entry[2]
+        run = min(quanta[level] - entry[3], entry[1])
+        if level and arrivals.next is not None and arrivals.next[1] < time + run:
+            run = arrivals.next[1] - time  # 較高層的新行程到達時搶佔
+        start = time
+        time += run
+        entry[1] -= run
+        entry[3] += run
+
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            levels[0].append([job, job[2], 0, 0, epoch])
+            waiting += 1
+        if entry[1] > 0:
+            if entry[4] != epoch:  # 執行期間發生過提升
+                entry[2], entry[3], entry[4] = 0, 0, epoch
+                levels[0].append(entry)
+            elif entry[3] >= quanta[level]:
+                entry[2], entry[3] = min(level + 1, last), 0
+                levels[entry[2]].append(entry)
+            else:
+                levels[level].appendleft(entry)
+            waiting += 1
+        yield entry[0], start, time, entry[1] <= 0
+
+
+NICE_0_WEIGHT = 1024
+
+
+def nice_to_weight(nice):
+    """Linux-style load weight: each nice step is about 10% CPU."""
+    return NICE_0_WEIGHT / 1.25 ** nice
+
+
+def cfs_events(arrivals, nice=None, sched_latency=6, min_granularity=1):
+    """Completely-fair-style scheduling on a vruntime heap.
+
+    The job with the smallest virtual runtime runs for its share of
+    sched_latency (weight / total weight, at least min_granularity); its
+    vruntime grows by the time it ran scaled by NICE_0_WEIGHT / weight.
+    New jobs start at the current minimum vruntime. nice(job id) gives a
+    job's nice value (default 0).
+    """
+    ready = []  # heap of (vruntime, arrival rank, job, remaining, weight)
+    total_weight = 0.0
+    min_vruntime = 0.0
+    time = 0
+
+    while arrivals.next is not None or ready:
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            job = arrivals.pop()
+            weight = nice_to_weight(nice(job[0])) if nice is not None else NICE_0_WEIGHT
+            heapq.heappush(ready, (min_vruntime, arrivals.count, job, job[2], weight))
+            total_weight += weight
+        if not ready:
+            time = arrivals.next[1]
+            continue
+
+        vruntime, rank, job, remaining, weight = heapq.heappop(ready)
+        min_vruntime = max(min_vruntime, vruntime)
+        slice_ = max(min_granularity, int(sched_latency * weight / total_weight))
+        if not ready:
+            # 只剩自己：一直跑到完成或下一個行程到達
+            slice_ = remaining if arrivals.next is None else max(slice_, arrivals.next[1] - time)
+        run = min(slice_, remaining)
+        start = time
+        time += run
+        remaining -= run
+        if remaining > 0:
+            heapq.heappush(ready, (vruntime + run * NICE_0_WEIGHT / weight, rank, job, remaining, weight))
+        else:
+            total_weight -= weight
+        yield job, start, time, remaining <= 0
+
+
+def priority_events(arrivals, priority=None, aging=None, preemptive=False):
+    """Priority scheduling (smaller number = higher priority) with linear aging.
+
+    With aging, a waiting job's effective priority drops by one every aging
+    time units: base - (now - enqueued) / aging. Every job ages at the same
+    rate, so ordering by base * aging + enqueued never changes while the
+    job waits and a plain heap gives O(log n) dispatch.
+    """
+    ready = []  # heap of (key, arrival rank, job, remaining)
+    time = 0
+    current = None  # [key, rank, job, remaining]
+
+    def key(job, now):
+        base = priority(job[0]) if priority is not None else 0
+        return base * aging + now if aging else base
+
+    while arrivals.next is not None or ready or current is not None:
+        if current is None:
+            if not ready:
+                time = max(time, arrivals.next[1])
+            while arrivals.next is not None and arrivals.next[1] <= time:
+                job = arrivals.pop()
+                heapq.heappush(ready, (key(job, job[1]), arrivals.count, job, job[2]))
+            current = list(heapq.heappop(ready))
+
+        next_arrival = arrivals.next[1] if arrivals.next is not None else None
+        if not preemptive or next_arrival is None or time + current[3] <= next_arrival:
+            end = time + current[3]
+        else:
+            end = next_arrival
+        start = time
+        current[3] -= end - time
+        time = end
+        job = current[2]
+        finished = current[3] == 0
+        if finished:
+            current = None
+
+        while arrivals.next is not None and arrivals.next[1] <= time:
+            arrived = arrivals.pop()
+            heapq.heappush(ready, (key(arrived, arrived[1]), arrivals.count, arrived, arrived[2]))
+
+        if current is not None and ready:
+            current[0] = key(job, time)  # 被搶佔就從現在開始重新老化
+            if ready[0][0] < current[0]:
+                heapq.heappush(ready, tuple(current))
+                current = None
+        yield job, start, end, finished
+
+
+EVENTS = {
+    "FCFS": fcfs_events,
+    "RR": round_robin_events,
+    "SJF": sjf_events,
+    "SRTF": srtf_events,
+    "INTERRUPT_SJF": interrupt_sjf_events,
+    "MLFQ": mlfq_events,
+    "CFS": cfs_events,
+    "PRIORITY": priority_events,
+}
+
+
+def _run(policy, events, jobs, key=None, **options):
+    probe = instrument.probe("engine")
+    if probe is not None:
+        return _run_probed(probe, policy, events, jobs, key, **options)
+    pids, arrival, burst = _unpack(jobs)
+    result = ScheduleResult(policy, pids, arrival, burst)
+    n = len(pids)
+    # 依到達時間排序（穩定排序，同時到達時維持輸入順序）
+    order = sorted(range(n), key=key(arrival, burst) if key else arrival.__getitem__)
+    arrivals = Arrivals((i, arrival[i], burst[i]) for i in order)
+    record, finish = result.run, result.finish
+    for job, start, end, finished in events(arrivals, **options):
+        record(job[0], start, end)
+        if finished:
+            finish(job[0], end)
+    return result
+
+
+def _run_probed(probe, policy, events, jobs, key=None, **options):
+    """_run() with every phase timed; the policy's time is what passes between its events."""
+    clock = time.perf_counter
+    run_start = clock()
+    pids, arrival, burst = _unpack(jobs)
+    result = ScheduleResult(policy, pids, arrival, burst)
+    n = len(pids)
+    start = clock()
+    order = sorted(range(n), key=key(arrival, burst) if key else arrival.__getitem__)
+    probe.close_span("engine.sort", start, "engine", {"jobs": n})
+    arrivals = Arrivals((i, arrival[i], burst[i]) for i in order)
+    record, finish, observe, gauge, tick = result.run, result.finish, probe.observe, probe.gauge, probe.tick
+    done = 0
+    before = clock()
+    for job, start, end, finished in events(arrivals, **options):
+        now = clock()
+        observe("engine.policy", now - before)
+        record(job[0], start, end)
+        if finished:
+            finish(job[0], end)
+            done += 1
+        gauge("engine.ready", arrivals.count - done, now)  # 已到達、還沒完成（含正在跑的）
+        tick(now)
+        before = clock()
+        observe("engine.record", before - now)
+    probe.count("engine.dispatches", result.dispatches)
+    probe.count("engine.context_switches", result.context_switches)
+    probe.count("engine.jobs", n)
+    probe.close_span(f"engine.run {policy}", run_start, "engine",
+                     {"jobs": n, "dispatches": result.dispatches, "context_switches": result.context_switches})
+    return result
+
+
+def fcfs(jobs):
+    return _run("FCFS", fcfs_events, jobs)
+
+
+def round_robin(jobs, quantum=3):
+    return _run(f"RR (q={quantum})", round_robin_events, jobs, quantum=quantum)
+
+
+def sjf(jobs):
+    return _run("SJF", sjf_events, jobs, key=lambda arrival, burst: lambda i: (arrival[i], burst[i]))
+
+
+def srtf(jobs):
+    return _run("SRTF", srtf_events, jobs)
+
+
+def interrupt_sjf(jobs, interrupted=(), interrupt_time=2):
+    """interrupted is a collection of pids or a predicate on the pid."""
+    jobs = list(jobs)
+    pids = _unpack(jobs)[0]
+    wanted = interrupted if callable(interrupted) else set(interrupted).__contains__
+    return _run("Interrupt SJF", interrupt_sjf_events, jobs,
+                key=lambda arrival, burst: lambda i: (arrival[i], burst[i]),
+                interrupted=lambda i: wanted(pids[i]), interrupt_time=interrupt_time)
+
+
+def _per_job(jobs, values, attr, default):
+    """values[pid], values(pid) or the job's attr, as a lookup by job index."""
+    pids = _unpack(jobs)[0]
+    if callable(values):
+        table = [values(pid) for pid in pids]
+    elif values is not None:
+        table = [values.get(pid, default) for pid in pids]
+    else:
+        table = [getattr(job, attr, default) if not isinstance(job, (tuple, list)) else default for job in jobs]
+    return table.__getitem__
+
+
+def mlfq(jobs, quanta=(2, 4, 8), boost=50):
+    return _run(f"MLFQ (q={'/'.join(map(str, quanta))})", mlfq_events, jobs, quanta=tuple(quanta), boost=boost)
+
+
+def cfs(jobs, nice=None, sched_latency=6, min_granularity=1):
+    """nice is a {pid: nice} mapping, a function of the pid, or None to use job.nice (default 0)."""
+    jobs = list(jobs)
+    return _run("CFS", cfs_events, jobs, nice=_per_job(jobs, nice, "nice", 0),
+                sched_latency=sched_latency, min_granularity=min_granularity)
+
+
+def priority(jobs, priorities=None, aging=10, preemptive=False):
+    """priorities is a {pid: priority} mapping, a function of the pid, or None to use job.priority."""
+    jobs = list(jobs)
+    name = "Priority" + (" (preemptive)" if preemptive else "")
+    return _run(name, priority_events, jobs, priority=_per_job(jobs, priorities, "priority", 0),
+                aging=aging, preemptive=preemptive)
+
+
+POLICIES = {
+    "FCFS": fcfs,
+    "RR": round_robin,
+    "SJF": sjf,
+    "SRTF": srtf,
+    "INTERRUPT_SJF": interrupt_sjf,
+    "MLFQ": mlfq,
+    "CFS": cfs,
+    "PRIORITY": priority,
+}
+
+
+def simulate(policy, jobs, **options):
+    """Run one scheduling policy by name and return its ScheduleResult."""
+    try:
+        run = POLICIES[policy.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown scheduling policy: {policy}") from None
+    return run(jobs, **options)
@@ -0,0 +1,460 @@
+from collections import OrderedDict
+
+from core.allocator import make_allocator
+from core.hardware import Operation
+
+# 區塊檔案系統：inode + extent + 目錄索引，建在 core.hardware.Disk 上。
+# 讀取先查 page cache（LRU 或 ARC），循序讀時預讀；寫入只把頁標成 dirty，
+# 由 write-back 定時或超過 dirty_limit 時依實體區塊排序、合併成連續的大寫入。
+# 所有時間都走 Disk 的虛擬時鐘；read / write 回傳 Operation。
+
+
+class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.pages = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.pages
+
+    def __len__(self):
+        return len(self.pages)
+
+    def lookup(self, key):
+        if key in self.pages:
+            self.pages.move_to_end(key)
+            return True
+        return False
+
+    def insert(self, key):
+        """Add key; returns the evicted keys."""
+        self.pages[key] = None
+        self.pages.move_to_end(key)
+        evicted = []
+        while len(self.pages) > self.capacity:
+            evicted.append(self.pages.popitem(last=False)[0])
+        return evicted
+
+    def discard(self, key):
+        self.pages.pop(key, None)
+
+
+class ARCCache:
+    """Adaptive Replacement Cache: recency list t1, frequency list t2 and their ghosts b1 / b2."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.p = 0  # t1 的目標大小
+        self.t1, self.t2, self.b1, self.b2 = OrderedDict(), OrderedDict(), OrderedDict(), OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.t1 or key in self.t2
+
+    def __len__(self):
+        return len(self.t1) + len(self.t2)
+
+    def lookup(self, key):
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = None
+            return True
+        if key in self.t2:
+            self.t2.move_to_end(key)
+            return True
+        return False
+
+    def _replace(self, in_b2):
+        if self.t1 and (len(self.t1) > self.p or (in_b2 and len(self.t1) == self.p)):
+            key = self.t1.popitem(last=False)[0]
+            self.b1[key] = None
+        else:
+            key = self.t2.popitem(last=False)[0]
+            self.b2[key] = None
+        return key
+
+    def insert(self, key):
+        if key in self:
+            self.lookup(key)
+            return []
+        c = self.capacity
+        evicted = []
+        if key in self.b1:
+            self.p = min(c, self.p + max(len(self.b2) // len(self.b1), 1))
+            del self.b1[key]
+            if len(self) >= c:
+                evicted.append(self._replace(False))
+            self.t2[key] = None
+            return evicted
+        if key in self.b2:
+            self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+            del self.b2[key]
+            if len(self) >= c:
+                evicted.append(self._replace(True))
+            self.t2[key] = None
+            return evicted
+        if len(self.t1) + len(self.b1) >= c:
+            if len(self.t1) < c:
+                self.b1.popitem(last=False)
+                if len(self) >= c:
+                    evicted.append(self._replace(False))
+            else:
+                evicted.append(self.t1.popitem(last=False)[0])
+        elif len(self) + len(self.b1) + len(self.b2) >= c:
+            if len(self) + len(self.b1) + len(self.b2) >= 2 * c:
+                self.b2.popitem(last=False)
+            if len(self) >= c:
+                evicted.append(self._replace(False))
+        self.t1[key] = None
+        return evicted
+
+    def discard(self, key):
+        for part in (self.t1, self.t2, self.b1, self.b2):
+            part.pop(key, None)
+
+
+CACHES = {"LRU": LRUCache, "ARC": ARCCache}
+
+
+class Inode:
+    __slots__ = ("number", "size", "extents", "blocks", "mtime", "next_read", "readahead")
+
+    def __init__(self, number, now):
+        self.number = number
+        self.size = 0  # bytes
+        self.extents = []  # [(first physical block, length), ...]
+        self.blocks = 0
+        self.mtime = now
+        self.next_read = 0  # 上一次讀到哪個邏輯區塊，用來判斷循序讀
+        self.readahead = 0  # 目前的預讀視窗（區塊數）
+
+    def physical(self, index):
+        for start, length in self.extents:
+            if index < length:
+                return start + index
+            index -= length
+        raise IndexError("block beyond the end of the file")
+
+
+def _join(clock, name, kind, size, ops):
+    """One Operation that finishes when every op in ops has finished."""
+    parent = Operation(clock, name, kind, size)
+    pending = [op for op in ops if not op.done]
+    if not pending:
+        parent.finished = clock.now
+        return parent
+    remaining = [len(pending)]
+
+    def child_done(_):
+        remaining[0] -= 1
+        if not remaining[0]:
+            parent._finish(clock.now)
+
+    for op in pending:
+        op.then(child_done)
+    return parent
+
+
+class FileSystem:
+    def __init__(self, disk, block_size=4096, cache_pages=4096, cache_policy="LRU", readahead=32, dirty_limit=1024,
+                 writeback_interval=5.0, allocator="best_fit"):
+        self.disk = disk
+        self.clock = disk.clock
+        self.block_size = block_size
+        self.block_mb = block_size / (1024 * 1024)
+        total_blocks = int(disk.total_storage / self.block_mb)
+        self.space = make_allocator(allocator, total_blocks, measure=False)  # 實體區塊配置（連續的 extent）
+        self.extent_owner = {}  # extent 起點 -> inode（釋放時用）
+        try:
+            self.cache = CACHES[cache_policy.upper()](cache_pages)
+        except KeyError:
+            raise ValueError(f"Unknown page cache policy: {cache_policy}") from None
+        self.max_readahead = readahead
+        self.dirty_limit = dirty_limit
+        self.writeback_interval = writeback_interval
+        self.directory = {}  # path -> inode number
+        self.inodes = {}
+        self.next_inode = 1
+        self.dirty = set()  # (inode, 邏輯區塊)
+        self.in_flight = {}  # (inode, 邏輯區塊) -> 讀取中的 Operation
+        self.descriptors = {}  # fd -> [path, position, pid]
+        self.next_fd = 3
+        self._flush_timer = None
+        self.counters = {
+            "reads": 0, "writes": 0, "read_bytes": 0, "write_bytes": 0,
+            "cache_hits": 0, "cache_misses": 0, "readahead_pages": 0, "readahead_hits": 0,
+            "disk_reads": 0, "disk_read_blocks": 0, "disk_writes": 0, "disk_write_blocks": 0,
+            "dirty_pages_written": 0, "read_time": 0.0, "write_time": 0.0,
+        }
+        self._prefetched = set()
+
+    # --- 目錄與 inode ---
+
+    def create(self, path, size=0):
+        if path in self.directory:
+            raise FileExistsError(path)
+        inode = Inode(self.next_inode, self.clock.now)
+        self.next_inode += 1
+        self.inodes[inode.number] = inode
+        self.directory[path] = inode.number
+        if size:
+            self._grow(inode, size)
+        return inode
+
+    def lookup(self, path):
+        try:
+            return self.inodes[self.directory[path]]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def exists(self, path):
+        return path in self.directory
+
+    def stat(self, path):
+        inode = self.lookup(path)
+        return {"inode": inode.number, "size": inode.size, "blocks": inode.blocks, "extents": len(inode.extents),
+                "mtime": inode.mtime}
+
+    def listdir(self, prefix="/"):
+        prefix = prefix.rstrip("/") + "/"
+        return sorted(path for path in self.directory if path.startswith(prefix) or prefix == "/")
+
+    def unlink(self, path):
+        inode = self.lookup(path)
+        del self.directory[path]
+        for index in range(inode.blocks):
+            key = (inode.number, index)
+            self.cache.discard(key)
+            self.dirty.discard(key)
+        for start, _ in inode.extents:
+            self.space.free(start)
+            del self.extent_owner[start]
+        del self.inodes[inode.number]
+
+    def _grow(self, inode, size):
+        """Allocate blocks so the file holds size bytes; prefers one contiguous extent."""
+        needed = -(-size // self.block_size) - inode.blocks
+        while needed > 0:
+            chunk = needed
+            start = self.space.alloc(chunk)
+            while start is None and chunk > 1:  # 沒有夠大的連續空間就切小塊
+                chunk //= 2
+                start = self.space.alloc(chunk)
+            if start is None:
+                raise OSError("No space left on device")
+            inode.extents.append((start, chunk))
+            self.extent_owner[start] = inode.number
+            inode.blocks += chunk
+            needed -= chunk
+        inode.size = max(inode.size, size)
+
+    # --- 檔案描述子與行程 ---
+
+    def open(self, path, mode="r", process=None):
+        if path not in self.directory:
+            if "w" not in mode and "a" not in mode:
+                raise FileNotFoundError(path)
+            self.create(path)
+        position = self.lookup(path).size if "a" in mode else 0
+        fd = self.next_fd
+        self.next_fd += 1
+        self.descriptors[fd] = [path, position, getattr(process, "pid", None)]
+        if process is not None and path not in process.open_files:
+            process.open_files = list(process.open_files) + [path]
+        return fd
+
+    def close(self, fd, process=None):
+        path, _, _ = self.descriptors.pop(fd)
+        if process is not None and path in process.open_files:
+            process.open_files = [name for name in process.open_files if name != path]
+
+    def attach(self, process, size=64 * 1024):
+        """Create (if needed) and open every file listed in process.open_files; returns the fds."""
+        fds = []
+        for path in list(process.open_files):
+            if path not in self.directory:
+                self.create(path, size)
+            fds.append(self.open(path, "r+", process))
+        return fds
+
+    def _resolve(self, target, offset):
+        if isinstance(target, int):
+            entry = self.descriptors[target]
+            path = entry[0]
+            if offset is None:
+                offset = entry[1]
+            return path, offset, entry
+        return target, offset or 0, None
+
+    # --- 讀寫 ---
+
+    def read(self, target, size, offset=None):
+        """Read size bytes from a path or fd; returns an Operation that finishes when the data is in memory."""
+        path, offset, entry = self._resolve(target, offset)
+        inode = self.lookup(path)
+        size = max(0, min(size, inode.size - offset))
+        self.counters["reads"] += 1
+        self.counters["read_bytes"] += size
+        if entry is not None:
+            entry[1] = offset + size
+        if not size:
+            return _join(self.clock, path, "fs-read", 0, [])
+        first, last = offset // self.block_size, (offset + size - 1) // self.block_size
+        waits, missing = [], []
+        for index in range(first, last + 1):
+            key = (inode.number, index)
+            if self.cache.lookup(key) or key in self.in_flight:
+                self.counters["cache_hits"] += 1  # 還在讀取中的頁也算命中，等它完成就好
+                if key in self.in_flight:
+                    waits.append(self.in_flight[key])
+                if key in self._prefetched:
+                    self.counters["readahead_hits"] += 1
+                    self._prefetched.discard(key)
+            else:
+                self.counters["cache_misses"] += 1
+                missing.append(index)
+        waits.extend(self._fetch(inode, missing))
+        self._readahead(inode, first, last)
+        op = _join(self.clock, path, "fs-read", size, waits)
+        start = self.clock.now
+        op.then(lambda done: self._add_time("read_time", done.finished - start))
+        return op
+
+    def _add_time(self, counter, elapsed):
+        self.counters[counter] += elapsed
+
+    def _readahead(self, inode, first, last):
+        # 連續讀同一個檔案時預讀視窗加倍（最多 max_readahead），不連續就關掉
+        if first == inode.next_read and self.max_readahead:
+            inode.readahead = min(max(inode.readahead * 2, 4), self.max_readahead)
+        else:
+            inode.readahead = 0
+        inode.next_read = last + 1
+        if not inode.readahead:
+            return
+        ahead = [index for index in range(last + 1, min(last + 1 + inode.readahead, inode.blocks))
+                 if (inode.number, index) not in self.cache and (inode.number, index) not in self.in_flight]
+        if ahead:
+            self.counters["readahead_pages"] += len(ahead)
+            self._prefetched.update((inode.number, index) for index in ahead)
+            self._fetch(inode, ahead)
+
+    def _runs(self, inode, indexes):
+        """Group logical blocks into runs that are contiguous on disk."""
+        runs = []
+        for index in sorted(indexes):
+            block = inode.physical(index)
+            if runs and runs[-1][1] + runs[-1][2] == block and runs[-1][0] + runs[-1][2] == index:
+                runs[-1][2] += 1
+            else:
+                runs.append([index, block, 1])
+        return runs
+
+    def _fetch(self, inode, indexes):
+        ops = []
+        for index, block, count in self._runs(inode, indexes):
+            op = self.disk.io("read", count * self.block_mb, block, f"inode {inode.number}")
+            self.counters["disk_reads"] += 1
+            self.counters["disk_read_blocks"] += count
+            keys = [(inode.number, i) for i in range(index, index + count)]
+            for key in keys:
+                self.in_flight[key] = op
+            op.then(lambda _, keys=keys: self._filled(keys))
+            ops.append(op)
+        return ops
+
+    def _filled(self, keys):
+        for key in keys:
+            if self.in_flight.pop(key, None) is not None and key[0] in self.inodes:
+                self._cache_insert(key)
+
+    def _cache_insert(self, key):
+        for victim in self.cache.insert(key):
+            self._prefetched.discard(victim)
+            if victim in self.dirty:  # dirty 頁被擠出去時要先寫回
+                self._write_back([victim])
+
+    def write(self, target, size, offset=None):
+        """Write size bytes; data lands in the page cache as dirty pages (write-back)."""
+        path, offset, entry = self._resolve(target, offset)
+        inode = self.lookup(path)
+        self.counters["writes"] += 1
+        self.counters["write_bytes"] += size
+        if entry is not None:
+            entry[1] = offset + size
+        if offset + size > inode.blocks * self.block_size:
+            self._grow(inode, offset + size)
+        inode.size = max(inode.size, offset + size)
+        inode.mtime = self.clock.now
+        waits = []
+        first, last = offset // self.block_size, (offset + size - 1) // self.block_size
+        for index in range(first, last + 1):
+            key = (inode.number, index)
+            partial = (index == first and offset % self.block_size) or \
+                      (index == last and (offset + size) % self.block_size and offset + size < inode.size)
+            if partial and key not in self.cache and key not in self.in_flight and index < inode.blocks:
+                waits.extend(self._fetch(inode, [index]))  # 部分覆寫要先讀進來（read-modify-write）
+            self.dirty.add(key)
+            if key in self.cache:
+                self.cache.lookup(key)
+            else:
+                self._cache_insert(key)
+        if len(self.dirty) > self.dirty_limit:
+            self.flush()
+        elif self._flush_timer is None and self.dirty:
+            self._flush_timer = self.clock.schedule(self.writeback_interval, self._timer_flush)
+        op = _join(self.clock, path, "fs-write", size, waits)
+        start = self.clock.now
+        op.then(lambda done: self._add_time("write_time", done.finished - start))
+        return op
+
+    def _timer_flush(self):
+        self._flush_timer = None
+        self.flush()
+
+    def _write_back(self, keys):
+        by_inode = {}
+        for key in keys:
+            self.dirty.discard(key)
+            if key[0] in self.inodes:
+                by_inode.setdefault(key[0], []).append(key[1])
+        ops = []
+        for number, indexes in by_inode.items():
+            inode = self.inodes[number]
+            for _, block, count in self._runs(inode, indexes):  # 相鄰的 dirty 頁合併成一次寫入
+                ops.append(self.disk.io("write", count * self.block_mb, block, f"inode {number}"))
+                self.counters["disk_writes"] += 1
+                self.counters["disk_write_blocks"] += count
+                self.counters["dirty_pages_written"] += count
+        return ops
+
+    def flush(self):
+        """Write every dirty page back; returns an Operation for the whole flush."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        return _join(self.clock, "flush", "fs-flush", len(self.dirty), self._write_back(list(self.dirty)))
+
+    def fsync(self, target):
+        path, _, _ = self._resolve(target, None)
+        number = self.lookup(path).number
+        keys = [key for key in self.dirty if key[0] == number]
+        return _join(self.clock, path, "fs-fsync", len(keys), self._write_back(keys))
+
+    sync = flush
+
+    def stats(self):
+        c = dict(self.counters)
+        lookups = c["cache_hits"] + c["cache_misses"]
+        elapsed = self.clock.now
+        c.update({
+            "files": len(self.directory),
+            "cached_pages": len(self.cache),
+            "dirty_pages": len(self.dirty),
+            "hit_ratio": c["cache_hits"] / lookups if lookups else 0.0,
+            "write_coalescing": c["disk_write_blocks"] / c["disk_writes"] if c["disk_writes"] else 0.0,
+            "avg_read_latency": c["read_time"] / c["reads"] if c["reads"] else 0.0,
+            "avg_write_latency": c["write_time"] / c["writes"] if c["writes"] else 0.0,
+            "throughput_mb_s": (c["read_bytes"] + c["write_bytes"]) / (1024 * 1024) / elapsed if elapsed else 0.0,
+            "disk_utilization": self.disk.utilization(),
+        })
+        return c
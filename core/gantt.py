@@ -0,0 +1,209 @@
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+# 增量式甘特圖：每個 (pid, 顏色) 只有一個 PolyCollection，每一步只更新有變動的那幾個，
+# 不再 ax.clear() 後重畫所有 barh/text。區段數超過螢幕解析度時會先合併（decimate）。
+
+
+def decimate(starts, ends, resolution):
+    """Merge bars separated by gaps shorter than resolution (one pixel of time)."""
+    if len(starts) < 2 or resolution <= 0:
+        return starts, ends
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] >= resolution) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(starts) - 1]))
+    return starts[first], ends[last]
+
+
+def _verts(starts, ends, y, height):
+    low, high = y - height / 2, y + height / 2
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0] = np.column_stack((starts, np.full(len(starts), low)))
+    verts[:, 1] = np.column_stack((ends, np.full(len(starts), low)))
+    verts[:, 2] = np.column_stack((ends, np.full(len(starts), high)))
+    verts[:, 3] = np.column_stack((starts, np.full(len(starts), high)))
+    return verts
+
+
+class GanttRenderer:
+    def __init__(self, ax, bar_height=0.8, label_limit=50):
+        self.ax = ax
+        self.bar_height = bar_height
+        self.label_limit = label_limit  # 區段少於這個數量時才在長條上寫 pid
+        self.rows = {}  # pid -> y
+        self.bars = {}  # (pid, color) -> ([starts], [ends])
+        self.collections = {}
+        self.labels = []
+        self.dirty = set()
+        self.count = 0
+        self.t_min = None
+        self.t_max = None
+        self._seen = 0
+
+    def _color(self, pid, color):
+        if color is not None:
+            return color
+        return colormaps["tab10"](self.rows[pid] % 10)
+
+    def add(self, pid, start, end, color=None):
+        """Add one segment; touching segments of the same pid and color are merged."""
+        if pid not in self.rows:
+            self.rows[pid] = len(self.rows)
+        key = (pid, color)
+        starts, ends = self.bars.setdefault(key, ([], []))
+        if ends and ends[-1] == start:
+            ends[-1] = end
+        else:
+            starts.append(start)
+            ends.append(end)
+            self.count += 1
+        self.dirty.add(key)
+        self.t_min = start if self.t_min is None else min(self.t_min, start)
+        self.t_max = end if self.t_max is None else max(self.t_max, end)
+
+    def extend(self, schedule, color=None):
+        """Add the entries of a growing schedule list that were not seen yet."""
+        for item in schedule[self._seen:]:
+            self.add(item[0], item[1], item[2], item[3] if len(item) > 3 else color)
+        self._seen = len(schedule)
+
+    def _resolution(self):
+        width = self.ax.get_window_extent().width or 1
+        return (self.t_max - self.t_min) / width if self.t_max is not None else 0
+
+    def draw(self, title=None):
+        if self.t_max is None:
+            return
+        resolution = self._resolution() if self.count > self.ax.get_window_extent().width else 0
+        for key in self.dirty:
+            pid, color = key
+            starts, ends = decimate(np.asarray(self.bars[key][0], float), np.asarray(self.bars[key][1], float), resolution)
+            verts = _verts(starts, ends, self.rows[pid], self.bar_height)
+            collection = self.collections.get(key)
+            if collection is None:
+                collection = PolyCollection(verts, facecolors=self._color(pid, color), edgecolors="none")
+                self.collections[key] = self.ax.add_collection(collection)
+            else:
+                collection.set_verts(verts)
+        self.dirty.clear()
+
+        for text in self.labels:
+            text.remove()
+        self.labels = []
+        if self.count <= self.label_limit:
+            for (pid, _), (starts, ends) in self.bars.items():
+                for start, end in zip(starts, ends):
+                    self.labels.append(self.ax.text((start + end) / 2, self.rows[pid], pid, ha='center', va='center',
+                                                    color='white', fontsize=12, fontweight='bold'))
+
+        self.ax.set_xlim(self.t_min, self.t_max if self.t_max > self.t_min else self.t_min + 1)
+        self.ax.set_ylim(-0.5, len(self.rows) - 0.5)
+        if len(self.rows) <= 100:  # pid 太多時改用預設刻度，避免上萬個 tick label
+            self.ax.set_yticks(list(self.rows.values()), [str(pid) for pid in self.rows])
+        self.ax.set_xlabel("Time")
+        self.ax.set_ylabel("Processes")
+        if title is not None:
+            self.ax.set_title(title)
+        self.ax.figure.canvas.draw_idle()
+
+
+def _window_segments(source, start, end):
+    """(pid, start, end, color) tuples of source clipped to [start, end)."""
+    if hasattr(source, "window"):  # core.trace.TraceReader
+        records = source.window(start, end)
+        colors = np.where(records["flags"] != 0, "red", None)
+        return [(source.label(pid), max(s, start), min(e, end), color)
+                for pid, s, e, color in zip(records["pid"].tolist(), records["start"].tolist(), records["end"].tolist(), colors)]
+    segments = []
+    for item in source:
+        pid, s, e = item[:3]
+        if e > start and s < end:
+            segments.append((pid, max(s, start), min(e, end), item[3] if len(item) > 3 else None))
+    return segments
+
+
+def _draw_dense(ax, rows, starts, ends, flags, title):
+    """One PolyCollection for every bar; used when there are too many pids for one collection each."""
+    order = np.lexsort((starts, rows))
+    rows, starts, ends, flags = rows[order], starts[order], ends[order], flags[order]
+    resolution = (ends.max() - starts.min()) / (ax.get_window_extent().width or 1)
+    # 同一列、同顏色且間隔小於一個像素的長條合併
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (rows[1:] != rows[:-1]) | (flags[1:] != flags[:-1]) | (starts[1:] - ends[:-1] >= resolution)
+    first = np.flatnonzero(keep)
+    merged_ends = np.maximum.reduceat(ends, first)
+    rows, starts, flags = rows[first], starts[first], flags[first]
+    verts = np.empty((len(first), 4, 2))
+    verts[:, :, 1] = rows[:, np.newaxis] + np.array([-0.4, -0.4, 0.4, 0.4])
+    verts[:, 0, 0] = verts[:, 3, 0] = starts
+    verts[:, 1, 0] = verts[:, 2, 0] = merged_ends
+    palette = np.array([colormaps["tab10"](i) for i in range(10)])
+    facecolors = np.where(flags[:, np.newaxis] != 0, np.array([1.0, 0.0, 0.0, 1.0]), palette[rows % 10])
+    ax.add_collection(PolyCollection(verts, facecolors=facecolors, edgecolors="none"))
+    ax.set_xlim(starts.min(), merged_ends.max())
+    ax.set_ylim(-0.5, rows.max() + 0.5)
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Processes")
+    ax.set_title(title)
+
+
+def render_window(source, path, start=None, end=None, title=None, width=16, height=None, dpi=100, dense_rows=200):
+    """Headless render of a time window to PNG/SVG (format from the path extension).
+
+    source is a schedule list of (pid, start, end[, color]) or a core.trace.TraceReader.
+    Windows with more than dense_rows processes are drawn as a single decimated collection.
+    An empty source or window gives an empty chart.
+    """
+    if start is None or end is None:
+        if hasattr(source, "time_range"):
+            t0, t1 = source.time_range
+        elif len(source):
+            t0 = min(item[1] for item in source)
+            t1 = max(item[2] for item in source)
+        else:
+            t0, t1 = 0, 0
+        start = t0 if start is None else start
+        end = t1 if end is None else end
+    title = title or f"Gantt Chart - {start:g} to {end:g}"
+
+    if hasattr(source, "window"):
+        records = source.window(start, end)
+        pids = records["pid"]
+        starts = np.maximum(records["start"], start)
+        ends = np.minimum(records["end"], end)
+        flags = records["flags"]
+    else:
+        segments = _window_segments(source, start, end)
+        pids = None
+
+    if pids is not None:
+        unique_pids, rows = np.unique(pids, return_inverse=True)
+        row_count = len(unique_pids)
+    else:
+        row_count = len({item[0] for item in segments})
+
+    fig = Figure(figsize=(width, height or max(3, 0.3 * min(row_count, dense_rows) + 1.5)), dpi=dpi)
+    ax = fig.add_subplot()
+    if row_count > dense_rows:
+        if pids is None:
+            index = {}
+            rows = np.array([index.setdefault(item[0], len(index)) for item in segments])
+            starts = np.array([item[1] for item in segments], float)
+            ends = np.array([item[2] for item in segments], float)
+            flags = np.array([0 if item[3] in (None, "blue") else 1 for item in segments])
+        _draw_dense(ax, rows, starts, ends, flags, title)
+    else:
+        if pids is not None:
+            segments = _window_segments(source, start, end)
+        renderer = GanttRenderer(ax)
+        for item in segments:
+            renderer.add(*item)
+        renderer.draw(title)
+        if not segments:
+            ax.set_title(title)
+            ax.set_xlabel("Time")
+            ax.set_ylabel("Processes")
+    fig.savefig(path)
+    return path
@@ -0,0 +1,437 @@
+import heapq
+import math
+import time
+from collections import deque
+
+from consts import (CPU_CLOCK, CPU_CORES, CPU_THREADS, DISK_LATENCY, NETWORK_BANDWIDTH, NETWORK_LATENCY, RAM_CAP, SSD,
+                    SSD_READ_SPEED, SSD_WRITE_SPEED)
+from core import instrument
+from core.allocator import make_allocator
+
+# 硬體元件的離散事件模型：所有 CPU / RAM / Disk / Network 共用一個虛擬時鐘（單位：秒），
+# 不再 time.sleep()；幾千個同時進行的讀寫 / 下載只要幾毫秒真實時間就能模擬完，
+# 同一個裝置上的操作平均分享頻寬（processor sharing），所以搶資源的情況也算得出來。
+# realtime=True 時時鐘會依 speed 倍率睡到事件時間，給 demo 用。
+
+
+class Event:
+    __slots__ = ("time", "callback", "args", "cancelled")
+
+    def __init__(self, time, callback, args):
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualClock:
+    def __init__(self, realtime=False, speed=1.0):
+        self.now = 0.0
+        self.realtime = realtime
+        self.speed = speed  # 虛擬秒 / 真實秒
+        self.events = []
+        self.processed = 0
+        self._seq = 0
+        self._wall_start = None
+        self._virtual_start = 0.0
+
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) delay virtual seconds from now; returns a cancellable Event."""
+        if delay < 0:
+            raise ValueError("cannot schedule an event in the past")
+        event = Event(self.now + delay, callback, args)
+        self._seq += 1
+        heapq.heappush(self.events, (event.time, self._seq, event))
+        return event
+
+    def step(self):
+        """Fire the next event; False when the queue is empty."""
+        while self.events:
+            when, _, event = heapq.heappop(self.events)
+            if event.cancelled:
+                continue
+            if self.realtime:
+                self._pace(when)
+            self.now = when
+            self.processed += 1
+            event.callback(*event.args)
+            return True
+        return False
+
+    def _pace(self, when):
+        if self._wall_start is None:
+            self._wall_start, self._virtual_start = time.perf_counter(), self.now
+        delay = self._wall_start + (when - self._virtual_start) / self.speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def run(self, until=None, stop=None):
+        """Run events up to virtual time until (or until stop() is true, or the queue empties)."""
+        probe = instrument.probe("clock")
+        if probe is not None:
+            return self._run_probed(probe, until, stop)
+        self._wall_start = None
+        while self.events:
+            if stop is not None and stop():
+                break
+            if until is not None and self.events[0][0] > until:
+                if self.realtime:
+                    self._pace(until)
+                self.now = until
+                break
+            self.step()
+        return self.now
+
+    def _run_probed(self, probe, until, stop):
+        """run() timing each callback by handler; in realtime mode also how late each event fires."""
+        clock = time.perf_counter
+        run_start = clock()
+        first_seq, first_processed, cancelled = self._seq, self.processed, 0
+        names = {}  # 處理函式 -> 計時器名稱
+        observe, gauge, tick = probe.observe, probe.gauge, probe.tick
+        self._wall_start = None
+        while self.events:
+            if stop is not None and stop():
+                break
+            if until is not None and self.events[0][0] > until:
+                if self.realtime:
+                    self._pace(until)
+                self.now = until
+                break
+            when, _, event = heapq.heappop(self.events)
+            if event.cancelled:
+                cancelled += 1
+                continue
+            if self.realtime:
+                self._pace(when)
+                observe("clock.lag", clock() - (self._wall_start + (when - self._virtual_start) / self.speed))
+            self.now = when
+            self.processed += 1
+            callback = event.callback
+            handler = getattr(callback, "__func__", callback)
+            name = names.get(handler)
+            if name is None:
+                name = names[handler] = "clock." + getattr(handler, "__qualname__", type(handler).__name__)
+            start = clock()
+            callback(*event.args)
+            now = clock()
+            observe(name, now - start)
+            gauge("clock.heap", len(self.events), now)
+            tick(now)
+        probe.count("clock.events", self.processed - first_processed)
+        probe.count("clock.heap_push", self._seq - first_seq)
+        probe.count("clock.heap_pop", self.processed - first_processed + cancelled)
+        probe.count("clock.cancelled", cancelled)
+        probe.close_span("clock.run", run_start, "clock", {"virtual_time": self.now})
+        return self.now
+
+
+class Operation:
+    """One hardware request; finished is None until the device completes it."""
+
+    __slots__ = ("clock", "name", "kind", "size", "submitted", "started", "finished", "callbacks")
+
+    def __init__(self, clock, name, kind, size):
+        self.clock = clock
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.submitted = clock.now
+        self.started = None  # 延遲結束、開始分享頻寬的時間
+        self.finished = None
+        self.callbacks = []
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    @property
+    def duration(self):
+        return self.finished - self.submitted if self.finished is not None else None
+
+    def then(self, callback):
+        """callback(op) when the operation completes (immediately if it already has)."""
+        if self.done:
+            callback(self)
+        else:
+            self.callbacks.append(callback)
+        return self
+
+    def wait(self):
+        """Advance the shared clock until this operation is done."""
+        self.clock.run(stop=lambda: self.done)
+        return self
+
+    def _finish(self, now):
+        self.finished = now
+        for callback in self.callbacks:
+            callback(self)
+        self.callbacks = []
+
+    def __repr__(self):
+        return f"Operation({self.kind} {self.name!r}, submitted={self.submitted:.4f}, finished={self.finished})"
+
+
+class SharedChannel:
+    """rate units of work per second split equally among at most limit active operations.
+
+    Every active operation receives the same service, so the cumulative
+    per-operation service works as a virtual time: an operation finishes
+    when it reaches (service at admission + its work). That keeps each
+    admission and completion at O(log n) with thousands of active requests.
+    """
+
+    def __init__(self, clock, rate, limit=None):
+        self.clock = clock
+        self.rate = rate
+        self.limit = limit
+        self.active = []  # heap of (finish service, seq, op, work)
+        self.waiting = deque()  # 超過 limit 時排隊（例如 CPU 核心的硬體執行緒數）
+        self.service = 0.0
+        self.busy_time = 0.0
+        self.work_done = 0.0
+        self.completed = 0
+        self._last = clock.now
+        self._event = None
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.active) + len(self.waiting)
+
+    def submit(self, op, work):
+        self._advance()
+        if self.limit is not None and len(self.active) >= self.limit:
+            self.waiting.append((op, work))
+        else:
+            self._admit(op, work)
+        self._reschedule()
+
+    def _admit(self, op, work):
+        op.started = self.clock.now
+        self._seq += 1
+        heapq.heappush(self.active, (self.service + work, self._seq, op, work))
+
+    def _advance(self):
+        now = self.clock.now
+        elapsed = now - self._last
+        if self.active and elapsed > 0:
+            self.service += self.rate * elapsed / len(self.active)
+            self.busy_time += elapsed
+        self._last = now
+
+    def _reschedule(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        if self.active:
+            left = max(self.active[0][0] - self.service, 0.0)
+            self._event = self.clock.schedule(left * len(self.active) / self.rate, self._complete)
+
+    def _complete(self):
+        self._event = None
+        self._advance()
+        finished = []
+        # 容許誤差要跟著 now 放大：剩下的時間小於 now 的浮點解析度時，clock.now 已經前進不了
+        slack = 1e-12 + abs(self.clock.now) * 1e-12 * self.rate / max(1, len(self.active))
+        while self.active and self.active[0][0] <= self.service + slack:
+            _, _, op, work = heapq.heappop(self.active)
+            self.work_done += work
+            finished.append(op)
+        while self.waiting and (self.limit is None or len(self.active) < self.limit):
+            self._admit(*self.waiting.popleft())
+        self._reschedule()
+        self.completed += len(finished)
+        for op in finished:
+            op._finish(self.clock.now)
+
+    def utilization(self):
+        self._advance()
+        return self.busy_time / self.clock.now if self.clock.now else 0.0
+
+
+class CPU:
+    def __init__(self, clock, cores=CPU_CORES, threads=CPU_THREADS, clock_speed=CPU_CLOCK, verbose=False):
+        self.clock = clock
+        self.cores = cores
+        self.threads = threads
+        self.clock_speed = clock_speed  # GHz
+        self.verbose = verbose
+        # 每顆核心一條通道，同時最多 threads // cores 個硬體執行緒分享它的週期
+        self.core_channels = [SharedChannel(clock, clock_speed * 1_000_000_000, limit=max(1, threads // cores))
+                              for _ in range(cores)]
+
+    def execute_task(self, process_name, cycles_required, core=None):
+        """Run cycles_required cycles on the least loaded core (or the given one)."""
+        if core is None:
+            core = min(range(self.cores), key=lambda c: len(self.core_channels[c]))
+        op = Operation(self.clock, process_name, "cpu", cycles_required)
+        if self.verbose:
+            eta = cycles_required / (self.clock_speed * 1_000_000_000)
+            print(f"[{self.clock.now:.4f}s] Executing {process_name} on Core {core} ({cycles_required} cycles). "
+                  f"ETA alone: {eta:.4f}s")
+        self.core_channels[core].submit(op, cycles_required)
+        return op
+
+    @property
+    def utilization(self):
+        """Busy percentage of each core so far."""
+        return [channel.utilization() * 100 for channel in self.core_channels]
+
+    def get_usage(self):
+        return self.utilization
+
+
+class RAM:
+    def __init__(self, size_gb=RAM_CAP, verbose=False, allocator="first_fit", unit_mb=1):
+        self.total_memory = size_gb * 1024  # Convert GB to MB
+        self.used_memory = 0
+        self.memory_map = {}  # {pid: memory_allocated}
+        self.verbose = verbose
+        # 位址配置交給 core.allocator；unit_mb 是一個配置單位的大小（例如 1/256 = 4KB 的頁）
+        self.unit_mb = unit_mb
+        if isinstance(allocator, str):
+            allocator = make_allocator(allocator, int(self.total_memory / unit_mb))
+        self.allocator = allocator
+        self.regions = {}  # {pid: [address, ...]}，位址以 unit_mb 為單位
+
+    def allocate(self, pid, size_mb):
+        if self.used_memory + size_mb > self.total_memory:
+            if self.verbose:
+                print(f"Memory Allocation Failed: Not enough RAM for PID {pid}")
+            return False
+        if self.allocator is not None:
+            address = self.allocator.alloc(max(1, math.ceil(size_mb / self.unit_mb)))
+            if address is None:
+                if self.verbose:
+                    print(f"Memory Allocation Failed: no contiguous {size_mb}MB block for PID {pid}")
+                return False
+            self.regions.setdefault(pid, []).append(address)
+        self.memory_map[pid] = self.memory_map.get(pid, 0) + size_mb
+        self.used_memory += size_mb
+        if self.verbose:
+            print(f"Allocated {size_mb}MB to Process {pid}.")
+        return True
+
+    def deallocate(self, pid):
+        if pid in self.memory_map:
+            size_mb = self.memory_map.pop(pid)
+            self.used_memory -= size_mb
+            for address in self.regions.pop(pid, ()):
+                self.allocator.free(address)
+            if self.verbose:
+                print(f"Deallocated {size_mb}MB from Process {pid}.")
+            return True
+        return False
+
+    def get_usage(self):
+        return self.used_memory, self.total_memory
+
+    def fragmentation(self):
+        """Allocator stats: fragmentation, live blocks and latency percentiles."""
+        return self.allocator.stats() if self.allocator is not None else {}
+
+
+class Disk:
+    def __init__(self, clock, size_gb=SSD, read_speed=SSD_READ_SPEED, write_speed=SSD_WRITE_SPEED,
+                 latency=DISK_LATENCY, verbose=False):
+        self.clock = clock
+        self.total_storage = size_gb * 1024  # Convert GB to MB
+        self.used_storage = 0
+        self.read_speed = read_speed  # MB/s
+        self.write_speed = write_speed  # MB/s
+        self.latency = latency  # ms
+        self.files = {}  # Simulated file system
+        self.verbose = verbose
+        # 讀寫共用同一個裝置：工作量用「單獨使用裝置要幾秒」表示，rate = 1
+        self.channel = SharedChannel(clock, 1.0)
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def _submit(self, name, kind, size_mb, service):
+        op = Operation(self.clock, name, kind, size_mb)
+        self.clock.schedule(self.latency / 1000, self.channel.submit, op, service)
+        return op
+
+    def write(self, filename, size_mb):
+        if self.used_storage - self.files.get(filename, 0) + size_mb > self.total_storage:
+            if self.verbose:
+                print(f"Disk Full: Cannot write {filename}")
+            return False
+        self.used_storage += size_mb - self.files.get(filename, 0)
+        self.files[filename] = size_mb
+        self.bytes_written += size_mb
+        if self.verbose:
+            print(f"[{self.clock.now:.4f}s] Writing {filename} ({size_mb}MB)...")
+        return self._submit(filename, "write", size_mb, size_mb / self.write_speed)
+
+    def read(self, filename, size_mb=None):
+        if filename not in self.files:
+            if self.verbose:
+                print("File Not Found!")
+            return False
+        size_mb = self.files[filename] if size_mb is None else size_mb
+        self.bytes_read += size_mb
+        if self.verbose:
+            print(f"[{self.clock.now:.4f}s] Reading {filename} ({size_mb}MB)...")
+        return self._submit(filename, "read", size_mb, size_mb / self.read_speed)
+
+    def io(self, kind, size_mb, block=None, name=None):
+        """Raw device transfer with no file catalog (used by core.filesystem); block is the start block."""
+        if kind not in ("read", "write"):
+            raise ValueError(f"Unknown disk operation: {kind}")
+        if kind == "read":
+            self.bytes_read += size_mb
+            service = size_mb / self.read_speed
+        else:
+            self.bytes_written += size_mb
+            service = size_mb / self.write_speed
+        return self._submit(name or f"block {block}", kind, size_mb, service)
+
+    def delete(self, filename):
+        if filename in self.files:
+            self.used_storage -= self.files.pop(filename)
+            if self.verbose:
+                print(f"Deleted {filename}.")
+            return True
+        return False
+
+    def utilization(self):
+        return self.channel.utilization()
+
+
+class Network:
+    def __init__(self, clock, bandwidth=NETWORK_BANDWIDTH, latency=NETWORK_LATENCY, verbose=False):
+        self.clock = clock
+        self.bandwidth = bandwidth  # Mbps
+        self.latency = latency  # ms
+        self.verbose = verbose
+        self.link = SharedChannel(clock, bandwidth)  # 工作量單位：Mb
+
+    def download(self, file_size_mb, name=None):
+        """Latency first, then the transfer shares the link bandwidth with every other download."""
+        op = Operation(self.clock, name or f"{file_size_mb}MB", "download", file_size_mb)
+        if self.verbose:
+            alone = file_size_mb * 8 / self.bandwidth + self.latency / 1000
+            print(f"[{self.clock.now:.4f}s] Downloading {file_size_mb}MB... ETA alone: {alone:.2f}s")
+        self.clock.schedule(self.latency / 1000, self.link.submit, op, file_size_mb * 8)
+        return op
+
+    def utilization(self):
+        return self.link.utilization()
+
+
+class Machine:
+    """One CPU, RAM, Disk and Network link on a shared clock, built from consts.py."""
+
+    def __init__(self, clock=None, verbose=False):
+        self.clock = clock or VirtualClock()
+        self.cpu = CPU(self.clock, verbose=verbose)
+        self.ram = RAM(verbose=verbose)
+        self.disk = Disk(self.clock, verbose=verbose)
+        self.network = Network(self.clock, verbose=verbose)
+
+    def run(self, until=None):
+        return self.clock.run(until)
@@ -0,0 +1,327 @@
+import cProfile
+import io
+import json
+import math
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# 模擬迴圈的量測層：計數器、計時器、直方圖，輸出成 Chrome trace / Perfetto 的 JSON 時間軸
+# 與定期的文字摘要。沒有開啟的子系統完全不付成本：各模組只在一次 run 開始（或物件建立）時
+# 問一次 probe(subsystem)，拿到 None 就走原本的程式碼；拿到 Recorder 才換成有量測的版本。
+#   engine   core.engine 的排程迴圈（Scheduler.run_* 也走這裡）：dispatch、context switch、ready 數
+#   clock    VirtualClock.run：每種事件處理函式花的時間、事件 heap 的 push/pop、realtime 的延遲
+#   bursts   core.bursts 的 CPU / I/O 模擬：ready queue 與裝置佇列長度
+#   network  core.network.FlowNetwork：每次重算速率的時間
+#   kernel   core.kernel.SimulationThread：每一步的時間與比預定時間晚了多少
+# Usage:
+#   with instrument.Recorder(("engine", "clock"), trace="run.json", summary_every=1.0) as recorder:
+#       engine.simulate("RR", jobs)
+#   result, stats = instrument.profile(engine.simulate, "RR", jobs, mode="sample", out="rr.folded")
+
+SUBSYSTEMS = ("engine", "clock", "bursts", "network", "kernel")
+SUB_BUCKETS = 8  # 每個 2 的次方切幾格：相對誤差約 1/16
+
+_sessions = []  # 目前作用中的 Recorder（後開的在最後）
+
+
+def probe(subsystem):
+    """The active Recorder if subsystem is being instrumented, else None."""
+    if not _sessions:
+        return None
+    recorder = _sessions[-1]
+    return recorder if subsystem in recorder.subsystems else None
+
+
+class Histogram:
+    """Log-bucketed distribution: O(1) record, percentiles within ~6%."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = Counter()  # 桶編號 -> 次數；0 以下的值都放在 None
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value > 0:
+            mantissa, exponent = math.frexp(value)
+            self.buckets[exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)] += 1
+        else:
+            self.buckets[None] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return max(self.min, min(0.0, self.max))
+        for bucket in sorted(key for key in self.buckets if key is not None):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                exponent, sub = divmod(bucket, SUB_BUCKETS)
+                middle = math.ldexp(0.5 + (sub + 0.5) / (2 * SUB_BUCKETS), exponent)
+                return min(max(middle, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean": self.mean, "p50": self.percentile(50), "p99": self.percentile(99),
+                "min": self.min if self.count else 0.0, "max": self.max if self.count else 0.0,
+                "total": self.total}
+
+
+class Recorder:
+    """Counters, timers (histograms of seconds) and sampled gauges for one instrumented run.
+
+    Use it as a context manager: inside the block, probe(subsystem) hands
+    it to the instrumented code for the subsystems listed. Spans become
+    complete ("X") events and gauges counter ("C") tracks of a Chrome
+    trace written to trace on exit (open it in chrome://tracing or
+    ui.perfetto.dev); at most max_events are kept. summary_every > 0
+    prints a summary that often (wall seconds) while the run goes, and
+    once more at the end.
+    """
+
+    def __init__(self, subsystems=SUBSYSTEMS, trace=None, summary_every=None, stream=None, max_events=200_000,
+                 gauge_interval=0.01):
+        unknown = set(subsystems) - set(SUBSYSTEMS)
+        if unknown:
+            raise ValueError(f"Unknown subsystems: {', '.join(sorted(unknown))}")
+        self.subsystems = frozenset(subsystems)
+        self.trace = trace
+        self.summary_every = summary_every
+        self.stream = stream or sys.stdout
+        self.max_events = max_events
+        self.gauge_interval = gauge_interval  # 同一個 gauge 多久寫一次 trace（真實秒）
+        self.counters = Counter()
+        self.histograms = {}
+        self.gauges = {}  # 名稱 -> 最新值
+        self.events = []
+        self.dropped = 0
+        self.pid = os.getpid()
+        self.epoch = time.perf_counter()
+        self._gauge_written = {}
+        self._next_summary = math.inf
+
+    # --- 記錄 ---
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(value)
+
+    def gauge(self, name, value, now=None):
+        """Sample a level (queue length, heap size): histogram plus a throttled trace counter."""
+        self.observe(name, value)
+        self.gauges[name] = value
+        now = time.perf_counter() if now is None else now
+        if now - self._gauge_written.get(name, -math.inf) >= self.gauge_interval:
+            self._gauge_written[name] = now
+            self._emit({"name": name, "ph": "C", "ts": self._us(now), "pid": self.pid, "args": {"value": value}})
+
+    @contextmanager
+    def span(self, name, category="sim", **args):
+        """Time the block into the name timer and the trace."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.close_span(name, start, category, args)
+
+    def close_span(self, name, start, category="sim", args=None, end=None):
+        end = time.perf_counter() if end is None else end
+        self.observe(name, end - start)
+        event = {"name": name, "cat": category, "ph": "X", "ts": self._us(start), "dur": (end - start) * 1e6,
+                 "pid": self.pid, "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        self._emit(event)
+
+    def wrap(self, name, function, category="sim"):
+        """function timed into a span on every call (for per-object probes set up in __init__)."""
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.close_span(name, start, category)
+        return timed
+
+    def tick(self, now=None):
+        """Print the periodic summary if it is due; instrumented loops call this now and then."""
+        now = time.perf_counter() if now is None else now
+        if now >= self._next_summary:
+            self._next_summary = now + self.summary_every
+            print(self.format(), file=self.stream)
+
+    def _us(self, when):
+        return (when - self.epoch) * 1e6
+
+    def _emit(self, event):
+        if len(self.events) < self.max_events:
+            self.events.append(event)
+        else:
+            self.dropped += 1
+
+    # --- 輸出 ---
+
+    def summary(self):
+        return {
+            "elapsed": time.perf_counter() - self.epoch,
+            "counters": dict(self.counters),
+            "histograms": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+            "trace_events": len(self.events),
+            "dropped_events": self.dropped,
+        }
+
+    def format(self, top=12):
+        """Text summary: counters, then the timers that took the most total time, then the gauges."""
+        lines = [f"[instrument] {time.perf_counter() - self.epoch:.2f}s  "
+                 + "  ".join(f"{name}={value}" for name, value in sorted(self.counters.items()))]
+        timers = [(name, h) for name, h in self.histograms.items() if name not in self.gauges]
+        for name, h in sorted(timers, key=lambda item: -item[1].total)[:top]:
+            lines.append(f"  {name:36s} {h.count:10d}x  total {h.total * 1000:10.2f}ms  "
+                         f"mean {h.mean * 1e6:9.2f}us  p99 {h.percentile(99) * 1e6:9.2f}us  max {h.max * 1e6:9.2f}us")
+        for name in sorted(self.gauges):
+            h = self.histograms[name]
+            lines.append(f"  {name:36s} mean {h.mean:10.2f}  p99 {h.percentile(99):10.2f}  max {h.max:10g}")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        events = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "simulation"}}]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events + self.events, "displayTimeUnit": "ms",
+                       "otherData": {"dropped_events": self.dropped}}, f)
+
+    # --- 開關 ---
+
+    def __enter__(self):
+        self.epoch = time.perf_counter()
+        if self.summary_every:
+            self._next_summary = self.epoch + self.summary_every
+        _sessions.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _sessions.remove(self)
+        self._next_summary = math.inf
+        if self.trace:
+            self.write_trace(self.trace)
+        if self.summary_every:
+            print(self.format(), file=self.stream)
+        return False
+
+
+class Sampler:
+    """Statistical profiler: a background thread records the target thread's stack every interval seconds.
+
+    stacks counts collapsed stacks ("module:function;...;module:function"),
+    the input format of flamegraph.pl and speedscope. Unlike cProfile it
+    does not slow every call down, so it suits long simulation runs; the
+    sampler needs the GIL, so samples come at most every
+    sys.getswitchinterval() (5ms by default) while the target is busy.
+    """
+
+    def __init__(self, interval=0.001, thread=None):
+        self.interval = interval
+        self.target = (thread or threading.current_thread()).ident
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                break
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def functions(self, top=20):
+        """[(function, self samples, total samples)] for the top functions by self samples."""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            names = stack.split(";")
+            own[names[-1]] += count
+            for name in set(names):
+                total[name] += count
+        return [(name, count, total[name]) for name, count in own.most_common(top)]
+
+    def write(self, path):
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def format(self, top=20):
+        lines = [f"[sample] {self.samples} samples every {self.interval * 1000:g}ms"]
+        for name, own, total in self.functions(top):
+            lines.append(f"  {own / self.samples:6.1%} self {total / self.samples:6.1%} total  {name}")
+        return "\n".join(lines)
+
+
+def profile(function, *args, mode="cprofile", out=None, interval=0.001, top=20, stream=None, **kwargs):
+    """Run function(*args, **kwargs) under cProfile or the Sampler; returns (result, profiler).
+
+    mode="cprofile" returns a pstats.Stats and saves it to out (.prof, for
+    snakeviz / pstats); mode="sample" returns the Sampler and writes its
+    collapsed stacks to out. The top functions are printed to stream.
+    """
+    stream = stream or sys.stdout
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(function, *args, **kwargs)
+        finally:
+            stats = pstats.Stats(profiler, stream=io.StringIO())
+            if out:
+                stats.dump_stats(out)
+            stats.stream = stream
+            stats.sort_stats("cumulative").print_stats(top)
+        return result, stats
+    if mode == "sample":
+        sampler = Sampler(interval).start()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            sampler.stop()
+            if out:
+                sampler.write(out)
+            print(sampler.format(top), file=stream)
+        return result, sampler
+    raise ValueError(f"Unknown profile mode: {mode}")
@@ -0,0 +1,310 @@
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+from core.hardware import Operation
+
+# 磁碟 I/O 排程器：放在 core.hardware.Disk 前面的請求佇列。
+# 相鄰的同類請求會合併（back / front merge），再依 elevator 演算法決定下一個送進 Disk 的請求。
+# SSTF / LOOK / SCAN 用兩個 heap：磁頭以上（min-heap）與磁頭以下（max-heap），
+# 磁頭往哪邊移動，那邊 heap 的頂端就是下一個，所以每次挑選都是 O(log n)；
+# C-LOOK / C-SCAN 的「以下」改成 min-heap，繞回時兩個 heap 對調。
+# 被合併改了起點或被 deadline 先送出的請求留在 heap 裡，取出時用 stamp 判斷是否過期（lazy deletion）。
+
+READ, WRITE = "read", "write"
+
+
+class Request:
+    __slots__ = ("kind", "block", "blocks", "ops", "submitted", "deadline", "stamp", "dispatched")
+
+    def __init__(self, kind, block, blocks, op, deadline):
+        self.kind = kind
+        self.block = block
+        self.blocks = blocks
+        self.ops = [op]
+        self.submitted = op.submitted
+        self.deadline = deadline
+        self.stamp = 0  # 每次改起點就加一，heap 裡舊的項目因此失效
+        self.dispatched = False
+
+    @property
+    def end(self):
+        return self.block + self.blocks
+
+
+class FIFOQueue:
+    """FCFS / noop: arrival order."""
+
+    def __init__(self, total_blocks):
+        self.queue = deque()
+
+    def add(self, request):
+        self.queue.append(request)
+
+    def rekey(self, request):
+        pass  # 順序和起點無關
+
+    def pop(self, head, now):
+        while True:
+            request = self.queue.popleft()
+            if not request.dispatched:
+                return request, abs(request.block - head)
+
+
+class ElevatorQueue:
+    """SSTF, SCAN, LOOK, C-SCAN and C-LOOK over two heaps split at the head position."""
+
+    def __init__(self, total_blocks, mode="LOOK"):
+        self.mode = mode
+        self.circular = mode in ("CSCAN", "CLOOK")
+        self.last_block = total_blocks - 1
+        self.above = []  # (block, seq, stamp, request)，block >= 磁頭
+        self.below = []  # 一般：(-block, ...) 的 max-heap；circular：(block, ...) 的 min-heap
+        self.seq = 0
+        self.upward = True
+
+    def add(self, request, head=None):
+        self.seq += 1
+        if head is None or request.block >= head:
+            heapq.heappush(self.above, (request.block, self.seq, request.stamp, request))
+        else:
+            key = request.block if self.circular else -request.block
+            heapq.heappush(self.below, (key, self.seq, request.stamp, request))
+
+    def rekey(self, request, head=None):
+        self.add(request, head)
+
+    @staticmethod
+    def _clean(heap):
+        while heap and (heap[0][3].dispatched or heap[0][2] != heap[0][3].stamp):
+            heapq.heappop(heap)
+        return heap
+
+    def pop(self, head, now):
+        above = self._clean(self.above)
+        while above and above[0][0] < head:  # 磁頭停在上一個請求的終點，越過的請求移到下面
+            _, seq, stamp, request = heapq.heappop(above)
+            heapq.heappush(self.below, (request.block if self.circular else -request.block, seq, stamp, request))
+            self._clean(above)
+        below = self._clean(self.below)
+        if self.circular:
+            travel = 0
+            if not above:  # 到尾端了：繞回最小的區塊
+                self.above, self.below = below, []
+                above = self.above
+                travel = (self.last_block - head) + self.last_block if self.mode == "CSCAN" else 0
+                head = 0 if self.mode == "CSCAN" else head
+            request = heapq.heappop(above)[3]
+            return request, travel + abs(request.block - head)
+        if self.mode == "SSTF":
+            up = above[0][0] - head if above else None
+            down = head + below[0][0] if below else None
+            self.upward = down is None or (up is not None and up <= down)
+        elif self.upward and not above or not self.upward and not below:
+            self.upward = not self.upward  # LOOK / SCAN 換方向
+            if self.mode == "SCAN":  # SCAN 要先走到磁碟邊緣才回頭
+                edge = self.last_block if not self.upward else 0
+                request = heapq.heappop(above if self.upward else below)[3]
+                return request, abs(edge - head) + abs(request.block - edge)
+        request = heapq.heappop(above if self.upward else below)[3]
+        return request, abs(request.block - head)
+
+
+class DeadlineQueue:
+    """C-LOOK order, but a request past its deadline (reads sooner than writes) jumps the queue."""
+
+    def __init__(self, total_blocks):
+        self.sorted = ElevatorQueue(total_blocks, "CLOOK")
+        self.fifo = {READ: deque(), WRITE: deque()}
+
+    def add(self, request, head=None):
+        self.sorted.add(request, head)
+        self.fifo[request.kind].append(request)
+
+    def rekey(self, request, head=None):
+        self.sorted.add(request, head)
+
+    def pop(self, head, now):
+        for kind in (READ, WRITE):
+            fifo = self.fifo[kind]
+            while fifo and fifo[0].dispatched:
+                fifo.popleft()
+            if fifo and fifo[0].deadline <= now:
+                request = fifo.popleft()
+                return request, abs(request.block - head)
+        return self.sorted.pop(head, now)
+
+
+POLICIES = {
+    "FCFS": lambda total: FIFOQueue(total),
+    "NOOP": lambda total: FIFOQueue(total),
+    "SSTF": lambda total: ElevatorQueue(total, "SSTF"),
+    "SCAN": lambda total: ElevatorQueue(total, "SCAN"),
+    "LOOK": lambda total: ElevatorQueue(total, "LOOK"),
+    "CSCAN": lambda total: ElevatorQueue(total, "CSCAN"),
+    "CLOOK": lambda total: ElevatorQueue(total, "CLOOK"),
+    "DEADLINE": lambda total: DeadlineQueue(total),
+}
+
+
+class IOScheduler:
+    """Request queue in front of a Disk.
+
+    io(kind, size_mb, block, name) has the same signature as Disk.io, so a
+    FileSystem can sit on top of the scheduler. Rotational policies charge
+    seek_base + full_seek * distance / total_blocks before each transfer;
+    NOOP assumes an SSD (no seek cost) and is meant for depth > 1.
+    """
+
+    def __init__(self, disk, policy="LOOK", block_size=4096, depth=1, merge=True, max_merge=256,
+                 seek_base=0.0005, full_seek=0.008, read_expire=0.5, write_expire=5.0, rotational=None):
+        policy = policy.upper().replace("-", "")
+        try:
+            make_queue = POLICIES[policy]
+        except KeyError:
+            raise ValueError(f"Unknown I/O scheduling policy: {policy}") from None
+        self.disk = disk
+        self.clock = disk.clock
+        self.total_storage = disk.total_storage
+        self.policy = policy
+        self.block_size = block_size
+        self.block_mb = block_size / (1024 * 1024)
+        self.total_blocks = int(disk.total_storage / self.block_mb)
+        self.queue = make_queue(self.total_blocks)
+        self.sorted_queue = not isinstance(self.queue, FIFOQueue)
+        self.depth = depth
+        self.merge = merge
+        self.max_merge = max_merge
+        self.rotational = policy != "NOOP" if rotational is None else rotational
+        self.seek_base = seek_base
+        self.full_seek = full_seek
+        self.expire = {READ: read_expire, WRITE: write_expire}
+        self.head = 0
+        self.pending = 0
+        self.in_service = 0
+        self.by_start = {}  # (kind, 起點) -> 還沒送出的請求，用來合併
+        self.by_end = {}  # (kind, 終點) -> 請求
+        self.latencies = array("d")
+        self.requests = 0
+        self.merged = 0
+        self.dispatched = 0
+        self.seek_distance = 0
+        self.seek_time = 0.0
+        self.bytes = 0.0
+        self.first_submit = None
+        self.last_finish = 0.0
+
+    def utilization(self):
+        return self.disk.utilization()
+
+    def read(self, block, blocks=1, name=None):
+        return self.io(READ, blocks * self.block_mb, block, name)
+
+    def write(self, block, blocks=1, name=None):
+        return self.io(WRITE, blocks * self.block_mb, block, name)
+
+    def io(self, kind, size_mb, block=None, name=None):
+        """Queue a transfer of size_mb starting at block; returns an Operation."""
+        if kind not in (READ, WRITE):
+            raise ValueError(f"Unknown disk operation: {kind}")
+        blocks = max(1, round(size_mb / self.block_mb))
+        block = self.head if block is None else block
+        if block < 0 or block + blocks > self.total_blocks:
+            raise ValueError(f"blocks {block}..{block + blocks} are outside the disk")
+        op = Operation(self.clock, name or f"block {block}", kind, size_mb)
+        self.requests += 1
+        self.bytes += size_mb
+        if self.first_submit is None:
+            self.first_submit = self.clock.now
+        if not (self.merge and self._merge(kind, block, blocks, op)):
+            request = Request(kind, block, blocks, op, self.clock.now + self.expire[kind])
+            self._add(request)
+            self.pending += 1
+        self._dispatch()
+        return op
+
+    def _add(self, request):
+        if self.sorted_queue:
+            self.queue.add(request, self.head)
+        else:
+            self.queue.add(request)
+        if self.merge:
+            self.by_start[(request.kind, request.block)] = request
+            self.by_end[(request.kind, request.end)] = request
+
+    def _merge(self, kind, block, blocks, op):
+        request = self.by_end.get((kind, block))  # back merge：接在某個請求後面
+        if request is not None and request.blocks + blocks <= self.max_merge:
+            del self.by_end[(kind, block)]
+            request.blocks += blocks
+            self.by_end[(kind, request.end)] = request
+        else:
+            request = self.by_start.get((kind, block + blocks))  # front merge：接在前面
+            if request is None or request.blocks + blocks > self.max_merge:
+                return False
+            del self.by_start[(kind, request.block)]
+            request.block = block
+            request.blocks += blocks
+            request.stamp += 1
+            self.by_start[(kind, block)] = request
+            if self.sorted_queue:
+                self.queue.rekey(request, self.head)
+        request.ops.append(op)
+        self.merged += 1
+        return True
+
+    def _dispatch(self):
+        while self.pending and self.in_service < self.depth:
+            request, distance = self.queue.pop(self.head, self.clock.now)
+            request.dispatched = True
+            self.pending -= 1
+            self.in_service += 1
+            self.dispatched += 1
+            if self.merge:
+                self.by_start.pop((request.kind, request.block), None)
+                self.by_end.pop((request.kind, request.end), None)
+            self.head = request.end
+            seek = 0.0
+            if self.rotational and distance:
+                seek = self.seek_base + self.full_seek * distance / self.total_blocks
+            self.seek_distance += distance
+            self.seek_time += seek
+            if seek:
+                self.clock.schedule(seek, self._transfer, request)
+            else:
+                self._transfer(request)
+
+    def _transfer(self, request):
+        op = self.disk.io(request.kind, request.blocks * self.block_mb, request.block, request.ops[0].name)
+        op.then(lambda done: self._complete(request, done.finished))
+
+    def _complete(self, request, now):
+        self.in_service -= 1
+        self.last_finish = now
+        for op in request.ops:
+            self.latencies.append(now - op.submitted)
+            op._finish(now)
+        self._dispatch()
+
+    def stats(self):
+        latencies = np.frombuffer(self.latencies, dtype=np.float64) if self.latencies else np.zeros(1)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        elapsed = self.last_finish - (self.first_submit or 0.0)
+        return {
+            "policy": self.policy,
+            "requests": self.requests,
+            "merged": self.merged,
+            "dispatched": self.dispatched,
+            "pending": self.pending,
+            "avg_seek_distance": self.seek_distance / self.dispatched if self.dispatched else 0.0,
+            "seek_time": self.seek_time,
+            "latency_mean": float(latencies.mean()),
+            "latency_p50": float(p50),
+            "latency_p95": float(p95),
+            "latency_p99": float(p99),
+            "latency_max": float(latencies.max()),
+            "throughput_mb_s": self.bytes / elapsed if elapsed > 0 else 0.0,
+            "disk_utilization": self.disk.utilization(),
+        }
@@ -0,0 +1,269 @@
+import queue
+import threading
+import time
+
+import numpy as np
+
+from consts import STATUS
+from core import instrument
+from core.hardware import RAM, Machine
+from core.process_table import STATE_CODES
+
+# 模擬核心跑在背景執行緒：每一步推進虛擬時鐘，然後把結果做成唯讀快照發佈出去。
+# UI（pygame 迴圈）只讀 buffer.front，從不等待模擬；要改變模擬狀態時把 callable
+# 丟進 commands 佇列，由模擬執行緒在下一步開始前執行，所以模擬狀態只有一個執行緒會碰。
+
+
+class SnapshotBuffer:
+    """Double buffer: the simulation fills the back snapshot, publish() swaps it to the front.
+
+    Swapping is a single reference assignment, so readers never see a
+    half-built snapshot. A reader that keeps a snapshot across frames (e.g.
+    to sort it) takes it with acquire() and gives it back with release();
+    the writer never recycles a held snapshot and builds the next one in
+    fresh memory instead.
+    """
+
+    def __init__(self, front=None):
+        self.front = front
+        self.back = None
+        self.version = 0
+        self.held = {}  # id(snapshot) -> 持有次數
+        self._lock = threading.Lock()  # 只保護 held 和 back 的交接，兩邊都是 O(1)
+
+    def publish(self, snapshot):
+        self.back, self.front = self.front, snapshot
+        self.version += 1
+
+    def acquire(self):
+        """(snapshot, version); the snapshot stays untouched until release(snapshot)."""
+        with self._lock:
+            snapshot = self.front
+            self.held[id(snapshot)] = self.held.get(id(snapshot), 0) + 1
+            return snapshot, self.version
+
+    def release(self, snapshot):
+        with self._lock:
+            count = self.held.pop(id(snapshot), 0) - 1
+            if count > 0:
+                self.held[id(snapshot)] = count
+
+    def recycle(self):
+        """The previous front snapshot if no reader holds it, which the writer may reuse; else None."""
+        with self._lock:
+            back, self.back = self.back, None
+            return None if id(back) in self.held else back
+
+
+class SimulationThread(threading.Thread):
+    """Run simulation.step(dt) in the background and publish simulation.snapshot(reuse).
+
+    interval is the real time between steps; speed is virtual seconds per
+    real second. Sleeping happens on an Event, so a paused or idle
+    simulation costs no CPU and stop() wakes it at once.
+    """
+
+    def __init__(self, simulation, interval=0.05, speed=1.0, buffer=None):
+        super().__init__(name="simulation", daemon=True)
+        self.simulation = simulation
+        self.interval = interval
+        self.speed = speed
+        self.buffer = buffer or SnapshotBuffer()
+        self.commands = queue.SimpleQueue()
+        self.paused = False
+        self.step_time = 0.0  # 最近一步（含快照）花的真實時間
+        self._stop_event = threading.Event()
+
+    def submit(self, command, *args):
+        """Run command(simulation, *args) on the simulation thread before its next step."""
+        self.commands.put((command, args))
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        self.buffer.publish(self.simulation.snapshot(None))
+        deadline = time.perf_counter()
+        while not self._stop_event.is_set():
+            while True:
+                try:
+                    command, args = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                command(self.simulation, *args)
+            start = time.perf_counter()
+            if not self.paused:
+                self.simulation.step(self.interval * self.speed)
+                self.buffer.publish(self.simulation.snapshot(self.buffer.recycle()))
+            self.step_time = time.perf_counter() - start
+            probe = instrument.probe("kernel")
+            if probe is not None and not self.paused:
+                probe.close_span("kernel.step", start, "kernel", end=start + self.step_time)
+                probe.observe("kernel.lag", max(0.0, start - deadline))  # 比預定的步調晚了多少
+                probe.tick(start + self.step_time)
+            # 固定步調：落後太多就不追趕，避免一口氣跑好幾步
+            deadline = max(deadline + self.interval, time.perf_counter())
+            self._stop_event.wait(deadline - time.perf_counter())
+
+
+class MachineSimulation:
+    """core.hardware.Machine as a background simulation; snapshots are plain dicts."""
+
+    def __init__(self, machine=None):
+        self.machine = machine or Machine()
+        self.clock = self.machine.clock
+
+    def step(self, dt):
+        target = self.clock.now + dt
+        self.clock.run(until=target)
+        self.clock.now = max(self.clock.now, target)  # 沒有事件時 run() 不會前進
+
+    def snapshot(self, reuse):
+        m = self.machine
+        used, total = m.ram.get_usage()
+        return {
+            "time": self.clock.now,
+            "cpu": m.cpu.get_usage(),
+            "ram_used": used,
+            "ram_total": total,
+            "disk": m.disk.utilization() * 100,
+            "network": m.network.utilization() * 100,
+        }
+
+
+class ProcessSimulation:
+    """A live table of many processes on the Machine's CPU and RAM, kept as NumPy columns.
+
+    Every step admits "new" processes whose memory fits in RAM (the RAM
+    model's allocator decides), round-robins the CPU threads over the ready
+    processes, moves some processes to and from I/O waits, and frees the
+    memory of finished ones. Terminated rows are reused by new processes,
+    so the table keeps its size. CPU% is a moving average of each
+    process's share of one hardware thread.
+    """
+
+    def __init__(self, processes=100_000, machine=None, seed=0, mean_burst=2.0, memory_range=(0.25, 8.0),
+                 io_rate=0.5, io_time=0.5, respawn_time=5.0, cpu_smoothing=0.3):
+        self.machine = machine or Machine()
+        self.machine.ram = RAM(allocator="best_fit", unit_mb=1 / 256) if machine is None else machine.ram
+        self.clock = self.machine.clock
+        self.rng = np.random.default_rng(seed)
+        self.mean_burst = mean_burst
+        self.memory_range = memory_range
+        self.io_rate = io_rate  # 每秒 CPU 時間發出 I/O 的次數
+        self.io_time = io_time  # 平均 I/O 等待秒數
+        self.respawn_time = respawn_time
+        self.cpu_smoothing = cpu_smoothing
+        n = processes
+        self.columns = {
+            "pid": np.arange(1, n + 1, dtype=np.int64),
+            "state": np.full(n, STATE_CODES["new"], dtype=np.int8),
+            "cpu": np.zeros(n, dtype=np.float32),  # %
+            "memory": np.zeros(n, dtype=np.float32),  # RAM 模型實際配置的 MB，沒進記憶體是 0
+            "cpu_time": np.zeros(n, dtype=np.float64),
+        }
+        self.remaining = self.rng.exponential(mean_burst, n)
+        self.request = self.rng.uniform(*memory_range, n)  # 需要的記憶體（MB）
+        self.next_pid = n + 1
+        self.cursor = 0  # round-robin 起點
+        self.core_busy = [0.0] * self.machine.cpu.cores
+        self.killed = 0
+
+    def _admit(self):
+        c = self.columns
+        new = np.flatnonzero(c["state"] == STATE_CODES["new"])
+        ram = self.machine.ram
+        free = ram.total_memory - ram.used_memory
+        # 依表格順序（先來先進）放進記憶體；放不下的留在 new
+        fits = new[np.cumsum(self.request[new]) <= free]
+        for i in fits.tolist():
+            if not ram.allocate(int(c["pid"][i]), float(self.request[i])):
+                break
+            c["memory"][i] = self.request[i]
+            c["state"][i] = STATE_CODES["ready"]
+
+    def _terminate(self, rows):
+        c = self.columns
+        for i in rows.tolist():
+            self.machine.ram.deallocate(int(c["pid"][i]))
+        c["state"][rows] = STATE_CODES["terminated"]
+        c["memory"][rows] = 0
+        c["cpu"][rows] = 0
+
+    def kill(self, pid):
+        rows = np.flatnonzero(self.columns["pid"] == pid)
+        rows = rows[self.columns["state"][rows] != STATE_CODES["terminated"]]
+        self._terminate(rows)
+        self.killed += len(rows)
+        return len(rows) > 0
+
+    def step(self, dt):
+        c = self.columns
+        state = c["state"]
+        self._admit()
+        cpu = self.machine.cpu
+        threads = cpu.threads
+        state[state == STATE_CODES["running"]] = STATE_CODES["ready"]
+        ready = np.flatnonzero(state == STATE_CODES["ready"])
+        share = np.zeros(len(state), dtype=np.float32)
+        if len(ready):
+            start = np.searchsorted(ready, self.cursor)
+            running = np.roll(ready, -start)[:threads]
+            self.cursor = int(running[-1]) + 1
+            # SMT：同一核心上的兩個執行緒分享核心，每個執行緒拿到 cores / threads 的核心時間
+            speed = min(1.0, cpu.cores / len(running))
+            ran = np.minimum(self.remaining[running], dt * speed)
+            self.remaining[running] -= ran
+            c["cpu_time"][running] += ran
+            share[running] = ran / dt * 100
+            state[running] = STATE_CODES["running"]
+            self.core_busy = [100.0 if k < len(running) else 0.0 for k in range(cpu.cores)]
+            done = running[self.remaining[running] <= 0]
+            if len(done):
+                self._terminate(done)
+            blocked = running[(self.remaining[running] > 0) & (self.rng.random(len(running)) < self.io_rate * ran)]
+            state[blocked] = STATE_CODES["waiting"]
+        else:
+            self.core_busy = [0.0] * cpu.cores
+        waiting = np.flatnonzero(state == STATE_CODES["waiting"])
+        state[waiting[self.rng.random(len(waiting)) < dt / self.io_time]] = STATE_CODES["ready"]
+        c["cpu"] += self.cpu_smoothing * (share - c["cpu"])
+        # 結束的列過一陣子換成新的行程（新的 pid）
+        dead = np.flatnonzero(state == STATE_CODES["terminated"])
+        reborn = dead[self.rng.random(len(dead)) < dt / self.respawn_time]
+        if len(reborn):
+            c["pid"][reborn] = np.arange(self.next_pid, self.next_pid + len(reborn))
+            self.next_pid += len(reborn)
+            state[reborn] = STATE_CODES["new"]
+            c["cpu_time"][reborn] = 0
+            self.remaining[reborn] = self.rng.exponential(self.mean_burst, len(reborn))
+            self.request[reborn] = self.rng.uniform(*self.memory_range, len(reborn))
+        target = self.clock.now + dt
+        self.clock.run(until=target)
+        self.clock.now = max(self.clock.now, target)
+
+    def snapshot(self, reuse):
+        """Dict snapshot; the column arrays are copied into reuse's arrays when given."""
+        if reuse is None:
+            columns = {name: column.copy() for name, column in self.columns.items()}
+        else:
+            columns = reuse["columns"]
+            for name, column in self.columns.items():
+                np.copyto(columns[name], column)
+        used, total = self.machine.ram.get_usage()
+        return {
+            "time": self.clock.now,
+            "cpu": list(self.core_busy),
+            "ram_used": used,
+            "ram_total": total,
+            "columns": columns,
+            "states": np.bincount(columns["state"], minlength=len(STATUS)).tolist(),
+        }
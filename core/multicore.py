@@ -0,0 +1,343 @@
+import heapq
+from collections import deque
+
+from consts import CPU_CORES, CPU_THREADS
+from core.engine import _unpack
+
+# 多核心排程模擬：每個核心有自己的 run queue（或共用一個 global queue），
+# 空閒的硬體執行緒會去別的核心偷工作；SMT 用「整顆核心的吞吐量倍率」表示，
+# 行程換到另一顆核心執行時要多付 migration_cost 的工作量。
+# Time is event driven: arrivals, completions and quantum expiries only.
+
+ARRIVAL, DONE, QUANTUM = 0, 1, 2  # 同一時間：先到達、再完成、最後才是 quantum 到期
+
+
+class _FifoQueue:
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = deque()
+
+    def push(self, job, burst, seq):
+        self.items.append(job)
+
+    def pop(self):
+        return self.items.popleft()
+
+    def steal(self):
+        return self.items.pop()  # 從尾端偷，減少和擁有者搶同一端
+
+    def __len__(self):
+        return len(self.items)
+
+
+class _ShortestQueue:
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = []
+
+    def push(self, job, burst, seq):
+        heapq.heappush(self.items, (burst, seq, job))
+
+    def pop(self):
+        return heapq.heappop(self.items)[2]
+
+    steal = pop
+
+    def __len__(self):
+        return len(self.items)
+
+
+QUEUES = {"FCFS": _FifoQueue, "RR": _FifoQueue, "SJF": _ShortestQueue}
+
+
+class MulticoreResult:
+    def __init__(self, policy, cores, threads_per_core, pids, arrival, burst):
+        n = len(pids)
+        self.policy = policy
+        self.cores = cores
+        self.threads_per_core = threads_per_core
+        self.pids = pids
+        self.arrival = arrival
+        self.burst = burst
+        self.completion = [None] * n
+        self.waiting = [0] * n
+        self.turnaround = [0] * n
+        self.segments = []  # [(pid, start, end, core), ...]
+        self.core_busy = [0.0] * cores  # 至少一個執行緒在跑的時間
+        self.thread_busy = [0.0] * cores  # 所有執行緒的忙碌時間加總
+        self.dispatches = 0
+        self.migrations = 0
+        self.steals = 0
+        self.makespan = 0
+
+    def finish(self, i, time):
+        self.completion[i] = time
+        self.turnaround[i] = time - self.arrival[i]
+        self.waiting[i] = self.turnaround[i] - self.burst[i]
+
+    @property
+    def span(self):
+        return self.makespan - min(self.arrival) if self.arrival else 0
+
+    def core_utilization(self):
+        return [busy / self.span if self.span else 0 for busy in self.core_busy]
+
+    def thread_utilization(self):
+        slots = self.span * self.threads_per_core
+        return [busy / slots if slots else 0 for busy in self.thread_busy]
+
+    def load_imbalance(self):
+        """max / mean of per-core busy time, minus 1 (0 = perfectly balanced)."""
+        mean = sum(self.core_busy) / self.cores
+        return max(self.core_busy) / mean - 1 if mean else 0
+
+    @property
+    def throughput(self):
+        return len(self.pids) / self.span if self.span else 0
+
+    def summary(self):
+        n = len(self.pids)
+        return {
+            "policy": self.policy,
+            "cores": self.cores,
+            "threads_per_core": self.threads_per_core,
+            "processes": n,
+            "avg_waiting_time": sum(self.waiting) / n if n else 0,
+            "avg_turnaround_time": sum(self.turnaround) / n if n else 0,
+            "makespan": self.makespan,
+            "throughput": self.throughput,
+            "core_utilization": self.core_utilization(),
+            "load_imbalance": self.load_imbalance(),
+            "dispatches": self.dispatches,
+            "migrations": self.migrations,
+            "steals": self.steals,
+        }
+
+
+def simulate(jobs, cores=CPU_CORES, threads=CPU_THREADS, policy="FCFS", quantum=3, global_queue=False,
+             work_stealing=True, smt_factor=1.3, migration_cost=0.5):
+    """Simulate jobs on `cores` cores with threads // cores hardware threads each.
+
+    smt_factor is the throughput of a core with every hardware thread busy,
+    relative to one thread alone; threads on the same core share it equally.
+    """
+    policy = policy.upper()
+    if policy not in QUEUES:
+        raise ValueError(f"Unknown multicore policy: {policy}")
+    if cores < 1 or threads < cores:
+        raise ValueError("need at least one core and one thread per core")
+    slots = threads // cores
+    pids, arrival, burst = _unpack(jobs)
+    n = len(pids)
+    result = MulticoreResult(policy, cores, slots, pids, arrival, burst)
+
+    remaining = [float(b) for b in burst]
+    affinity = [None] * n  # 上次執行的核心
+    dispatch_id = [0] * n
+    dispatch_start = [0] * n
+    queues = [QUEUES[policy]() for _ in range(1 if global_queue else cores)]
+    running = [set() for _ in range(cores)]
+    rate = [0.0] * cores
+    last_update = [0.0] * cores
+    version = [0] * cores
+    events = []
+    seq = 0
+    queued = 0  # 所有 queue 裡等待的行程數
+    shared = global_queue or work_stealing  # 有空位的核心能不能拿別人 queue 裡的工作
+    # 三個 lazy heap，過期的項目在 top 被檢查到時才丟掉，每次變動只要 O(log cores)：
+    #   lightest  (負載, 核心)：新到達的行程放哪顆核心
+    #   longest   (-queue 長度, 核心)：偷工作的對象
+    #   free[r]   正好跑 r 個行程的核心：到達時依序補哪些核心的空執行緒
+    lightest = [(0, c) for c in range(cores)] if not global_queue else []
+    longest = []
+    free = [list(range(cores))] + [[] for _ in range(slots - 1)]
+
+    def throughput(active):
+        if active <= 1 or slots == 1:
+            return 1.0
+        return 1.0 + (smt_factor - 1.0) * (active - 1) / (slots - 1)
+
+    def push(time, kind, core, job, tag):
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (time, kind, seq, core, job, tag))
+
+    def advance(c, now):
+        # 把核心 c 上所有執行中的行程推進到 now
+        elapsed = now - last_update[c]
+        if running[c] and elapsed > 0:
+            done = rate[c] * elapsed
+            for j in running[c]:
+                remaining[j] -= done
+            result.core_busy[c] += elapsed
+            result.thread_busy[c] += elapsed * len(running[c])
+        last_update[c] = now
+
+    def reschedule(c, now):
+        # 佔用的執行緒數改變 → 每個行程的速度改變 → 重新排完成事件（舊事件靠 version 作廢）
+        version[c] += 1
+        active = len(running[c])
+        rate[c] = throughput(active) / active if active else 0.0
+        for j in running[c]:
+            push(now + max(remaining[j], 0.0) / rate[c], DONE, c, j, version[c])
+
+    def load(c):
+        return len(running[c]) + (0 if global_queue else len(queues[c]))
+
+    def touch(c):
+        # 核心 c 的 running 或 queue 變了：把新的值放進 heap（舊的項目留著，之後再丟）
+        if not global_queue:
+            heapq.heappush(lightest, (load(c), c))
+            if len(queues[c]):
+                heapq.heappush(longest, (-len(queues[c]), c))
+            if len(lightest) > 4 * cores + 64:  # 過期項目太多就重建，記憶體維持 O(cores)
+                lightest[:] = [(load(k), k) for k in range(cores)]
+                heapq.heapify(lightest)
+                longest[:] = [(-len(queues[k]), k) for k in range(cores) if len(queues[k])]
+                heapq.heapify(longest)
+        r = len(running[c])
+        if r < slots:
+            heapq.heappush(free[r], c)
+            if len(free[r]) > 4 * cores + 64:
+                free[r][:] = [k for k in range(cores) if len(running[k]) == r]
+
+    def place():
+        # 負載最小的核心，同負載取編號小的（和 min(range(cores), key=load) 一樣）
+        while lightest[0][0] != load(lightest[0][1]):
+            heapq.heappop(lightest)
+        return lightest[0][1]
+
+    def take(c):
+        nonlocal queued
+        if not queued:
+            return None
+        queue = queues[0 if global_queue else c]
+        if len(queue):
+            queued -= 1
+            return queue.pop()
+        if work_stealing and not global_queue:
+            # queue 最長的核心，同長度取編號小的
+            while -longest[0][0] != len(queues[longest[0][1]]):
+                heapq.heappop(longest)
+            victim = longest[0][1]
+            result.steals += 1
+            queued -= 1
+            j = queues[victim].steal()
+            touch(victim)
+            return j
+        return None
+
+    def fill(c, now, limit=slots, changed=False):
+        advance(c, now)
+        while len(running[c]) < limit:
+            j = take(c)
+            if j is None:
+                break
+            if affinity[j] is not None and affinity[j] != c:
+                remaining[j] += migration_cost
+                result.migrations += 1
+            affinity[j] = c
+            running[c].add(j)
+            dispatch_id[j] += 1
+            dispatch_start[j] = now
+            result.dispatches += 1
+            if policy == "RR":
+                push(now + quantum, QUANTUM, c, j, dispatch_id[j])
+            changed = True
+        if changed:
+            touch(c)
+            reschedule(c, now)
+
+    def next_free(level):
+        # 跑不到 level 個行程的核心裡編號最小的；沒有就 None
+        best = None
+        for r in range(level):
+            heap = free[r]
+            while heap and len(running[heap[0]]) != r:
+                heapq.heappop(heap)
+            if heap and (best is None or heap[0] < free[best][0]):
+                best = r
+        return None if best is None else heapq.heappop(free[best])
+
+    def stop(c, j, now):
+        running[c].discard(j)
+        result.segments.append((pids[j], dispatch_start[j], now, c))
+
+    for i in sorted(range(n), key=arrival.__getitem__):
+        push(arrival[i], ARRIVAL, -1, i, 0)
+
+    while events:
+        now, kind, _, c, j, tag = heapq.heappop(events)
+        if kind == ARRIVAL:
+            # 同一時間到達的全部排進 queue 之後才分派，SJF 才看得到全部候選
+            placed = set()
+            while True:
+                core = 0 if global_queue else place()
+                queues[core].push(j, burst[j], j)
+                queued += 1
+                if not global_queue:
+                    placed.add(core)
+                    touch(core)
+                if not events or events[0][0] != now or events[0][1] != ARRIVAL:
+                    break
+                j = heapq.heappop(events)[4]
+            # 一次補一層執行緒：先讓每顆核心都有一個行程，再用 SMT 的第二個執行緒。
+            # 有空位的核心自己的 queue 一定是空的（否則早就補上了），所以只有這次放進工作的核心、
+            # 或能拿別人工作時依編號排在前面的空核心會拿到東西；工作分完就停。
+            for level in range(1, slots + 1):
+                if shared:
+                    while queued:
+                        core = next_free(level)
+                        if core is None:
+                            break
+                        fill(core, now, level)
+                else:
+                    for core in sorted(placed):
+                        if len(running[core]) < level:
+                            fill(core, now, level)
+                if not queued:
+                    break
+        elif kind == DONE:
+            if tag != version[c]:
+                continue  # 速度改變後留下的舊事件
+            advance(c, now)
+            stop(c, j, now)
+            remaining[j] = 0.0
+            result.finish(j, now)
+            result.makespan = max(result.makespan, now)
+            fill(c, now, changed=True)
+        else:  # QUANTUM
+            if j not in running[c] or tag != dispatch_id[j]:
+                continue
+            queue = queues[0 if global_queue else c]
+            if len(queue) == 0:
+                dispatch_id[j] += 1
+                push(now + quantum, QUANTUM, c, j, dispatch_id[j])  # 沒人在等，繼續跑
+                continue
+            advance(c, now)
+            stop(c, j, now)
+            queue.push(j, remaining[j], j)
+            queued += 1
+            fill(c, now, changed=True)
+    return result
+
+
+def scaling(jobs, core_counts=(1, 2, 4, 8, 16, 32, 64), threads_per_core=CPU_THREADS // CPU_CORES, **options):
+    """Throughput and utilization for the same job mix on each core count."""
+    jobs = list(jobs)
+    rows = []
+    for cores in core_counts:
+        result = simulate(jobs, cores=cores, threads=cores * threads_per_core, **options)
+        summary = result.summary()
+        rows.append({
+            "cores": cores,
+            "throughput": summary["throughput"],
+            "makespan": summary["makespan"],
+            "avg_waiting_time": summary["avg_waiting_time"],
+            "mean_core_utilization": sum(summary["core_utilization"]) / cores,
+            "load_imbalance": summary["load_imbalance"],
+            "migrations": summary["migrations"],
+        })
+    return rows
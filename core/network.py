@@ -0,0 +1,590 @@
+import heapq
+import random
+import zlib
+from collections import deque
+
+import numpy as np
+
+from consts import CPU_CLOCK, CPU_CORES, CPU_THREADS, NETWORK_BANDWIDTH, NETWORK_LATENCY, RAM_CAP, SSD
+from core import instrument
+from core.hardware import CPU, RAM, Disk, Operation, VirtualClock
+
+# 流量層級（flow-level）的網路模型：多台節點（各自有 CPU / RAM / Disk）經由交換器和
+# 有頻寬（Mbps）與延遲（ms）的連結相連，同時進行的傳輸依 max-min fairness 分享每條連結。
+#
+# 同一對 (src, dst) 走同一條路徑，max-min 下拿到的速率一定相同，所以速率是以「路徑類別」
+# 為單位計算（water-filling 的成本看的是有流量的路徑數 x 路徑長度，和同時有幾條 flow 無關）；
+# 每個類別內部和 core.hardware.SharedChannel 一樣用累積服務量當虛擬時間，一條 flow 在
+# 累積服務量到達 (加入時的服務量 + 大小) 時完成，速率改變時不用逐條更新剩餘量。
+# 同一個時間點的多個到達只重算一次（延到該時間點的最後）。
+
+
+class Topology:
+    """Nodes, switches and full-duplex links; routes are fewest-hop paths.
+
+    Each connect() makes two directed links, one per direction, each with
+    its own bandwidth. Among equally short paths a route is picked by
+    hashing the (src, dst) pair, so traffic spreads over parallel uplinks
+    (ECMP) while a given pair always uses the same path.
+    """
+
+    def __init__(self):
+        self.names = []  # 頂點：節點與交換器
+        self.index = {}
+        self.nodes = []  # 有 CPU / RAM / Disk 的頂點名稱
+        self.adjacent = []  # 頂點 -> [(鄰居, 連結), ...]
+        self.link_ends = []  # 連結 -> (from, to)
+        self.bandwidth = []  # Mbps
+        self.latency = []  # ms
+        self._routes = {}
+
+    def _vertex(self, name):
+        if name in self.index:
+            raise ValueError(f"{name!r} is already in the topology")
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.adjacent.append([])
+        return name
+
+    def add_node(self, name):
+        self.nodes.append(self._vertex(name))
+        return name
+
+    def add_switch(self, name):
+        return self._vertex(name)
+
+    def connect(self, a, b, bandwidth=NETWORK_BANDWIDTH, latency=NETWORK_LATENCY / 2):
+        """Full-duplex link a <-> b: bandwidth Mbps and latency ms in each direction."""
+        for u, v in ((a, b), (b, a)):
+            link = len(self.link_ends)
+            self.link_ends.append((u, v))
+            self.bandwidth.append(float(bandwidth))
+            self.latency.append(float(latency))
+            self.adjacent[self.index[u]].append((self.index[v], link))
+        self._routes.clear()
+
+    def route(self, src, dst):
+        """Link ids from src to dst (empty when src == dst)."""
+        key = (src, dst)
+        path = self._routes.get(key)
+        if path is None:
+            path = self._routes[key] = self._shortest(self.index[src], self.index[dst], zlib.crc32(f"{src}->{dst}".encode()))
+        return path
+
+    def _shortest(self, source, target, salt):
+        # 從 target 反向 BFS 求每個頂點的距離，再從 source 每一步在「距離少 1」的鄰居裡挑一個
+        distance = {target: 0}
+        frontier = deque([target])
+        while frontier:
+            vertex = frontier.popleft()
+            for neighbour, _ in self.adjacent[vertex]:  # 全雙工：反向邊一定存在
+                if neighbour not in distance:
+                    distance[neighbour] = distance[vertex] + 1
+                    frontier.append(neighbour)
+        if source not in distance:
+            raise ValueError(f"no route from {self.names[source]!r} to {self.names[target]!r}")
+        path, vertex = [], source
+        while vertex != target:
+            options = [(neighbour, link) for neighbour, link in self.adjacent[vertex]
+                       if distance.get(neighbour) == distance[vertex] - 1]
+            vertex, link = options[salt % len(options)]
+            path.append(link)
+        return path
+
+    def path_latency(self, src, dst):
+        """Propagation delay in seconds along the route."""
+        return sum(self.latency[link] for link in self.route(src, dst)) / 1000
+
+    @classmethod
+    def star(cls, n, bandwidth=NETWORK_BANDWIDTH, latency=NETWORK_LATENCY / 2):
+        """n nodes ("node0"...) on one switch; node to node is two hops."""
+        topology = cls()
+        topology.add_switch("switch")
+        for i in range(n):
+            topology.connect(topology.add_node(f"node{i}"), "switch", bandwidth, latency)
+        return topology
+
+    @classmethod
+    def two_tier(cls, racks, per_rack, bandwidth=NETWORK_BANDWIDTH, uplink=None, spines=1,
+                 latency=NETWORK_LATENCY / 4):
+        """racks x per_rack nodes, a top-of-rack switch per rack, every ToR linked to every spine.
+
+        uplink is the bandwidth of each ToR-spine link; the default
+        per_rack * bandwidth / spines makes the fabric non-blocking, a
+        smaller value oversubscribes it.
+        """
+        topology = cls()
+        uplink = uplink if uplink is not None else per_rack * bandwidth / spines
+        for s in range(spines):
+            topology.add_switch(f"spine{s}")
+        for r in range(racks):
+            tor = topology.add_switch(f"tor{r}")
+            for s in range(spines):
+                topology.connect(tor, f"spine{s}", uplink, latency)
+            for i in range(per_rack):
+                topology.connect(topology.add_node(f"node{r * per_rack + i}"), tor, bandwidth, latency)
+        return topology
+
+
+class FlowNetwork:
+    """Max-min fair flow-level network on a shared VirtualClock.
+
+    transfer() returns a core.hardware.Operation that first waits for the
+    route's propagation delay, then shares every link on its route with
+    the other active flows until size_mb megabytes have crossed.
+
+    Rates are recomputed on every arrival and departure (arrivals at the
+    same instant together). resolution > 0 recomputes them at most once
+    per resolution seconds instead: flows keep their previous rate until
+    then, which trades accuracy for speed on very large runs.
+    """
+
+    def __init__(self, clock, topology, resolution=0.0):
+        self.clock = clock
+        self.topology = topology
+        self.resolution = resolution
+        self.capacity = np.asarray(topology.bandwidth, dtype=np.float64)
+        self.carried = np.zeros(len(self.capacity))  # 每條連結累積傳了幾 Mb
+        self.load = np.zeros(len(self.capacity))  # 每條連結目前的總速率
+        self.level = np.full(len(self.capacity), np.inf)  # 上次重算時連結成為瓶頸的 share
+        self.classes = {}  # (src, dst) -> 類別編號
+        self.paths = []  # 類別 -> 連結編號陣列
+        self.delays = []  # 類別 -> 路徑延遲（秒）
+        self.heaps = []  # 類別 -> [(完成時的服務量, seq, op), ...]
+        size = 64
+        self.count = np.zeros(size, dtype=np.int64)  # 類別裡的 flow 數
+        self.rate = np.zeros(size)  # 類別裡每條 flow 的速率（Mbps）
+        self.service = np.zeros(size)  # 類別裡每條 flow 累積收到的 Mb
+        self.head = np.full(size, np.inf)  # 類別裡最早完成的服務量
+        self.path_length = np.zeros(size, dtype=np.int64)
+        self.bottleneck = np.zeros(size, dtype=np.int64)  # 類別 -> 決定它速率的連結
+        self.route_matrix = np.zeros((size, 1), dtype=np.int64)  # 類別 -> 路徑上的連結（補 0 到同樣長度）
+        self.stats = {"flows": 0, "completed": 0, "allocations": 0, "solved": 0, "rounds": 0, "refilled": 0}
+        self._entries = None  # (類別, 連結) 展開後的陣列，只含有 flow 的類別
+        self._grew = set()  # 上次重算後 flow 變多 / 變少 / 從 0 開始有 flow 的類別
+        self._shrunk = set()
+        self._fresh = set()
+        self._last = clock.now
+        self._event = None
+        self._pending = None
+        self._seq = 0
+        probe = instrument.probe("network")
+        if probe is not None:
+            self._allocate = self._probed(probe, self._allocate)
+
+    def _probed(self, probe, allocate):
+        # 只有開啟量測時才換上這個版本：每次重算的時間、當時的 flow 數，以及有沒有走快路徑
+        timed = probe.wrap("network.allocate", allocate, "network")
+
+        def probed():
+            solved = self.stats["solved"]
+            timed()
+            probe.gauge("network.flows", self.active)
+            probe.count("network.solved" if self.stats["solved"] > solved else "network.refilled")
+        return probed
+
+    # --- 對外 ---
+
+    def transfer(self, src, dst, size_mb, name=None):
+        op = Operation(self.clock, name or f"{src}->{dst} {size_mb}MB", "transfer", size_mb)
+        self.stats["flows"] += 1
+        if src == dst:  # 同一台機器：不經過網路
+            self.clock.schedule(0, self._local, op)
+            return op
+        key = (src, dst)
+        flow_class = self.classes.get(key)
+        if flow_class is None:
+            flow_class = self._new_class(key)
+        self.clock.schedule(self.delays[flow_class], self._start, flow_class, op, size_mb * 8)
+        return op
+
+    @property
+    def active(self):
+        return int(self.count.sum())
+
+    def flow_rate(self, src, dst):
+        """Current rate in Mbps of each flow from src to dst."""
+        flow_class = self.classes.get((src, dst))
+        return float(self.rate[flow_class]) if flow_class is not None else 0.0
+
+    def utilization(self):
+        """{(from, to): fraction of the link's capacity used so far}."""
+        self._advance()
+        now = self.clock.now
+        return {ends: float(self.carried[link] / (self.capacity[link] * now)) if now else 0.0
+                for link, ends in enumerate(self.topology.link_ends)}
+
+    # --- 類別 ---
+
+    def _new_class(self, key):
+        flow_class = self.classes[key] = len(self.paths)
+        self.paths.append(np.asarray(self.topology.route(*key), dtype=np.int64))
+        self.delays.append(self.topology.path_latency(*key))
+        route = self.paths[-1]
+        if len(route) > self.route_matrix.shape[1]:
+            wider = np.zeros((len(self.route_matrix), len(route)), dtype=np.int64)
+            wider[:, :self.route_matrix.shape[1]] = self.route_matrix
+            self.route_matrix = wider
+        self.heaps.append([])
+        if flow_class == len(self.count):
+            for name, fill in (("count", 0), ("rate", 0.0), ("service", 0.0), ("head", np.inf), ("path_length", 0),
+                               ("bottleneck", 0)):
+                array = getattr(self, name)
+                grown = np.full(2 * len(array), fill, dtype=array.dtype)
+                grown[:len(array)] = array
+                setattr(self, name, grown)
+            matrix = np.zeros((2 * len(self.route_matrix), self.route_matrix.shape[1]), dtype=np.int64)
+            matrix[:len(self.route_matrix)] = self.route_matrix
+            self.route_matrix = matrix
+        self.route_matrix[flow_class, :len(route)] = route
+        self.path_length[flow_class] = len(route)
+        return flow_class
+
+    def _local(self, op):
+        self.stats["completed"] += 1
+        op.started = self.clock.now
+        op._finish(self.clock.now)
+
+    def _start(self, flow_class, op, work):
+        self._advance()
+        op.started = self.clock.now
+        self._seq += 1
+        heap = self.heaps[flow_class]
+        heapq.heappush(heap, (self.service[flow_class] + work, self._seq, op))
+        self.head[flow_class] = heap[0][0]
+        self.count[flow_class] += 1
+        self._grew.add(flow_class)
+        if self.count[flow_class] == 1:
+            self._fresh.add(flow_class)
+            self._entries = None
+        self._request()
+
+    # --- 速率 ---
+
+    def _advance(self):
+        now = self.clock.now
+        elapsed = now - self._last
+        if elapsed > 0:
+            self.service += self.rate * elapsed
+            self.carried += self.load * elapsed
+        self._last = now
+
+    def _build_entries(self):
+        # 依類別排好的 (類別, 連結) 展開：同一個類別的連結在陣列裡是連續的一段；
+        # by_link / link_start 是同一批 entry 依連結分組的索引
+        active = np.flatnonzero(self.count)
+        lengths = self.path_length[active]
+        mask = np.arange(self.route_matrix.shape[1]) < lengths[:, None]
+        classes, links = np.repeat(active, lengths), self.route_matrix[active][mask]
+        by_link = np.argsort(links, kind="stable")
+        link_start = np.searchsorted(links[by_link], np.arange(len(self.capacity) + 1))
+        self._entries = (active, lengths, classes, links, by_link, link_start)
+
+    def _links_of(self, flow_classes):
+        rows = np.fromiter(flow_classes, dtype=np.int64, count=len(flow_classes))
+        mask = np.arange(self.route_matrix.shape[1]) < self.path_length[rows][:, None]
+        return np.unique(self.route_matrix[rows][mask])
+
+    def _threshold(self):
+        """Fair-share level below which the previous allocation still holds.
+
+        Water-filling only raises shares, so below the first level where a
+        changed link's share differs from last time every round repeats
+        exactly. A link that lost flows can only move its own bottleneck
+        level; for a link that gained flows, walk its classes in order of
+        their old rates to find where its new share first drops to the
+        level being filled.
+        """
+        if not self._grew and not self._shrunk:
+            return np.inf
+        threshold = float(self.level[self._links_of(self._grew | self._shrunk)].min())
+        if not self._grew:
+            return threshold
+        _, _, classes, _, by_link, link_start = self._entries
+        for link in self._links_of(self._grew).tolist():
+            members = classes[by_link[link_start[link]:link_start[link + 1]]]
+            rates = self.rate[members].copy()
+            rates[np.isin(members, list(self._fresh))] = np.inf  # 上次沒有 flow：還沒有舊速率
+            order = np.argsort(rates)
+            rates, count = rates[order], self.count[members][order].astype(np.float64)
+            fixed = np.where(np.isfinite(rates), count * rates, 0.0)
+            remaining = self.capacity[link] - (np.cumsum(fixed) - fixed)
+            share = remaining / (count.sum() - (np.cumsum(count) - count))
+            crossed = np.flatnonzero(share <= rates)
+            if len(crossed):
+                threshold = min(threshold, float(share[:crossed[0] + 1].min()))
+        return threshold
+
+    def _solve(self, active, lengths, classes, links, count):
+        """Re-solve the rates with last time's bottleneck links; False if they no longer hold.
+
+        With every class pinned to its bottleneck link, each bottleneck
+        link is full and all its own classes share one level, so the levels
+        solve a small linear system (one row per bottleneck link). The
+        result is the max-min allocation iff no link is over capacity and
+        each class is among the fastest on its bottleneck link. When only
+        the second test fails, classes are re-pinned to the lowest level on
+        their path and the system is solved again, a few times at most.
+        """
+        if not len(active):
+            return False
+        size = len(self.capacity)
+        for flow_class in self._fresh:
+            # 新類別還沒有瓶頸連結：先猜路徑上目前 level 最低的那條，猜錯就會驗證失敗
+            route = self.route_matrix[flow_class, :self.path_length[flow_class]]
+            self.bottleneck[flow_class] = route[np.argmin(self.level[route])]
+        pinned = self.bottleneck[active]
+        starts = np.cumsum(lengths) - lengths
+        positions = np.arange(len(links))
+        for _ in range(4):
+            bottleneck = np.repeat(pinned, lengths)
+            saturated = np.flatnonzero(np.bincount(pinned, minlength=size))
+            # 第 i 列：瓶頸連結 saturated[i] 上每個類別的 flow 數，放在它自己瓶頸連結的那一欄
+            index = np.full(size, -1)
+            index[saturated] = np.arange(len(saturated))
+            row = index[links]
+            rows = row >= 0
+            system = np.bincount(row[rows] * len(saturated) + index[bottleneck[rows]], count[rows],
+                                 minlength=len(saturated) ** 2).reshape(len(saturated), len(saturated))
+            try:
+                solution = np.linalg.solve(system, self.capacity[saturated])
+            except np.linalg.LinAlgError:
+                return False
+            if not (solution > 0).all():
+                return False
+            level = np.full(size, np.inf)
+            level[saturated] = solution
+            rates = level[bottleneck]
+            load = np.bincount(links, count * rates, minlength=size)
+            if (load > self.capacity * (1 + 1e-9) + 1e-9).any():
+                return False
+            fastest = np.zeros(size)
+            np.maximum.at(fastest, links, rates)
+            if (rates >= fastest[bottleneck] * (1 - 1e-9)).all():
+                self.rate[classes] = rates
+                self.bottleneck[active] = pinned
+                self.level = level
+                self.load = load
+                return True
+            # 有類別比它瓶頸連結上的其他類別慢：每個類別改掛到路徑上 level 最低的連結
+            on_path = level[links]
+            lowest = np.repeat(np.minimum.reduceat(on_path, starts), lengths)
+            pinned = links[np.minimum.reduceat(np.where(on_path <= lowest, positions, len(links)), starts)]
+        return False
+
+    def _allocate(self):
+        """Max-min fair rates: _solve() when the bottlenecks stay put, else parallel water-filling.
+
+        A link's fair share is its remaining capacity over the flows still
+        unfixed on it. Each round fixes, at once, every link whose share is
+        no larger than that of any link it shares a class with: sequential
+        water-filling would fix it at exactly that share, because fixing
+        other links never lowers a share. The classes crossing those links
+        get that share and their bandwidth comes off their other links.
+
+        Only classes at or above _threshold() are filled again; the ones
+        below keep their rates and just take their bandwidth off first.
+        """
+        self.stats["allocations"] += 1
+        if self._entries is None:
+            self._build_entries()
+        active, lengths, classes, links, _, _ = self._entries
+        count = self.count[classes].astype(np.float64)
+        if self._solve(active, lengths, classes, links, count):
+            self.stats["solved"] += 1
+            self._grew, self._shrunk, self._fresh = set(), set(), set()
+            return
+        threshold = self._threshold()
+        kept = self.rate[active] < threshold * (1 - 1e-9)  # 差一點點等於門檻的也重算，保守一定正確
+        changed = self._grew | self._shrunk
+        if changed:
+            kept[np.isin(active, list(changed))] = False
+        self._grew, self._shrunk, self._fresh = set(), set(), set()
+        self.level[self.level >= threshold] = np.inf
+        kept_entries = np.repeat(kept, lengths)
+        remaining = self.capacity - np.bincount(links[kept_entries],
+                                                (count * self.rate[classes])[kept_entries], minlength=len(self.capacity))
+        open_classes, open_lengths = active[~kept], lengths[~kept]
+        open_links, open_count = links[~kept_entries], count[~kept_entries]
+        self.stats["refilled"] += len(open_classes)
+        self.rate[open_classes] = 0.0
+        weight = np.bincount(open_links, open_count, minlength=len(remaining))
+        while len(open_classes):
+            self.stats["rounds"] += 1
+            with np.errstate(divide="ignore", invalid="ignore"):
+                share = np.where(weight > 0, remaining / weight, np.inf)
+            starts = np.cumsum(open_lengths) - open_lengths
+            # 每個類別路徑上最小的 share，再取每條連結上所有類別的最小值
+            smallest = np.minimum.reduceat(share[open_links], starts)
+            neighbours = np.full(len(share), np.inf)
+            np.minimum.at(neighbours, open_links, np.repeat(smallest, open_lengths))
+            local = (share <= neighbours * (1 + 1e-9)) & (weight > 0)
+            self.level[local] = share[local]
+            hit = local[open_links]
+            done = np.logical_or.reduceat(hit, starts)
+            self.rate[open_classes[done]] = np.maximum(smallest[done], 0.0)
+            first = np.minimum.reduceat(np.where(hit, np.arange(len(hit)), len(hit)), starts)
+            self.bottleneck[open_classes[done]] = open_links[first[done]]
+            entries = np.repeat(done, open_lengths)
+            fixed_links, fixed_count = open_links[entries], open_count[entries]
+            remaining -= np.bincount(fixed_links, fixed_count * np.repeat(smallest[done], open_lengths[done]),
+                                     minlength=len(remaining))
+            weight -= np.bincount(fixed_links, fixed_count, minlength=len(remaining))
+            keep = ~entries
+            open_classes, open_lengths = open_classes[~done], open_lengths[~done]
+            open_links, open_count = open_links[keep], open_count[keep]
+        self.load = np.bincount(links, count * self.rate[classes], minlength=len(remaining))
+
+    def _request(self):
+        # 同一時間的其他到達處理完再重算；有 resolution 時對齊到下一個 resolution 的倍數
+        if self._pending is None:
+            delay = self.resolution - self.clock.now % self.resolution if self.resolution else 0.0
+            self._pending = self.clock.schedule(delay, self._reallocate)
+
+    def _active(self):
+        if self._entries is None:
+            self._build_entries()
+        return self._entries[0]
+
+    def _reallocate(self):
+        self._pending = None
+        self._advance()
+        self._allocate()
+        self._reschedule()
+
+    def _reschedule(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        active = self._active()
+        moving = active[self.rate[active] > 0]
+        if len(moving):
+            left = (self.head[moving] - self.service[moving]) / self.rate[moving]
+            self._event = self.clock.schedule(max(float(left.min()), 0.0), self._complete)
+
+    def _complete(self):
+        self._event = None
+        self._advance()
+        now = self.clock.now
+        active = self._active()
+        # 容許誤差跟著 now 與累積服務量放大，避免剩下的時間小於浮點解析度而卡住
+        limit = self.service[active] * (1 + 1e-12) + self.rate[active] * abs(now) * 1e-12 + 1e-9
+        due = self.head[active] <= limit
+        finished = []
+        for flow_class, service in zip(active[due].tolist(), limit[due].tolist()):
+            heap = self.heaps[flow_class]
+            while heap and heap[0][0] <= service:
+                finished.append(heapq.heappop(heap)[2])
+            self.head[flow_class] = heap[0][0] if heap else np.inf
+            self.count[flow_class] = len(heap)
+            self._shrunk.add(flow_class)
+            if not heap:
+                self.rate[flow_class] = 0.0
+                self.service[flow_class] = 0.0  # 類別清空了，服務量歸零避免越積越大
+                self._entries = None
+        self.stats["completed"] += len(finished)
+        if self.resolution or self._pending is not None:
+            self._request()  # 其他類別先用原本的速率繼續
+        else:
+            self._allocate()
+        self._reschedule()
+        for op in finished:
+            op._finish(now)
+
+
+class Node:
+    """One machine of a cluster: its own CPU, RAM and Disk on the cluster clock."""
+
+    def __init__(self, cluster, name, cores=CPU_CORES, threads=CPU_THREADS, clock_speed=CPU_CLOCK, ram_gb=RAM_CAP,
+                 disk_gb=SSD, verbose=False):
+        self.cluster = cluster
+        self.name = name
+        self.cpu = CPU(cluster.clock, cores, threads, clock_speed, verbose=verbose)
+        self.ram = RAM(ram_gb, verbose=verbose)
+        self.disk = Disk(cluster.clock, disk_gb, verbose=verbose)
+        self.tasks = 0  # 已經放到這台、還沒做完的工作
+
+    def send(self, dst, size_mb, name=None):
+        return self.cluster.transfer(self.name, dst, size_mb, name)
+
+    def load(self):
+        return self.tasks + sum(len(channel) for channel in self.cpu.core_channels)
+
+
+def _all(clock, name, ops):
+    """Operation that finishes when every op in ops has."""
+    joined = Operation(clock, name, "join", len(ops))
+    left = [len(ops)]
+
+    def one_done(_):
+        left[0] -= 1
+        if left[0] == 0:
+            joined._finish(clock.now)
+
+    if not ops:
+        clock.schedule(0, joined._finish, clock.now)
+    for op in ops:
+        op.then(one_done)
+    return joined
+
+
+class Cluster:
+    """Nodes of a Topology, each a Node, joined by a FlowNetwork on one clock.
+
+    run_task() fetches a task's inputs (local ones from the node's disk,
+    remote ones over the network), then runs its cycles on the node's CPU;
+    submit() first picks the node with place().
+    """
+
+    PLACEMENTS = ("locality", "least_loaded", "random")
+
+    def __init__(self, topology, clock=None, seed=0, verbose=False, **hardware):
+        self.clock = clock or VirtualClock()
+        self.topology = topology
+        self.network = FlowNetwork(self.clock, topology)
+        self.nodes = {name: Node(self, name, verbose=verbose, **hardware) for name in topology.nodes}
+        self.rng = random.Random(seed)
+
+    def transfer(self, src, dst, size_mb, name=None):
+        return self.network.transfer(src, dst, size_mb, name)
+
+    def shuffle(self, sources, targets, size_mb, name="shuffle"):
+        """All-to-all: every source sends size_mb to every target; one Operation for the whole exchange."""
+        ops = [self.transfer(src, dst, size_mb) for src in sources for dst in targets]
+        return _all(self.clock, name, ops)
+
+    def place(self, inputs=(), policy="locality"):
+        """Node name for a task reading inputs [(node, size_mb), ...]."""
+        if policy not in self.PLACEMENTS:
+            raise ValueError(f"Unknown placement policy: {policy}")
+        if policy == "random":
+            return self.rng.choice(self.topology.nodes)
+        if policy == "locality" and inputs:
+            local = {}
+            for node, size_mb in inputs:
+                local[node] = local.get(node, 0) + size_mb
+            # 本地資料最多的節點；一樣多時挑比較閒的
+            return max(local, key=lambda node: (local[node], -self.nodes[node].load()))
+        return min(self.topology.nodes, key=lambda node: self.nodes[node].load())
+
+    def run_task(self, node, cycles, inputs=(), name=None):
+        """Fetch inputs to node, then execute cycles there; returns an Operation for the whole task."""
+        target = self.nodes[node]
+        name = name or f"task@{node}"
+        task = Operation(self.clock, name, "task", cycles)
+        target.tasks += 1
+        fetches = [target.disk.io("read", size_mb, name=f"{name} input") if src == node
+                   else self.transfer(src, node, size_mb, f"{name} input") for src, size_mb in inputs]
+
+        def compute(_):
+            target.tasks -= 1
+            target.cpu.execute_task(name, cycles).then(lambda op: task._finish(op.finished))
+
+        _all(self.clock, name, fetches).then(compute)
+        return task
+
+    def submit(self, cycles, inputs=(), policy="locality", name=None):
+        return self.run_task(self.place(inputs, policy), cycles, inputs, name)
+
+    def run(self, until=None):
+        return self.clock.run(until)
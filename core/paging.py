@@ -0,0 +1,361 @@
+import heapq
+import math
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# 分頁與頁面置換：FIFO / LRU / OPT / Clock / LFU。
+# LRU 和 OPT 是 stack algorithm，一次走完參考串算出每個參考的 stack distance，
+# 就能得到「所有頁框數」的分頁錯誤曲線，不用像 C# VirtualMemorySimulationService
+# 那樣每個頁框數重跑一次。LRU 的 stack distance 用 NumPy 向量化（wavelet matrix 計數），
+# 其他演算法則是逐一頁框數模擬。
+
+
+class FIFO:
+    def __init__(self, frames):
+        self.frames = frames
+        self.resident = set()
+        self.queue = deque()
+
+    def access(self, page):
+        """Reference page; True on a page fault."""
+        if page in self.resident:
+            return False
+        if len(self.resident) >= self.frames:
+            self.resident.discard(self.queue.popleft())
+        self.resident.add(page)
+        self.queue.append(page)
+        return True
+
+
+class LRU:
+    def __init__(self, frames):
+        self.frames = frames
+        self.pages = OrderedDict()
+
+    def access(self, page):
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            return False
+        if len(self.pages) >= self.frames:
+            self.pages.popitem(last=False)
+        self.pages[page] = None
+        return True
+
+
+class OPT:
+    """Belady's optimal policy; needs the whole reference string up front."""
+
+    def __init__(self, frames, refs):
+        self.frames = frames
+        self.next = next_use(refs).tolist()
+        self.time = 0
+        self.resident = {}  # page -> 下次使用的時間
+        self.heap = []  # (-下次使用時間, page)，舊項目取出時再檢查
+
+    def access(self, page):
+        upcoming = self.next[self.time]
+        self.time += 1
+        fault = page not in self.resident
+        if fault and len(self.resident) >= self.frames:
+            while True:
+                when, victim = heapq.heappop(self.heap)
+                if self.resident.get(victim) == -when:
+                    del self.resident[victim]
+                    break
+        self.resident[page] = upcoming
+        heapq.heappush(self.heap, (-upcoming, page))
+        return fault
+
+
+class Clock:
+    """Second-chance: a circular frame list with one reference bit per frame."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.slots = []
+        self.referenced = []
+        self.where = {}  # page -> slot
+        self.hand = 0
+
+    def access(self, page):
+        slot = self.where.get(page)
+        if slot is not None:
+            self.referenced[slot] = True
+            return False
+        if len(self.slots) < self.frames:
+            self.where[page] = len(self.slots)
+            self.slots.append(page)
+            self.referenced.append(True)
+            return True
+        while self.referenced[self.hand]:
+            self.referenced[self.hand] = False
+            self.hand = (self.hand + 1) % self.frames
+        del self.where[self.slots[self.hand]]
+        self.slots[self.hand] = page
+        self.referenced[self.hand] = True
+        self.where[page] = self.hand
+        self.hand = (self.hand + 1) % self.frames
+        return True
+
+
+class LFU:
+    """Least frequently used; ties go to the least recently used page."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.counts = {}  # resident page -> 參考次數
+        self.heap = []  # (count, time, page)，舊項目取出時再檢查
+        self.time = 0
+
+    def access(self, page):
+        self.time += 1
+        count = self.counts.get(page)
+        fault = count is None
+        if fault:
+            if len(self.counts) >= self.frames:
+                while True:
+                    old, _, victim = heapq.heappop(self.heap)
+                    if self.counts.get(victim) == old:
+                        del self.counts[victim]
+                        break
+            count = 0
+        self.counts[page] = count + 1
+        heapq.heappush(self.heap, (count + 1, self.time, page))
+        return fault
+
+
+POLICIES = {"FIFO": FIFO, "LRU": LRU, "OPT": OPT, "CLOCK": Clock, "LFU": LFU}
+
+
+def make_policy(policy, frames, refs=None):
+    try:
+        cls = POLICIES[policy.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown page replacement policy: {policy}") from None
+    if cls is OPT:
+        if refs is None:
+            raise ValueError("OPT needs the whole reference string")
+        return OPT(frames, refs)
+    return cls(frames)
+
+
+def simulate(policy, refs, frames):
+    """Page faults of one policy with a fixed number of frames."""
+    if frames <= 0:
+        return len(refs)
+    pager = make_policy(policy, frames, refs)
+    access = pager.access
+    return sum(access(page) for page in np.asarray(refs).tolist())
+
+
+def previous_use(refs):
+    """Index of the previous reference to the same page, -1 for first references."""
+    refs = np.asarray(refs)
+    order = np.argsort(refs, kind="stable")
+    prev = np.full(len(refs), -1, dtype=np.int64)
+    same = refs[order[1:]] == refs[order[:-1]]
+    prev[order[1:][same]] = order[:-1][same]
+    return prev
+
+
+def next_use(refs):
+    """Index of the next reference to the same page, len(refs) when there is none."""
+    refs = np.asarray(refs)
+    order = np.argsort(refs, kind="stable")
+    upcoming = np.full(len(refs), len(refs), dtype=np.int64)
+    same = refs[order[1:]] == refs[order[:-1]]
+    upcoming[order[:-1][same]] = order[1:][same]
+    return upcoming
+
+
+def _count_earlier_at_most(values):
+    """counts[i] = #{j < i : values[j] <= values[i]} with a wavelet matrix.
+
+    One stable partition per value bit; all n prefix queries descend the
+    levels together, so the work is O(n log max(values)) in NumPy.
+    """
+    values = values - values.min() if len(values) else values
+    n = len(values)
+    dtype = np.int32 if n < 2 ** 31 - 1 else np.int64
+    values = values.astype(dtype)
+    current = values
+    start = np.zeros(n, dtype=dtype)  # 每個查詢在這一層的區間 [start, end)
+    end = np.arange(n, dtype=dtype)
+    counts = np.zeros(n, dtype=dtype)
+    zeros = np.zeros(n + 1, dtype=dtype)
+    for level in range(max(int(values.max()).bit_length(), 1) - 1 if n else -1, -1, -1):
+        one = (current >> level) & 1
+        np.cumsum(1 - one, out=zeros[1:])
+        rank_start, rank_end = zeros[start], zeros[end]
+        query = (values >> level) & 1
+        counts += query * (rank_end - rank_start)  # 這一位是 0 的都比查詢值小
+        start += query * (zeros[-1] - rank_start) + (1 - query) * (rank_start - start)
+        end += query * (zeros[-1] - rank_end) + (1 - query) * (rank_end - end)
+        current = np.concatenate((current[one == 0], current[one == 1]))
+    return (counts + end - start).astype(np.int64)
+
+
+def lru_stack_distances(refs):
+    """LRU stack depth of every reference (1 = most recently used), 0 for cold misses.
+
+    The depth is 1 + the number of distinct pages since the previous
+    reference to the same page, i.e. #{j < t : prev[j] <= prev[t]} - prev[t].
+    Immediate repeats (depth 1) are dropped first; they never move the stack.
+    """
+    refs = np.asarray(refs)
+    distances = np.ones(len(refs), dtype=np.int64)
+    if not len(refs):
+        return distances
+    keep = np.concatenate(([True], refs[1:] != refs[:-1]))
+    prev = previous_use(refs[keep])
+    kept = _count_earlier_at_most(prev) - prev
+    kept[prev < 0] = 0
+    distances[keep] = kept
+    return distances
+
+
+def opt_stack_distances(refs, max_frames=None):
+    """OPT (Belady) stack depth of every reference, 0 for cold misses.
+
+    Mattson's priority stack with "next use" as the priority: the page that
+    is needed soonest stays higher. Each reference sweeps the stack down to
+    the referenced page, so this is O(n * depth) but still a single pass.
+    With max_frames only the top max_frames entries are kept (what falls
+    below them never comes back up on its own), so the cost is
+    O(n * max_frames) and references deeper than that count as misses (0).
+    """
+    refs = np.asarray(refs)
+    distances = np.zeros(len(refs), dtype=np.int64)
+    cap = len(refs) if max_frames is None else max_frames
+    if cap <= 0:
+        return distances
+    upcoming = next_use(refs).tolist()
+    stack = []
+    resident = set()  # 目前在 stack 裡的頁
+    priority = {}  # page -> 下次使用時間（越大越不急）
+    for t, page in enumerate(refs.tolist()):
+        if page in resident:
+            depth = stack.index(page)
+            distances[t] = depth + 1
+        else:
+            depth = len(stack)
+            resident.add(page)
+            if depth < cap:
+                stack.append(page)
+        priority[page] = upcoming[t]
+        if depth == 0:
+            continue
+        carried = stack[0]
+        stack[0] = page
+        for i in range(1, min(depth, cap)):
+            other = stack[i]
+            if priority[other] > priority[carried]:  # 比較不急的往下帶
+                stack[i] = carried
+                carried = other
+        if depth < cap:
+            stack[depth] = carried
+        else:
+            resident.discard(carried)  # 掉到 max_frames 以下
+    return distances
+
+
+def faults_from_distances(distances, max_frames=None):
+    """faults[f] for f = 0..max_frames frames from stack distances (0 = cold miss)."""
+    distances = np.asarray(distances)
+    if max_frames is None:
+        max_frames = int(distances.max()) if len(distances) else 0
+    hits = np.bincount(distances[(distances > 0) & (distances <= max_frames)], minlength=max_frames + 1)
+    return len(distances) - np.cumsum(hits)
+
+
+def fault_curve(refs, policy="LRU", max_frames=None):
+    """Page faults for every frame count 0..max_frames.
+
+    LRU and OPT take one pass over refs; the other policies are simulated
+    once per frame count (FIFO can show Belady's anomaly).
+    """
+    refs = np.asarray(refs)
+    policy = policy.upper()
+    if policy == "LRU":
+        return faults_from_distances(lru_stack_distances(refs), max_frames)
+    if policy == "OPT":
+        return faults_from_distances(opt_stack_distances(refs, max_frames), max_frames)
+    if max_frames is None:
+        max_frames = len(np.unique(refs))
+    return np.array([simulate(policy, refs, frames) for frames in range(max_frames + 1)])
+
+
+class PagedMemory:
+    """Physical frames shared by processes whose size comes from Process.memory.
+
+    Each process gets a contiguous range of global page numbers, so one
+    replacement policy manages every process (global replacement).
+    """
+
+    def __init__(self, frames, policy="LRU", page_size=4):
+        if policy.upper() == "OPT":
+            raise ValueError("OPT needs the whole reference string; use simulate() or fault_curve()")
+        self.frames = frames
+        self.page_size = page_size
+        self.policy = make_policy(policy, frames)
+        self.base = {}  # pid -> 第一個全域頁號
+        self.pages = {}  # pid -> 頁數
+        self.next_page = 0
+        self.references = {}
+        self.faults = {}
+
+    def add_process(self, process):
+        memory = getattr(process, "memory", None)
+        if memory is None:
+            memory = process.memory_limit
+        pages = max(1, math.ceil(memory / self.page_size))
+        self.base[process.pid] = self.next_page
+        self.pages[process.pid] = pages
+        self.next_page += pages
+        self.references[process.pid] = 0
+        self.faults[process.pid] = 0
+        return pages
+
+    def page_of(self, pid, address):
+        page = address // self.page_size
+        if not 0 <= page < self.pages[pid]:
+            raise ValueError(f"address {address} is outside the memory of process {pid}")
+        return self.base[pid] + page
+
+    def access(self, pid, address):
+        """Reference a virtual address of pid; True on a page fault."""
+        fault = self.policy.access(self.page_of(pid, address))
+        self.references[pid] += 1
+        self.faults[pid] += fault
+        return fault
+
+    def stats(self):
+        total = sum(self.references.values())
+        faults = sum(self.faults.values())
+        return {
+            "frames": self.frames,
+            "processes": len(self.base),
+            "references": total,
+            "faults": faults,
+            "fault_rate": faults / total if total else 0.0,
+            "per_process": {pid: {"references": self.references[pid], "faults": self.faults[pid]} for pid in self.base},
+        }
+
+
+def reference_trace(processes, length, page_size=4, seed=0, quantum=64, working_set=8, phase=4096, locality=0.9):
+    """Synthetic global page numbers for processes (sized by Process.memory).
+
+    The running process changes every quantum references; each process
+    mostly touches a working set of pages that moves every phase references.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = np.array([max(1, math.ceil((getattr(p, "memory", None) or p.memory_limit) / page_size)) for p in processes])
+    bases = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    running = np.repeat(rng.integers(len(processes), size=-(-length // quantum)), quantum)[:length]
+    pages = sizes[running]
+    window = np.minimum(working_set, pages)
+    start = (np.arange(length) // phase * 2654435761 + running * 40503) % np.maximum(pages - window + 1, 1)
+    local = start + rng.integers(0, 1 << 30, size=length) % window
+    anywhere = rng.integers(0, 1 << 30, size=length) % pages
+    return bases[running] + np.where(rng.random(length) < locality, local, anywhere)
@@ -0,0 +1,299 @@
+import csv
+import json
+import sys
+import time as _time
+
+import numpy as np
+
+from consts import STATUS
+
+# PCB 登錄表：每個行程的 PCB 只存一次，狀態轉換（new -> ready -> running -> waiting -> terminated）
+# 寫進預先配置的 ring buffer（固定記憶體），滿了或 flush() 時整批交給 sink：
+#   JSONLSink / CSVSink  批次寫檔
+#   ConsoleSink          節流的終端機輸出（取代每次 7 行的 display_pcb）
+# 查詢（依 pid 或時間）直接在 ring buffer 上用 NumPy 遮罩做，只看得到還留在 ring 裡的紀錄。
+
+TRANSITION_DTYPE = np.dtype([
+    ("time", "<f8"), ("pid", "<i8"), ("state", "i1"), ("previous", "i1"), ("program_counter", "<i8"),
+])
+NO_STATE = -1  # 第一次登錄時沒有前一個狀態
+
+
+class PCBRegistry:
+    """Process control blocks plus a ring buffer of state transitions.
+
+    record() costs one structured-array store; record_many() takes whole
+    columns. Rows are handed to the sinks in batches before the ring wraps
+    over them, so sinks see every transition while memory stays at
+    capacity rows.
+    """
+
+    def __init__(self, capacity=1 << 16, sinks=(), batch=None):
+        self.capacity = capacity
+        self.ring = np.zeros(capacity, dtype=TRANSITION_DTYPE)
+        self.count = 0  # 總共記錄過的轉換數
+        self.flushed = 0  # 已經交給 sink 的轉換數
+        self.batch = batch or capacity // 2
+        self.sinks = list(sinks)
+        self.states = [name.lower() for name in STATUS]
+        self._state_codes = {name: code for code, name in enumerate(self.states)}
+        self.labels = []  # pid 編號 -> 原本的 pid（"A"、42...）
+        self._pids = {}
+        self.current = []  # pid 編號 -> 目前狀態
+        self.blocks = []  # pid 編號 -> PCB 靜態欄位（暫存器、記憶體、開啟的檔案）
+        self._epoch = _time.perf_counter()
+
+    # --- 編碼 ---
+
+    def state_code(self, name):
+        key = name.lower()
+        code = self._state_codes.get(key)
+        if code is None:  # 例如 interruptSJF 的 "Suspended"
+            if len(self.states) >= 127:
+                raise ValueError("too many distinct process states")
+            code = self._state_codes[key] = len(self.states)
+            self.states.append(key)
+        return code
+
+    def pid_code(self, pid):
+        code = self._pids.get(pid)
+        if code is None:
+            code = self._pids[pid] = len(self.labels)
+            self.labels.append(pid)
+            self.current.append(NO_STATE)
+            self.blocks.append(None)
+        return code
+
+    # --- 記錄 ---
+
+    def register(self, process):
+        """Store the static PCB fields of process (registers, memory limit, open files) once."""
+        code = self.pid_code(process.pid)
+        registers = getattr(process, "registers", None) or getattr(process, "register", None)
+        memory = getattr(process, "memory_limit", None)
+        self.blocks[code] = {
+            "registers": dict(registers) if registers else {},
+            "memory_limit": memory if memory is not None else getattr(process, "memory", None),
+            "open_files": list(getattr(process, "open_files", ()) or ()),
+        }
+        return code
+
+    def record(self, process, state=None, time=None, program_counter=None):
+        """One transition of process to state (default process.state) at time (default: seconds since start)."""
+        pid = process.pid
+        code = self._pids.get(pid)
+        if code is None or self.blocks[code] is None:
+            code = self.register(process)
+        state = self.state_code(state if state is not None else process.state)
+        if time is None:
+            time = _time.perf_counter() - self._epoch
+        if program_counter is None:
+            program_counter = getattr(process, "program_counter", 0) or 0
+        if self.count - self.flushed >= self.capacity:
+            self.flush()
+        self.ring[self.count % self.capacity] = (time, code, state, self.current[code], program_counter)
+        self.current[code] = state
+        self.count += 1
+        if self.sinks and self.count - self.flushed >= self.batch:
+            self.flush()
+
+    def record_many(self, pids, states, times, program_counters=None):
+        """Vectorized record(): pids are pid codes (see pid_code), states are state codes."""
+        pids = np.asarray(pids, dtype=np.int64)
+        states = np.asarray(states, dtype=np.int8)
+        times = np.asarray(times, dtype=np.float64)
+        n = len(pids)
+        if len(self.current) <= (int(pids.max()) if n else -1):
+            raise ValueError("unknown pid code; register processes with pid_code() first")
+        # 每一列的前一個狀態：同一個 pid 在這批裡的上一列，或批次前的目前狀態
+        current = np.asarray(self.current, dtype=np.int8)
+        # 少於 65536 個行程時用 uint16 排序，NumPy 會走 radix sort（比 int64 快約 5 倍）
+        keys = pids.astype(np.uint16) if len(self.current) <= 1 << 16 else pids
+        order = np.argsort(keys, kind="stable")
+        sorted_pids = pids[order]
+        previous = np.empty(n, dtype=np.int8)
+        first = np.ones(n, dtype=bool)
+        first[1:] = sorted_pids[1:] != sorted_pids[:-1]
+        previous[order[first]] = current[sorted_pids[first]]
+        previous[order[~first]] = states[order[:-1][~first[1:]]]
+        last = np.ones(n, dtype=bool)
+        last[:-1] = first[1:]
+        current[sorted_pids[last]] = states[order[last]]
+        self.current = current.tolist()
+        counters = np.zeros(n, dtype=np.int64) if program_counters is None else np.asarray(program_counters)
+        ring, done = self.ring, 0
+        while done < n:
+            # 一次寫一段連續的 slot：到 ring 尾端或到還沒 flush 的資料為止
+            if self.count - self.flushed >= self.capacity:
+                self.flush()
+            start = self.count % self.capacity
+            end = done + min(n - done, self.capacity - start, self.capacity - (self.count - self.flushed))
+            size = end - done
+            ring["time"][start:start + size] = times[done:end]
+            ring["pid"][start:start + size] = pids[done:end]
+            ring["state"][start:start + size] = states[done:end]
+            ring["previous"][start:start + size] = previous[done:end]
+            ring["program_counter"][start:start + size] = counters[done:end]
+            self.count += size
+            done = end
+            if self.sinks and self.count - self.flushed >= self.batch:
+                self.flush()
+
+    def _pending(self, since):
+        """Ring rows from transition number since to count, oldest first."""
+        since = max(since, self.count - self.capacity)
+        start, end = since % self.capacity, self.count % self.capacity
+        if self.count - since == 0:
+            return self.ring[:0]
+        if start < end:
+            return self.ring[start:end]
+        return np.concatenate((self.ring[start:], self.ring[:end]))
+
+    def flush(self):
+        rows = self._pending(self.flushed)
+        if len(rows):
+            for sink in self.sinks:
+                sink.write(rows, self)
+        self.flushed = self.count
+
+    def close(self):
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 查詢 ---
+
+    def transitions(self):
+        """Every transition still in the ring, oldest first."""
+        return self._pending(0)
+
+    def history(self, pid):
+        rows = self.transitions()
+        code = self._pids.get(pid)
+        return rows[:0] if code is None else rows[rows["pid"] == code]
+
+    def between(self, start, end):
+        """Transitions with start <= time < end."""
+        rows = self.transitions()
+        return rows[(rows["time"] >= start) & (rows["time"] < end)]
+
+    def state_of(self, pid):
+        code = self.current[self._pids[pid]]
+        return None if code == NO_STATE else self.states[code]
+
+    def counts(self):
+        """{state: number of processes currently in it}."""
+        current = np.asarray(self.current, dtype=np.int64)
+        current = current[current != NO_STATE]
+        return {self.states[code]: int(count) for code, count in enumerate(np.bincount(current, minlength=len(self.states))) if count}
+
+    def rows(self, transitions):
+        """Structured transition rows as dicts with pid labels and state names."""
+        return [
+            {"time": t, "pid": self.labels[pid], "state": self.states[state],
+             "previous": self.states[previous] if previous != NO_STATE else None, "program_counter": pc}
+            for t, pid, state, previous, pc in transitions.tolist()
+        ]
+
+    def pcb(self, pid):
+        """The PCB as display_pcb used to print it."""
+        code = self._pids[pid]
+        block = self.blocks[code] or {}
+        history = self.history(pid)
+        return {
+            "pid": pid,
+            "state": self.state_of(pid),
+            "program_counter": int(history["program_counter"][-1]) if len(history) else 0,
+            **block,
+        }
+
+
+class JSONLSink:
+    """One JSON object per transition, written a batch at a time.
+
+    pid labels and state names are JSON-encoded once and reused, so a batch
+    is a single string join instead of a json.dumps per row.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w")
+        self.labels = []
+        self.states = []
+
+    def _encoded(self, cache, names):
+        cache.extend(json.dumps(name) for name in names[len(cache):])
+        return cache
+
+    def write(self, rows, registry):
+        labels = self._encoded(self.labels, registry.labels)
+        states = self._encoded(self.states, registry.states) + ["null"]  # previous == NO_STATE -> [-1]
+        self.file.write("".join(
+            f'{{"time": {t!r}, "pid": {labels[pid]}, "state": {states[state]}, "previous": {states[previous]}, '
+            f'"pc": {pc}}}\n'
+            for t, pid, state, previous, pc in rows.tolist()
+        ))
+
+    def close(self):
+        self.file.close()
+
+
+class CSVSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["time", "pid", "state", "previous", "program_counter"])
+
+    def write(self, rows, registry):
+        labels, states = registry.labels, registry.states + [""]
+        self.writer.writerows(
+            (t, labels[pid], states[state], states[previous], pc)
+            for t, pid, state, previous, pc in rows.tolist()
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class ConsoleSink:
+    """Throttled console view: at most one update per interval seconds.
+
+    Each update prints how many transitions happened since the last one,
+    how many processes are in each state, and the latest `latest`
+    transitions, one line each. interval=0 prints every flushed batch.
+    """
+
+    def __init__(self, interval=1.0, latest=5, stream=None):
+        self.interval = interval
+        self.latest = latest
+        self.stream = stream or sys.stdout
+        self.last_print = float("-inf")
+        self.unseen = 0
+        self.tail = None
+
+    def write(self, rows, registry):
+        self.unseen += len(rows)
+        self.tail = rows[-self.latest:].copy() if self.latest else rows[:0]
+        now = _time.perf_counter()
+        if now - self.last_print >= self.interval:
+            self._print(registry)
+            self.last_print = now
+
+    def _print(self, registry):
+        if not self.unseen:
+            return
+        counts = "  ".join(f"{state}={count}" for state, count in registry.counts().items())
+        lines = [f"[PCB] {self.unseen} transitions  {counts}"]
+        for row in registry.rows(self.tail):
+            lines.append(f"  t={row['time']:g} {row['pid']}: {row['previous'] or '-'} -> {row['state']} "
+                         f"(pc={row['program_counter']})")
+        print("\n".join(lines), file=self.stream)
+        self.unseen = 0
+
+    def close(self):
+        pass
@@ -0,0 +1,212 @@
+import random
+import numpy as np
+from consts import STATUS
+
+# 以欄位（struct-of-arrays）方式存放大量行程，取代每個行程一個 Python 物件
+# Each process costs ~64 bytes instead of a dict, a registers dict and a
+# list of file names, so 10M synthetic processes fit in a few hundred MB.
+
+STATE_CODES = {name: code for code, name in enumerate(STATUS)}
+UNFINISHED = -1  # completion 欄位尚未完成時的值
+
+
+class ProcessView:
+    """Thin attribute view of one row so old code can keep using p.pid etc."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def _get(self, column):
+        return self._table.columns[column][self._index].item()
+
+    def _set(self, column, value):
+        self._table.columns[column][self._index] = value
+
+    @property
+    def pid(self):
+        return self._table.label(self._index)
+
+    arrival_time = property(lambda self: self._get("arrival"), lambda self, v: self._set("arrival", v))
+    burst_time = property(lambda self: self._get("burst"), lambda self, v: self._set("burst", v))
+    remaining_time = property(lambda self: self._get("remaining"), lambda self, v: self._set("remaining", v))
+    waiting_time = property(lambda self: self._get("waiting"), lambda self, v: self._set("waiting", v))
+    turnaround_time = property(lambda self: self._get("turnaround"), lambda self, v: self._set("turnaround", v))
+    memory_limit = property(lambda self: self._get("memory"), lambda self, v: self._set("memory", v))
+    memory = memory_limit  # core.process.Process 的欄位名稱
+    program_counter = property(lambda self: self._get("program_counter"), lambda self, v: self._set("program_counter", v))
+
+    @property
+    def completion_time(self):
+        value = self._get("completion")
+        return None if value == UNFINISHED else value
+
+    @completion_time.setter
+    def completion_time(self, value):
+        self._set("completion", UNFINISHED if value is None else value)
+
+    @property
+    def state(self):
+        return self._table.states[self._get("state")]
+
+    @state.setter
+    def state(self, value):
+        # 原樣保留字串（"Running"、"Suspended" 都可以），讀回來和寫入的一樣
+        self._set("state", self._table.state_code(value))
+
+    # PCB 內容平常不存，需要時再依 pid 產生（display_pcb 用）；被指定過才存起來
+    @property
+    def registers(self):
+        extra = self._table.extras.get(("registers", self._index))
+        if extra is not None:
+            return extra
+        rng = random.Random(self._get("pid"))
+        return {f'R{i}': rng.randint(0, 100) for i in range(4)}
+
+    @registers.setter
+    def registers(self, value):
+        self._table.extras[("registers", self._index)] = value
+
+    register = registers  # core.process.Process 的欄位名稱
+
+    @property
+    def open_files(self):
+        extra = self._table.extras.get(("open_files", self._index))
+        if extra is not None:
+            return extra
+        rng = random.Random(self._get("pid"))
+        return [f'file_{self.pid}_{i}.txt' for i in range(rng.randint(1, 3))]
+
+    @open_files.setter
+    def open_files(self, value):
+        self._table.extras[("open_files", self._index)] = value
+
+    def __repr__(self):
+        return f"ProcessView(pid={self.pid!r}, arrival={self.arrival_time}, burst={self.burst_time}, state={self.state})"
+
+
+class ProcessTable:
+    def __init__(self, arrival, burst, pid=None, memory=None, labels=None, time_dtype=np.int64):
+        arrival = np.asarray(arrival, dtype=time_dtype)
+        burst = np.asarray(burst, dtype=time_dtype)
+        if arrival.shape != burst.shape or arrival.ndim != 1:
+            raise ValueError("arrival and burst must be 1-D arrays of the same length")
+        n = len(arrival)
+        self.columns = {
+            "pid": np.arange(n, dtype=np.int32) if pid is None else np.asarray(pid, dtype=np.int32),
+            "arrival": arrival,
+            "burst": burst,
+            "remaining": burst.copy(),
+            "waiting": np.zeros(n, dtype=time_dtype),
+            "turnaround": np.zeros(n, dtype=time_dtype),
+            "completion": np.full(n, UNFINISHED, dtype=time_dtype),
+            "memory": np.zeros(n, dtype=np.int32) if memory is None else np.asarray(memory, dtype=np.int32),
+            "program_counter": np.zeros(n, dtype=np.int32),
+            "state": np.zeros(n, dtype=np.int8),  # index into self.states, 0 = new
+        }
+        self.labels = labels  # 字串 pid（例如 "A"），沒有就用數字 pid
+        self.states = list(STATUS)  # consts.STATUS 之外的狀態（例如 "Suspended"）會加在後面
+        self.extras = {}  # (欄位, index) -> 被指定過的 registers / open_files
+
+    def state_code(self, name):
+        try:
+            return self.states.index(name)
+        except ValueError:
+            if len(self.states) >= 127:
+                raise ValueError("too many distinct process states") from None
+            self.states.append(name)
+            return len(self.states) - 1
+
+    @classmethod
+    def from_processes(cls, processes):
+        """Build a table from Process-like objects (pid / arrival_time / burst_time)."""
+        processes = list(processes)
+        return cls(
+            [p.arrival_time for p in processes],
+            [p.burst_time for p in processes],
+            memory=[getattr(p, "memory_limit", 0) for p in processes],
+            labels=[p.pid for p in processes],
+        )
+
+    @classmethod
+    def synthetic(cls, n, seed=0, mean_interarrival=5, burst_range=(1, 20), memory_range=(100, 500)):
+        """Generate n processes with Poisson arrivals and uniform bursts."""
+        rng = np.random.default_rng(seed)
+        gaps = rng.poisson(mean_interarrival, n)
+        arrival = np.cumsum(gaps) - gaps[0]
+        burst = rng.integers(burst_range[0], burst_range[1] + 1, n)
+        memory = rng.integers(memory_range[0], memory_range[1] + 1, n)
+        return cls(arrival, burst, memory=memory)
+
+    def __len__(self):
+        return len(self.columns["pid"])
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("process index out of range")
+        return ProcessView(self, index % len(self))
+
+    def __iter__(self):
+        return (ProcessView(self, i) for i in range(len(self)))
+
+    def __getattr__(self, name):
+        # table.arrival / table.burst ... 直接取得欄位陣列
+        columns = self.__dict__.get("columns")
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+    def label(self, index):
+        if self.labels is not None:
+            return self.labels[index]
+        return self.columns["pid"][index].item()
+
+    def jobs(self):
+        """(pid, arrival, burst) tuples for core.engine."""
+        return list(zip(range(len(self)), self.columns["arrival"].tolist(), self.columns["burst"].tolist()))
+
+    def reset(self):
+        c = self.columns
+        c["remaining"][:] = c["burst"]
+        c["waiting"][:] = 0
+        c["turnaround"][:] = 0
+        c["completion"][:] = UNFINISHED
+        c["state"][:] = STATE_CODES["new"]
+
+    def complete(self, completion):
+        """Vectorized metric step: fill completion, turnaround and waiting for every row."""
+        c = self.columns
+        c["completion"][:] = completion
+        np.subtract(c["completion"], c["arrival"], out=c["turnaround"])
+        np.subtract(c["turnaround"], c["burst"], out=c["waiting"])
+        c["remaining"][:] = 0
+        c["state"][:] = STATE_CODES["terminated"]
+
+    def apply(self, result):
+        """Copy the metrics of a core.engine ScheduleResult run on self.jobs()."""
+        self.complete(np.asarray(result.completion, dtype=self.columns["completion"].dtype))
+        return self
+
+    def avg_waiting_time(self):
+        return float(self.columns["waiting"].mean()) if len(self) else 0.0
+
+    def avg_turnaround_time(self):
+        return float(self.columns["turnaround"].mean()) if len(self) else 0.0
+
+    def summary(self):
+        c = self.columns
+        done = c["completion"] != UNFINISHED
+        return {
+            "processes": len(self),
+            "completed": int(done.sum()),
+            "avg_waiting_time": float(c["waiting"][done].mean()) if done.any() else 0.0,
+            "avg_turnaround_time": float(c["turnaround"][done].mean()) if done.any() else 0.0,
+            "max_waiting_time": int(c["waiting"][done].max()) if done.any() else 0,
+            "makespan": int(c["completion"][done].max()) if done.any() else 0,
+        }
@@ -0,0 +1,322 @@
+import heapq
+import inspect
+import itertools
+import math
+import threading
+import time
+
+from consts import CPU_THREADS
+from core import multicore
+
+# 真正並行執行行程的 runtime：固定數量的 worker 執行緒（預設 CPU_THREADS）輪流跑行程。
+# 行程本體是 generator，每個 yield 是一個 checkpoint：時間片用完或被取消時 worker 在
+# checkpoint 把它放回 ready queue（context switch）或結束它，所以長時間執行的互動式行程
+# 也能被乾淨地關掉。量測每次 dispatch 的等待時間與 context switch 的額外開銷，
+# 並能把同一批工作丟給 core.multicore 模擬來比較。
+
+POLICIES = ("FCFS", "RR", "SJF")
+
+
+class PreemptToken:
+    """Cancellation / preemption token handed to a process body.
+
+    The runtime sets deadline to the end of the current time slice;
+    should_yield() tells the body to reach its next yield, and sleep() waits
+    without overshooting the slice and wakes at once on cancel().
+    """
+
+    __slots__ = ("_cancel", "deadline")
+
+    def __init__(self):
+        self._cancel = threading.Event()
+        self.deadline = math.inf
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def should_yield(self):
+        return self._cancel.is_set() or time.perf_counter() >= self.deadline
+
+    def sleep(self, seconds):
+        """Block up to seconds (less if the slice ends or the token is cancelled); returns the time slept."""
+        start = time.perf_counter()
+        wait = min(start + seconds, self.deadline) - start
+        if wait > 0:
+            self._cancel.wait(wait)
+        return time.perf_counter() - start
+
+
+def burst_body(process, token, tick=0.01):
+    """Default body for a finite process: "runs" for process.burst_time seconds of slice time."""
+    remaining = process.burst_time
+    while remaining > 0 and not token.cancelled:
+        remaining -= token.sleep(min(tick, remaining))
+        yield
+
+
+def interactive_body(process, token, tick=0.05):
+    """Default body for an interactive process: waits for events until it is cancelled."""
+    while not token.cancelled:
+        token.sleep(tick)
+        yield
+
+
+class Task:
+    __slots__ = ("process", "pid", "body", "token", "burst", "interactive", "arrival", "enqueued", "start",
+                 "completion", "cpu_time", "slices", "cancelled", "error")
+
+    def __init__(self, process, body, token, arrival):
+        self.process = process
+        self.pid = getattr(process, "pid", id(process))
+        self.body = body
+        self.token = token
+        self.burst = getattr(process, "burst_time", None)
+        self.interactive = bool(getattr(process, "interactive", False)) or self.burst is None
+        self.arrival = arrival
+        self.enqueued = arrival
+        self.start = None
+        self.completion = None
+        self.cpu_time = 0.0
+        self.slices = 0
+        self.cancelled = False
+        self.error = None
+
+
+def _wind_down(task):
+    """Let a stopped body end on its own: resume it once more, close it only if it keeps yielding.
+
+    A cancelled body sees token.cancelled on that last step, leaves its
+    loop and runs whatever follows it (and its finally blocks) normally;
+    close() would raise GeneratorExit at the yield and skip that code.
+    """
+    body = task.body
+    try:
+        if inspect.getgeneratorstate(body) == inspect.GEN_SUSPENDED:
+            next(body)
+        body.close()  # 還在 yield（不理會取消）或從沒開始跑過
+    except StopIteration:
+        pass
+    except Exception as error:
+        if task.error is None:
+            task.error = error
+
+
+class Runtime:
+    """Run Process objects on a bounded pool of worker threads with time slicing.
+
+    policy is "FCFS" (run to completion), "RR" (quantum seconds per slice)
+    or "SJF" (shortest burst_time first, non-preemptive). Bodies are
+    generators taking (process, token); processes without one get
+    burst_body, or interactive_body when process.interactive is true.
+    """
+
+    def __init__(self, workers=CPU_THREADS, policy="RR", quantum=0.1):
+        policy = policy.upper()
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown runtime policy: {policy}")
+        if workers < 1:
+            raise ValueError("need at least one worker")
+        self.workers = workers
+        self.policy = policy
+        self.quantum = quantum if policy == "RR" else math.inf
+        self.ready = []  # heap of (key, seq, task)
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.tasks = []
+        self.unfinished = 0  # 尚未結束的非互動式行程
+        self.closing = False
+        self.epoch = time.perf_counter()
+        # 每個 worker 自己的紀錄，不用鎖；report() 時才合併
+        self.records = [{"segments": [], "latency": [], "overhead": []} for _ in range(workers)]
+        self.threads = [threading.Thread(target=self._worker, args=(w,), name=f"worker-{w}", daemon=True)
+                        for w in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, process, body=None):
+        """Queue a process; returns its PreemptToken (cancel() stops it at its next yield)."""
+        token = PreemptToken()
+        now = time.perf_counter()
+        task = Task(process, None, token, now)
+        if body is None:
+            body = interactive_body if task.interactive else burst_body
+        task.body = body(process, token)
+        with self.cond:
+            if self.closing:
+                raise RuntimeError("runtime is shutting down")
+            self.tasks.append(task)
+            if not task.interactive:
+                self.unfinished += 1
+            self._push(task)
+        return token
+
+    def _push(self, task):
+        # 呼叫端持有 self.cond
+        key = task.burst if self.policy == "SJF" and task.burst is not None else 0
+        if self.policy == "SJF" and task.burst is None:
+            key = math.inf  # 互動式行程沒有 burst，排最後
+        heapq.heappush(self.ready, (key, next(self.seq), task))
+        self.cond.notify()
+
+    def _worker(self, w):
+        record = self.records[w]
+        segments, latency, overhead = record["segments"], record["latency"], record["overhead"]
+        switched = None  # 上一個時間片結束的時間；拿下一個工作沒等待時，中間的時間就是切換開銷
+        while True:
+            with self.cond:
+                if not self.ready:
+                    switched = None  # 要等工作進來：閒置時間不算切換開銷
+                    while not self.ready and not self.closing:
+                        self.cond.wait()
+                    if not self.ready:
+                        return
+                task = heapq.heappop(self.ready)[2]
+            dispatched = time.perf_counter()
+            if switched is not None:
+                overhead.append(dispatched - switched)
+            latency.append(dispatched - task.enqueued)
+            process = task.process
+            if task.start is None:
+                task.start = dispatched
+                if hasattr(process, "start_time"):
+                    process.start_time = time.time()
+            finished = task.token.cancelled
+            if not finished:
+                if hasattr(process, "state"):
+                    process.state = "Running"
+                task.token.deadline = dispatched + self.quantum
+                try:
+                    while True:
+                        next(task.body)
+                        if task.token.should_yield():
+                            break
+                except StopIteration:
+                    finished = True
+                except Exception as error:  # 行程本體的例外記下來，不要讓 worker 死掉
+                    task.error = error
+                    finished = True
+                task.token.deadline = math.inf
+            finished = finished or task.token.cancelled
+            if finished:
+                _wind_down(task)  # 不持有 self.cond：本體收尾的程式碼可能很慢，或自己用到 runtime
+            end = time.perf_counter()
+            task.cpu_time += end - dispatched
+            task.slices += 1
+            segments.append((task.pid, dispatched - self.epoch, end - self.epoch, w))
+            switched = time.perf_counter()
+            with self.cond:
+                if finished:
+                    task.cancelled = task.token.cancelled
+                    task.completion = end
+                    if hasattr(process, "state"):
+                        process.state = "Terminated"
+                    if hasattr(process, "completion_time"):
+                        process.completion_time = time.time()
+                    if not task.interactive:
+                        self.unfinished -= 1
+                        if not self.unfinished:
+                            self.cond.notify_all()
+                else:
+                    if hasattr(process, "state"):
+                        process.state = "Ready"
+                    task.enqueued = switched
+                    self._push(task)
+
+    def join(self, timeout=None):
+        """Wait until every non-interactive process has finished; False on timeout."""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.unfinished, timeout)
+
+    def shutdown(self, timeout=None):
+        """Cancel every remaining process (interactive ones included) and stop the workers."""
+        with self.cond:
+            self.closing = True
+            for task in self.tasks:
+                if task.completion is None:
+                    task.token.cancel()
+            self.cond.notify_all()
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for thread in self.threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+        return not any(thread.is_alive() for thread in self.threads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def report(self):
+        return RuntimeReport(self)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+class RuntimeReport:
+    """Measured schedule of a Runtime, in the same shape as the simulated ones."""
+
+    def __init__(self, runtime):
+        self.policy = runtime.policy
+        self.workers = runtime.workers
+        self.quantum = runtime.quantum
+        self.epoch = runtime.epoch
+        self.tasks = list(runtime.tasks)
+        self.segments = sorted(s for r in runtime.records for s in r["segments"])
+        self.latency = [x for r in runtime.records for x in r["latency"]]
+        self.overhead = [x for r in runtime.records for x in r["overhead"]]
+
+    def jobs(self, unit=1000):
+        """(pid, arrival, cpu time) of finished non-interactive processes, in unit per second (ms)."""
+        return [(t.pid, round((t.arrival - self.epoch) * unit), max(1, round(t.cpu_time * unit)))
+                for t in self.tasks if t.completion is not None and not t.interactive]
+
+    def summary(self):
+        done = [t for t in self.tasks if t.completion is not None and not t.interactive]
+        n = len(done)
+        turnaround = [t.completion - t.arrival for t in done]
+        waiting = [t.completion - t.arrival - t.cpu_time for t in done]
+        response = [t.start - t.arrival for t in done]
+        makespan = max((t.completion for t in self.tasks if t.completion is not None), default=self.epoch) - self.epoch
+        busy = sum(end - start for _, start, end, _ in self.segments)
+        return {
+            "policy": self.policy,
+            "workers": self.workers,
+            "processes": n,
+            "interactive": sum(t.interactive for t in self.tasks),
+            "cancelled": sum(t.cancelled for t in self.tasks),
+            "errors": sum(t.error is not None for t in self.tasks),
+            "avg_waiting_time": sum(waiting) / n if n else 0.0,
+            "avg_turnaround_time": sum(turnaround) / n if n else 0.0,
+            "avg_response_time": sum(response) / n if n else 0.0,
+            "makespan": makespan,
+            "worker_utilization": busy / (makespan * self.workers) if makespan else 0.0,
+            "dispatches": len(self.segments),
+            "context_switches": sum(max(0, t.slices - 1) for t in self.tasks),
+            "dispatch_latency_mean_ms": 1000 * sum(self.latency) / len(self.latency) if self.latency else 0.0,
+            "dispatch_latency_p50_ms": 1000 * _percentile(self.latency, 50),
+            "dispatch_latency_p99_ms": 1000 * _percentile(self.latency, 99),
+            "switch_overhead_mean_us": 1e6 * sum(self.overhead) / len(self.overhead) if self.overhead else 0.0,
+            "switch_overhead_p99_us": 1e6 * _percentile(self.overhead, 99),
+        }
+
+    def simulated(self, unit=1000, **options):
+        """The same jobs (measured CPU time, ms) through core.multicore with one thread per worker.
+
+        SMT and migration costs are off so the difference to summary() is
+        the real runtime's dispatch and switching overhead.
+        """
+        quantum = self.quantum * unit if math.isfinite(self.quantum) else 3
+        policy = "RR" if self.policy == "RR" else self.policy
+        options = dict({"cores": self.workers, "threads": self.workers, "policy": policy,
+                        "quantum": max(1, round(quantum)), "global_queue": True, "smt_factor": 1.0,
+                        "migration_cost": 0}, **options)
+        return multicore.simulate(self.jobs(unit), **options)
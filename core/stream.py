@@ -0,0 +1,133 @@
+import csv
+import json
+
+from core import engine
+
+# 串流模式：從依到達時間排序的 iterator（例如很大的 CSV/JSONL trace）逐筆讀入，
+# 一邊排程一邊產生區段與累計統計；記憶體只跟 ready queue 大小有關
+
+
+def read_trace(path):
+    """Lazily yield (pid, arrival_time, burst_time) from a .csv or .jsonl trace.
+
+    CSV files need a header with pid, arrival_time and burst_time columns;
+    JSONL lines are objects with the same keys. A .json file holding one
+    array of such objects is also accepted, but it is parsed in one go.
+    """
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row["pid"], _number(row["arrival_time"]), _number(row["burst_time"])
+        elif path.endswith(".json"):
+            for row in json.load(f):
+                yield row["pid"], _number(row["arrival_time"]), _number(row["burst_time"])
+        else:
+            for row in csv.DictReader(f):
+                yield row["pid"], _number(row["arrival_time"]), _number(row["burst_time"])
+
+
+def _number(value):
+    if isinstance(value, str):
+        return float(value) if any(c in value for c in ".eE") else int(value)
+    return value
+
+
+def write_trace(path, jobs):
+    """Write (pid, arrival_time, burst_time) jobs as a CSV trace for read_trace."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pid", "arrival_time", "burst_time"])
+        writer.writerows(job[:3] for job in jobs)
+
+
+class RunningStats:
+    """Incremental metrics; O(1) memory no matter how long the trace is."""
+
+    def __init__(self):
+        self.completed = 0
+        self.total_waiting = 0
+        self.total_turnaround = 0
+        self.busy_time = 0
+        self.first_arrival = None
+        self.now = 0
+
+    def record(self, job, start, end, finished):
+        if self.first_arrival is None:
+            self.first_arrival = job[1]
+        self.busy_time += end - start
+        self.now = end
+        if finished:
+            turnaround = end - job[1]
+            self.completed += 1
+            self.total_turnaround += turnaround
+            self.total_waiting += turnaround - job[2]
+
+    @property
+    def elapsed(self):
+        return self.now - self.first_arrival if self.first_arrival is not None else 0
+
+    @property
+    def avg_waiting_time(self):
+        return self.total_waiting / self.completed if self.completed else 0
+
+    @property
+    def avg_turnaround_time(self):
+        return self.total_turnaround / self.completed if self.completed else 0
+
+    @property
+    def throughput(self):
+        return self.completed / self.elapsed if self.elapsed else 0
+
+    @property
+    def cpu_utilization(self):
+        return self.busy_time / self.elapsed if self.elapsed else 0
+
+    def summary(self):
+        return {
+            "completed": self.completed,
+            "time": self.now,
+            "avg_waiting_time": self.avg_waiting_time,
+            "avg_turnaround_time": self.avg_turnaround_time,
+            "throughput": self.throughput,
+            "cpu_utilization": self.cpu_utilization,
+        }
+
+
+def stream_events(jobs, policy="FCFS", stats=None, **options):
+    """Like stream(), but yield the full (job, start, end, finished, stats) event.
+
+    job is the (pid, arrival_time, burst_time) tuple read from the source,
+    so consumers such as core.trace.record_stream can keep per-process results.
+    """
+    try:
+        events = engine.EVENTS[policy.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown scheduling policy: {policy}") from None
+    if stats is None:
+        stats = RunningStats()
+    for job, start, end, finished in events(engine.Arrivals(jobs), **options):
+        stats.record(job, start, end, finished)
+        yield job, start, end, finished, stats
+
+
+def stream(jobs, policy="FCFS", stats=None, **options):
+    """Schedule an arrival-ordered job iterator, yielding ((pid, start, end), stats).
+
+    stats is the same RunningStats object every time (a new one unless
+    passed in), updated before the segment is yielded, so callers can
+    sample it as often as they like.
+    """
+    for job, start, end, _, stats in stream_events(jobs, policy, stats, **options):
+        yield (job[0], start, end), stats
+
+
+def replay(path, policy="FCFS", report_every=100_000, **options):
+    """Replay a trace file and print running averages every report_every segments."""
+    stats = RunningStats()
+    for count, _ in enumerate(stream(read_trace(path), policy, stats, **options), 1):
+        if count % report_every == 0:
+            print(f"[{policy}] {count} segments: {stats.summary()}")
+    print(f"[{policy}] done: {stats.summary()}")
+    return stats
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from consts import CPU_CORES
+from core import engine, workloads
+
+# 非互動式的排程參數掃描：policy x quantum x workload generator x seed
+# Usage (from the repo root):
+#   python -m core.sweep --policies FCFS RR SJF SRTF --quanta 1 2 4 8 \
+#       --generators poisson heavy_tailed --seeds 0:20 --size 5000 --out sweep.jsonl
+
+
+def expand_policies(policies, quanta):
+    """[("FCFS", {}), ("RR", {"quantum": 2}), ...] for every grid point."""
+    configs = []
+    for policy in policies:
+        policy = policy.upper()
+        if policy not in engine.POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        if policy == "RR":
+            configs.extend((policy, {"quantum": q}) for q in quanta)
+        else:
+            configs.append((policy, {}))
+    return configs
+
+
+def parse_seeds(values):
+    # "0:10" 代表 range(0, 10)，其他當成單一 seed
+    seeds = []
+    for value in values:
+        if ":" in value:
+            start, stop = value.split(":")
+            seeds.extend(range(int(start), int(stop)))
+        else:
+            seeds.append(int(value))
+    return seeds
+
+
+def _run_chunk(chunk, configs, size):
+    """Worker: build each workload once and run every policy config on it."""
+    records = []
+    for generator, seed in chunk:
+        jobs = workloads.generate(generator, size, seed=seed)
+        for policy, options in configs:
+            start = time.perf_counter()
+            result = engine.simulate(policy, jobs, **options)
+            record = {"generator": generator, "seed": seed, "size": size, "quantum": options.get("quantum")}
+            record.update(result.summary())
+            record["policy"] = policy
+            record["wall_time"] = time.perf_counter() - start
+            records.append(record)
+    return records
+
+
+def run_sweep(configs, generators, seeds, size, out, workers=CPU_CORES, chunksize=4):
+    """Fan the grid out over a process pool and append JSONL records to out as chunks finish.
+
+    Returns {(policy, quantum): [sum of avg_waiting_time, count]} for the summary table.
+    """
+    grid = [(generator, seed) for generator in generators for seed in seeds]
+    chunks = [grid[i:i + chunksize] for i in range(0, len(grid), chunksize)]
+    totals = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, chunk, configs, size) for chunk in chunks]
+        for future in as_completed(futures):
+            for record in future.result():
+                out.write(json.dumps(record) + "\n")
+                key = (record["policy"], record["quantum"])
+                total = totals.setdefault(key, [0.0, 0])
+                total[0] += record["avg_waiting_time"]
+                total[1] += 1
+            out.flush()  # 每完成一個 chunk 就寫到磁碟
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep scheduling policies over synthetic workloads.")
+    parser.add_argument("--policies", nargs="+", default=list(engine.POLICIES))
+    parser.add_argument("--quanta", nargs="+", type=float, default=[1, 2, 3, 4, 8])
+    parser.add_argument("--generators", nargs="+", default=["poisson"], choices=list(workloads.GENERATORS))
+    parser.add_argument("--seeds", nargs="+", default=["0:10"], help="seeds or start:stop ranges")
+    parser.add_argument("--size", type=int, default=1000, help="processes per workload")
+    parser.add_argument("--workers", type=int, default=CPU_CORES)
+    parser.add_argument("--chunksize", type=int, default=4, help="workloads per task")
+    parser.add_argument("--out", default="sweep.jsonl")
+    args = parser.parse_args(argv)
+
+    quanta = [int(q) if float(q).is_integer() else q for q in args.quanta]
+    configs = expand_policies(args.policies, quanta)
+    seeds = parse_seeds(args.seeds)
+    print(f"{len(configs)} policy configs x {len(args.generators)} generators x {len(seeds)} seeds, {args.workers} workers")
+
+    start = time.perf_counter()
+    with open(args.out, "w") as out:
+        totals = run_sweep(configs, args.generators, seeds, args.size, out, args.workers, args.chunksize)
+    print(f"Done in {time.perf_counter() - start:.2f}s, results in {os.path.abspath(args.out)}")
+
+    for (policy, quantum), (total, count) in sorted(totals.items(), key=lambda item: item[1][0] / item[1][1]):
+        name = f"{policy} (q={quantum})" if quantum is not None else policy
+        print(f"  {name:14s} avg waiting time {total / count:10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+# 固定寬度的二進位排程 trace：header + segments + results + sparse index + labels
+# Layout (little endian):
+#   header   128 bytes, see HEADER below
+#   segments SEGMENT_DTYPE records, sorted by start time
+#   results  RESULT_DTYPE records, one per finished process
+#   index    float64 start time of every index_stride-th segment
+#   labels   UTF-8 JSON list mapping pid -> original label (optional)
+# Everything after the header is read back with np.memmap, so opening a
+# billion-segment trace only touches the pages a query needs.
+
+MAGIC = b"OSTRACE1"
+VERSION = 1
+HEADER = struct.Struct("<8sII QQQ QQQQQ dd 32s")
+SEGMENT_DTYPE = np.dtype([("pid", "<i8"), ("start", "<f8"), ("end", "<f8"), ("core", "<i4"), ("flags", "<i4")])
+RESULT_DTYPE = np.dtype([
+    ("pid", "<i8"), ("arrival", "<f8"), ("burst", "<f8"),
+    ("completion", "<f8"), ("waiting", "<f8"), ("turnaround", "<f8"),
+])
+FLAG_SUSPENDED = 1  # 例如 interruptSJF 的紅色區段
+
+
+class TraceWriter:
+    """Streaming writer; segments must be added in non-decreasing start order."""
+
+    def __init__(self, path, policy="", index_stride=4096, buffer_size=65536):
+        self.path = path
+        self.policy = policy
+        self.index_stride = index_stride
+        self.buffer_size = buffer_size
+        self._file = open(path, "wb")
+        self._file.write(b"\0" * HEADER.size)  # close() 時再回填
+        self._results_path = path + ".results.tmp"
+        self._results = open(self._results_path, "wb")
+        self._segments = []
+        self._pending_results = []
+        self._index = []
+        self._labels = {}
+        self._label_mode = None
+        self.segment_count = 0
+        self.result_count = 0
+        self.max_duration = 0.0
+        self.end_time = 0.0
+        self._last_start = float("-inf")
+
+    def _pid(self, pid):
+        # 第一個 pid 決定模式：整數直接存；非整數（例如 "A"）改存編號，名字放在 labels 區段
+        if self._label_mode is None:
+            self._label_mode = not isinstance(pid, (int, np.integer))
+        if not self._label_mode:
+            if not isinstance(pid, (int, np.integer)):
+                raise ValueError("cannot mix integer and label pids in one trace")
+            return int(pid)
+        index = self._labels.get(pid)
+        if index is None:
+            index = self._labels[pid] = len(self._labels)
+        return index
+
+    def segment(self, pid, start, end, core=0, flags=0):
+        if start < self._last_start:
+            raise ValueError("segments must be written in start-time order")
+        self._last_start = start
+        if (self.segment_count + len(self._segments)) % self.index_stride == 0:
+            self._index.append(start)
+        if end - start > self.max_duration:
+            self.max_duration = end - start
+        if end > self.end_time:
+            self.end_time = end
+        self._segments.append((self._pid(pid), start, end, core, flags))
+        if len(self._segments) >= self.buffer_size:
+            self._flush_segments()
+
+    def result(self, pid, arrival, burst, completion):
+        turnaround = completion - arrival
+        self._pending_results.append((self._pid(pid), arrival, burst, completion, turnaround - burst, turnaround))
+        if len(self._pending_results) >= self.buffer_size:
+            self._flush_results()
+
+    def _flush_segments(self):
+        if self._segments:
+            np.array(self._segments, dtype=SEGMENT_DTYPE).tofile(self._file)
+            self.segment_count += len(self._segments)
+            self._segments = []
+
+    def _flush_results(self):
+        if self._pending_results:
+            np.array(self._pending_results, dtype=RESULT_DTYPE).tofile(self._results)
+            self.result_count += len(self._pending_results)
+            self._pending_results = []
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush_segments()
+        self._flush_results()
+        self._results.close()
+
+        results_offset = self._file.tell()
+        with open(self._results_path, "rb") as results:
+            while True:
+                block = results.read(1 << 20)
+                if not block:
+                    break
+                self._file.write(block)
+        os.remove(self._results_path)
+
+        index_offset = self._file.tell()
+        np.asarray(self._index, dtype="<f8").tofile(self._file)
+        labels_offset = self._file.tell()
+        labels = json.dumps(sorted(self._labels, key=self._labels.get)).encode() if self._labels else b""
+        self._file.write(labels)
+
+        self._file.seek(0)
+        self._file.write(HEADER.pack(
+            MAGIC, VERSION, self.index_stride,
+            self.segment_count, self.result_count, len(self._index),
+            HEADER.size, results_offset, index_offset, labels_offset, len(labels),
+            self.max_duration, self.end_time, self.policy.encode()[:32],
+        ))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = HEADER.unpack(f.read(HEADER.size))
+        (magic, version, self.index_stride, segment_count, result_count, index_count,
+         segments_offset, results_offset, index_offset, labels_offset, labels_length,
+         self.max_duration, self.end_time, policy) = header
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} schedule trace")
+        self.path = path
+        self.policy = policy.rstrip(b"\0").decode()
+        self.segments = _memmap(path, SEGMENT_DTYPE, segments_offset, segment_count)
+        self.results = _memmap(path, RESULT_DTYPE, results_offset, result_count)
+        self.index = _memmap(path, np.dtype("<f8"), index_offset, index_count)
+        self.labels = None
+        if labels_length:
+            with open(path, "rb") as f:
+                f.seek(labels_offset)
+                self.labels = json.loads(f.read(labels_length))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def label(self, pid):
+        return self.labels[pid] if self.labels is not None else int(pid)
+
+    def _first_start_at_least(self, time):
+        # 先在 sparse index 上二分，再只在一個 block 裡二分
+        block = int(np.searchsorted(self.index, time, side="left"))
+        lo = max(0, (block - 1) * self.index_stride)
+        hi = min(len(self.segments), block * self.index_stride + 1)
+        return lo + int(np.searchsorted(self.segments["start"][lo:hi], time, side="left"))
+
+    def window(self, start, end):
+        """Segments that overlap [start, end), without scanning the whole trace."""
+        lo = self._first_start_at_least(start - self.max_duration)
+        hi = self._first_start_at_least(end)
+        segments = self.segments[lo:hi]
+        return segments[segments["end"] > start]
+
+    @property
+    def time_range(self):
+        if not len(self.segments):
+            return 0.0, 0.0
+        return float(self.segments["start"][0]), self.end_time
+
+    def summary(self):
+        r = self.results
+        if not len(r):
+            return {"policy": self.policy, "segments": len(self.segments), "processes": 0}
+        return {
+            "policy": self.policy,
+            "segments": len(self.segments),
+            "processes": len(r),
+            "avg_waiting_time": float(r["waiting"].mean()),
+            "avg_turnaround_time": float(r["turnaround"].mean()),
+            "makespan": float(r["completion"].max()),
+        }
+
+    def result_pids(self, as_text=False):
+        """pid of every result record, mapped back through labels when the trace has them."""
+        if self.labels is not None:
+            return np.asarray(self.labels, dtype=str)[self.results["pid"]]
+        pids = np.asarray(self.results["pid"])
+        return pids.astype(str) if as_text else pids
+
+    def diff(self, other):
+        """Per-process waiting/turnaround change from self to other, matched by pid.
+
+        Label ids depend on the order a policy first ran each process, so
+        both sides are matched on the original labels, not on stored ids.
+        """
+        as_text = self.labels is not None or other.labels is not None
+        common, i, j = np.intersect1d(self.result_pids(as_text), other.result_pids(as_text), return_indices=True)
+        return {
+            "pid": common,
+            "waiting_delta": other.results["waiting"][j] - self.results["waiting"][i],
+            "turnaround_delta": other.results["turnaround"][j] - self.results["turnaround"][i],
+        }
+
+
+def _memmap(path, dtype, offset, count):
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def save(result, path, index_stride=4096):
+    """Write a core.engine ScheduleResult to path."""
+    with TraceWriter(path, result.policy, index_stride) as writer:
+        for pid, start, end in result.segments:
+            writer.segment(pid, start, end)
+        for pid, arrival, burst, completion in zip(result.pids, result.arrival, result.burst, result.completion):
+            if completion is not None:
+                writer.result(pid, arrival, burst, completion)
+
+
+def record_stream(events, path, policy="", index_stride=4096):
+    """Write the output of core.stream.stream_events() to path while passing it through.
+
+    Every segment is written, and a result record is added when a job finishes.
+    """
+    with TraceWriter(path, policy, index_stride) as writer:
+        for event in events:
+            job, start, end, finished, _ = event
+            writer.segment(job[0], start, end)
+            if finished:
+                writer.result(job[0], job[1], job[2], end)
+            yield event
+
+
+def open_trace(path):
+    return TraceReader(path)
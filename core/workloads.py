@@ -0,0 +1,63 @@
+import numpy as np
+
+# 可重現（固定 seed）的合成工作負載產生器
+# Every generator returns a list of (pid, arrival_time, burst_time) tuples
+# that core.engine accepts directly.
+
+
+def _jobs(arrival, burst):
+    return list(zip(range(len(arrival)), arrival.tolist(), burst.tolist()))
+
+
+def uniform(n, seed=0, mean_interarrival=5, burst_range=(1, 20)):
+    """Uniform inter-arrival gaps and uniform bursts."""
+    rng = np.random.default_rng(seed)
+    gaps = rng.integers(0, 2 * mean_interarrival + 1, n)
+    arrival = np.cumsum(gaps) - gaps[0]
+    burst = rng.integers(burst_range[0], burst_range[1] + 1, n)
+    return _jobs(arrival, burst)
+
+
+def poisson(n, seed=0, mean_interarrival=5, mean_burst=4):
+    """Poisson arrivals (exponential gaps) with exponential bursts."""
+    rng = np.random.default_rng(seed)
+    arrival = np.cumsum(np.rint(rng.exponential(mean_interarrival, n))).astype(np.int64)
+    arrival -= arrival[0] if n else 0
+    burst = np.maximum(1, np.rint(rng.exponential(mean_burst, n))).astype(np.int64)
+    return _jobs(arrival, burst)
+
+
+def heavy_tailed(n, seed=0, mean_interarrival=5, alpha=1.5, min_burst=1, max_burst=10_000):
+    """Poisson arrivals with Pareto bursts: mostly short jobs, a few huge ones."""
+    rng = np.random.default_rng(seed)
+    arrival = np.cumsum(np.rint(rng.exponential(mean_interarrival, n))).astype(np.int64)
+    arrival -= arrival[0] if n else 0
+    burst = np.minimum(max_burst, np.ceil(min_burst * (1 + rng.pareto(alpha, n)))).astype(np.int64)
+    return _jobs(arrival, burst)
+
+
+def bursty(n, seed=0, mean_interarrival=5, burst_size=50, mean_burst=4):
+    """Arrivals come in clumps of ~burst_size jobs separated by long quiet gaps."""
+    rng = np.random.default_rng(seed)
+    clump = rng.random(n) < 1 / burst_size
+    gaps = np.where(clump, rng.exponential(mean_interarrival * burst_size, n), rng.exponential(0.2, n))
+    arrival = np.cumsum(np.rint(gaps)).astype(np.int64)
+    arrival -= arrival[0] if n else 0
+    burst = np.maximum(1, np.rint(rng.exponential(mean_burst, n))).astype(np.int64)
+    return _jobs(arrival, burst)
+
+
+GENERATORS = {
+    "uniform": uniform,
+    "poisson": poisson,
+    "heavy_tailed": heavy_tailed,
+    "bursty": bursty,
+}
+
+
+def generate(name, n, seed=0, **options):
+    try:
+        make = GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown workload generator: {name}") from None
+    return make(n, seed=seed, **options)
@@ -1,12 +1,23 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 import random
 
+# 讓直接執行時也能找到專案根目錄的 core 套件
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from core import bursts
+from core.gantt import GanttRenderer
+from core.hardware import Disk, VirtualClock
+from core.pcb import ConsoleSink, PCBRegistry
+
 # 定義 Process 類別
 class Process:
-    def __init__(self, pid, arrival_time, burst_time):
+    def __init__(self, pid, arrival_time, burst_time, bursts=None):
         self.pid = pid
         self.arrival_time = arrival_time
         self.burst_time = burst_time
+        # CPU / I/O 交替的 burst 序列；沒給就是單一 CPU burst（不會被中斷）
+        self.bursts = bursts if bursts is not None else [burst_time]
         self.remaining_time = burst_time
         self.waiting_time = 0
         self.turnaround_time = 0
@@ -21,95 +32,79 @@ class Process:
 class Scheduler:
     def __init__(self, processes):
         self.processes = sorted(processes, key=lambda p: (p.arrival_time, p.burst_time))
-        self.time_counter = 0
         self.schedule = []
-        self.ready_queue = []
-        self.interrupted_processes = {"D", "G"}  # D 和 G 會被中斷
-        self.suspended_processes = set()  # 記錄已被中斷的行程
+        self.gantt = None  # 增量更新的甘特圖
+        # 每次狀態轉換印一行（interval=0、batch=1）；完整 PCB 用 self.pcb_log.pcb(pid) 查
+        self.pcb_log = PCBRegistry(capacity=1024, sinks=[ConsoleSink(interval=0, latest=1)], batch=1)
+
+    def simulate(self):
+        """Run SJF on the burst model: an I/O burst blocks the process on the printer
+        while others use the CPU, and its completion puts it back in the ready queue."""
+        clock = VirtualClock()
+        # 印表機：沒有延遲、每單位時間印 1MB，所以 ("printer", 3, "write") 佔 3 個時間單位
+        printer = Disk(clock, latency=0, read_speed=1, write_speed=1)
+        jobs = [(p.pid, p.arrival_time, p.bursts) for p in self.processes]
+        return bursts.simulate("SJF", jobs, clock=clock, devices={"printer": printer}, depth=1, record=True)
 
     def run_sjf(self):
+        result = self.simulate()
+        by_pid = {p.pid: p for p in self.processes}
+        # 甘特圖區段依結束時間播放：CPU 藍色、等 I/O 紅色
+        segments = sorted([(pid, start, end, 'blue') for pid, start, end, _ in result.cpu_segments] +
+                          [(pid, start, end, 'red') for pid, start, end, _ in result.io_segments],
+                          key=lambda segment: segment[2])
+        shown = 0
+        devices = {(pid, start): device for pid, start, _, device in result.io_segments}
+
         plt.ion()
         fig, ax = plt.subplots()
         fig.canvas.manager.set_window_title("SJF 執行過程")
 
-        while self.processes or self.ready_queue:
-            # 將到達的行程加入就緒隊列
-            while self.processes and self.processes[0].arrival_time <= self.time_counter:
-                self.ready_queue.append(self.processes.pop(0))
-                self.ready_queue.sort(key=lambda p: p.burst_time)
-            
-            if self.ready_queue:
-                process = self.ready_queue.pop(0)
+        for time, pid, state in result.transitions:
+            process = by_pid[pid]
+            process.state = state.capitalize()
+            if state == "running":
+                process.program_counter = random.randint(1000, 5000)
+            while shown < len(segments) and segments[shown][2] <= time:
+                self.schedule.append(segments[shown])
+                shown += 1
+            self.display_pcb(process, time)
+            if state == "waiting":
+                print(f"Process {pid} is waiting for I/O ({devices[pid, time]})... Moving to Waiting state.")
+            if state in ("running", "waiting", "terminated"):
                 self.update_gantt_chart(ax, self.schedule, process)
-                self.display_pcb(process)
                 plt.pause(1)
-                process.state = "Running"
-                process.program_counter = random.randint(1000, 5000)
-                process.waiting_time = self.time_counter - process.arrival_time
-                process.turnaround_time = process.waiting_time + process.burst_time
-                
-                # 如果是 D 或 G，則執行一部分後中斷
-                if process.pid in self.interrupted_processes and process.pid not in self.suspended_processes:
-                    interrupt_time = 2  # 模擬 2 單位時間的執行後中斷
-                    self.display_pcb(process)
-                    self.update_gantt_chart(ax, self.schedule, process)
-                    plt.pause(1)
-                    print(f"Process {process.pid} is INTERRUPTED (Printing a file)... Moving to Suspended state.")
-                    process.state = "Suspended"
-                    self.schedule.append((process.pid, self.time_counter, self.time_counter + interrupt_time, 'red'))
-                    self.display_pcb(process)
-                    self.update_gantt_chart(ax, self.schedule, process)
-                    plt.pause(2)
-                    process.remaining_time -= interrupt_time
-                    self.time_counter += interrupt_time
-                    process.state = "Ready"
-                    self.suspended_processes.add(process.pid)
-                    self.ready_queue.insert(0, process)  # 立即回到 ready queue 頂端
-                else:
-                    process.completion_time = self.time_counter + process.remaining_time
-                    self.schedule.append((process.pid, self.time_counter, process.completion_time, 'blue'))
-                    self.display_pcb(process)
-                    self.update_gantt_chart(ax, self.schedule, process)
-                    plt.pause(1)
-                    self.time_counter += process.remaining_time
-                    process.state = "Terminated"
-                    self.update_gantt_chart(ax, self.schedule, process)
-                    self.display_pcb(process)
-            else:
-                self.time_counter += 1
-        
+
+        for i, process in enumerate(result.pids):
+            p = by_pid[process]
+            p.completion_time = float(result.completion[i])
+            p.turnaround_time = p.completion_time - p.arrival_time
+            p.waiting_time = float(result.ready_time[i])
+        self.schedule.extend(segments[shown:])
+        self.update_gantt_chart(ax, self.schedule, self.processes[-1])
         plt.ioff()
         plt.show()
 
     def update_gantt_chart(self, ax, schedule, current_process):
-        ax.clear()
-        for pid, start, end, color in schedule:
-            ax.barh(pid, end - start, left=start, color=color)
-            ax.text((start + end) / 2, pid, pid, ha='center', va='center', color='white', fontsize=12, fontweight='bold')
-        
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Processes")
-        ax.set_title(f"Gantt Chart - SJF Execution (Current: {current_process.pid} : {current_process.state})")
-        plt.draw()
+        # 只加入新的區段，不再每一步 ax.clear() 重畫
+        if self.gantt is None or self.gantt.ax is not ax:
+            self.gantt = GanttRenderer(ax)
+        self.gantt.extend(schedule)
+        self.gantt.draw(f"Gantt Chart - SJF Execution (Current: {current_process.pid} : {current_process.state})")
 
-    def display_pcb(self, process):
-        print(f"\nPCB for Process {process.pid}: ")
-        print(f"  State: {process.state}")
-        print(f"  Process ID: {process.pid}")
-        print(f"  Program Counter: {process.program_counter}")
-        print(f"  Registers: {process.registers}")
-        print(f"  Memory Limit: {process.memory_limit}")
-        print(f"  Open Files: {process.open_files}")
+    def display_pcb(self, process, time=None):
+        # 狀態轉換記進 PCB 登錄表；暫存器等靜態欄位只在第一次登錄時存一份
+        self.pcb_log.record(process, time=time)
 
 # 測試行程資料
 processes = [
     Process("A", 0, 5),
     Process("B", 2, 7),
     Process("C", 5, 10),
-    Process("D", 7, 8),  # 會被中斷
+    Process("D", 7, 8, [2, ("printer", 3, "write"), 6]),  # 跑 2 單位後去印檔案
     Process("E", 8, 15),
     Process("F", 12, 25),
-    Process("G", 15, 12)  # 會被中斷
+    Process("G", 15, 12, [2, ("printer", 3, "write"), 10])  # 跑 2 單位後去印檔案
 ]
 
 # 執行 SJF 排程
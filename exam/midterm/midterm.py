@@ -1,3 +1,5 @@
+import multiprocessing
+import sys
 import fcfsPCB
 import interruptSJF
 import schedulingMethod
@@ -27,4 +29,9 @@ def main():
             print("無效輸入，預設返回選單...\n")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # pyinstaller 打包後 ProcessPoolExecutor 需要
+    if len(sys.argv) > 1 and sys.argv[1] == "sweep":
+        # 非互動模式: midterm.py sweep --policies RR --quanta 1 2 4 8 ...
+        from core import sweep
+        sys.exit(sweep.main(sys.argv[2:]))
     main()
@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['midterm.py'],
-    pathex=[],
+    pathex=['../..'],
     binaries=[],
     datas=[],
     hiddenimports=[],
@@ -1,7 +1,14 @@
+import os
+import sys
 import matplotlib.pyplot as plt
-from collections import deque
 import random
 
+# 讓 exam/midterm 底下直接執行時也能找到專案根目錄的 core 套件
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from core import engine, trace
+from core.gantt import GanttRenderer
+from core.process_table import ProcessTable
+
 # 定義 Process 類別
 class Process:
     def __init__(self, pid, arrival_time, burst_time):
@@ -25,152 +32,70 @@ class Scheduler:
         self.time_counter = 0
         self.schedule = []
         self.ready_queue = []
-
-    def run_fcfs(self):
+        self.result = None
+        self.table = None  # 最近一次排程的欄位式統計（ProcessTable）
+
+    def _apply(self, result, show):
+        # 等待/周轉時間在 ProcessTable 上一次算完，再寫回 Process 物件，保留原本的顯示流程
+        self.table = ProcessTable.from_processes(self.processes).apply(result)
+        columns = self.table.columns
+        for process, completion, waiting, turnaround in zip(
+            self.processes, columns["completion"].tolist(), columns["waiting"].tolist(), columns["turnaround"].tolist()
+        ):
+            process.remaining_time = 0
+            process.completion_time = completion
+            process.waiting_time = waiting
+            process.turnaround_time = turnaround
+        self.result = result
+        self.schedule = list(result.segments)
+        self.time_counter = result.makespan
+        if show:
+            self.display_avg_waiting_time(result.policy)
+            self.display_gantt_chart(result.policy)
+        return result
+
+    def run_fcfs(self, show=True):
         self.reset()
-        
-        # Ensure processes are sorted by arrival time before execution
         self.processes.sort(key=lambda p: p.arrival_time)
+        return self._apply(engine.fcfs(self.processes), show)
 
-        for process in self.processes:
-            # If CPU is idle, jump to the next process arrival time
-            if self.time_counter < process.arrival_time:
-                self.time_counter = process.arrival_time
-
-            # Calculate process metrics
-            process.waiting_time = self.time_counter - process.arrival_time
-            process.turnaround_time = process.waiting_time + process.burst_time
-            process.completion_time = self.time_counter + process.burst_time
+    def run_rr(self, quantum=3, show=True):
+        self.reset()
+        self.processes.sort(key=lambda p: p.arrival_time)
+        return self._apply(engine.round_robin(self.processes, quantum), show)
 
-            # Log scheduling data
-            self.schedule.append((process.pid, self.time_counter, process.completion_time))
+    def run_sjf(self, show=True):
+        self.reset()
+        self.processes.sort(key=lambda p: (p.arrival_time, p.burst_time))
+        return self._apply(engine.sjf(self.processes), show)
 
-            # Advance time counter
-            self.time_counter += process.burst_time
+    def run_srt(self, show=True):
+        self.reset()
+        self.processes.sort(key=lambda p: p.arrival_time)
+        return self._apply(engine.srtf(self.processes), show)
 
-        self.display_avg_waiting_time("FCFS")
-        self.display_gantt_chart("FCFS")
-        
-    def run_rr(self, quantum=3):
+    def run_mlfq(self, quanta=(2, 4, 8), boost=50, show=True):
         self.reset()
-        
-        # Ensure processes are sorted by arrival time initially
         self.processes.sort(key=lambda p: p.arrival_time)
-        
-        queue = deque()
-        index = 0  # To track the next arriving process
-        n = len(self.processes)
-        completed = 0
-
-        while completed < n:
-            # Add newly arrived processes to queue
-            while index < n and self.processes[index].arrival_time <= self.time_counter:
-                queue.append(self.processes[index])
-                index += 1
-
-            if queue:
-                process = queue.popleft()
-                execution_time = min(quantum, process.remaining_time)
-
-                # Schedule process execution
-                self.schedule.append((process.pid, self.time_counter, self.time_counter + execution_time))
-                self.time_counter += execution_time
-                process.remaining_time -= execution_time
-
-                # Add newly arrived processes after execution
-                while index < n and self.processes[index].arrival_time <= self.time_counter:
-                    queue.append(self.processes[index])
-                    index += 1
-
-                # If process is not finished, put it back in the queue
-                if process.remaining_time > 0:
-                    queue.append(process)
-                else:
-                    process.completion_time = self.time_counter
-                    process.turnaround_time = process.completion_time - process.arrival_time
-                    process.waiting_time = process.turnaround_time - process.burst_time
-                    completed += 1
-            else:
-                # If no process is ready, jump to the next process's arrival time
-                self.time_counter = self.processes[index].arrival_time
-
-        self.display_avg_waiting_time(f"RR (q={quantum})")
-        self.display_gantt_chart(f"RR (q={quantum})")
-        
-    def run_sjf(self):
+        return self._apply(engine.mlfq(self.processes, quanta, boost), show)
+
+    def run_cfs(self, nice=None, show=True):
         self.reset()
+        self.processes.sort(key=lambda p: p.arrival_time)
+        return self._apply(engine.cfs(self.processes, nice), show)
 
-        # Ensure processes are sorted by arrival time first
-        self.processes.sort(key=lambda p: (p.arrival_time, p.burst_time))
-        remaining_processes = self.processes[:]
-        self.ready_queue = []
-        total_waiting_time = 0
-        total_turnaround_time = 0
-        n = len(self.processes)
-
-        while remaining_processes or self.ready_queue:
-            # Move all processes that have arrived into the ready queue
-            while remaining_processes and remaining_processes[0].arrival_time <= self.time_counter:
-                self.ready_queue.append(remaining_processes.pop(0))
-
-            # Sort the ready queue by burst time (Shortest Job First)
-            self.ready_queue.sort(key=lambda p: p.burst_time)
-
-            if self.ready_queue:
-                # Pick the shortest job available
-                process = self.ready_queue.pop(0)
-                process.waiting_time = self.time_counter - process.arrival_time
-                process.turnaround_time = process.waiting_time + process.burst_time
-                process.completion_time = self.time_counter + process.burst_time
-
-                # Accumulate waiting time and turnaround time for averaging
-                total_waiting_time += process.waiting_time
-                total_turnaround_time += process.turnaround_time
-
-                # Schedule process execution
-                self.schedule.append((process.pid, self.time_counter, process.completion_time))
-                self.time_counter += process.burst_time
-            else:
-                # If no process is available, jump to the next arrival time
-                self.time_counter = remaining_processes[0].arrival_time
-
-        # Calculate and display average waiting time
-        avg_waiting_time = total_waiting_time / n
-        
-        print(f"SJF - Average Waiting Time: {avg_waiting_time:.2f}")
-        self.display_gantt_chart("SJF")
-
-    def run_srt(self):
+    def run_priority(self, priorities=None, aging=10, preemptive=False, show=True):
+        # priorities: {pid: 優先權}，數字越小越優先；沒給就用 process.priority（預設 0）
         self.reset()
-        completed = 0
-        remaining_processes = self.processes[:]
-
-        while completed < len(self.processes):
-            # 將已到達的行程加入 ready_queue
-            while remaining_processes and remaining_processes[0].arrival_time <= self.time_counter:
-                self.ready_queue.append(remaining_processes.pop(0))
-            
-            # 選擇剩餘時間最短的行程執行
-            if self.ready_queue:
-                self.ready_queue.sort(key=lambda p: p.remaining_time)
-                process = self.ready_queue[0]  # 選擇當前剩餘時間最短的行程
-                process.remaining_time -= 1
-                self.schedule.append((process.pid, self.time_counter, self.time_counter + 1))
-                self.time_counter += 1
-                
-                # 若行程執行完畢
-                if process.remaining_time == 0:
-                    process.completion_time = self.time_counter
-                    process.turnaround_time = process.completion_time - process.arrival_time
-                    process.waiting_time = process.turnaround_time - process.burst_time
-                    self.ready_queue.pop(0)  # 從 ready_queue 移除已完成的行程
-                    completed += 1
-            else:
-                self.time_counter += 1  # 若無行程可執行，時間前進
-
-        self.display_avg_waiting_time("SRTF")
-        self.display_gantt_chart("SRTF")
-        
+        self.processes.sort(key=lambda p: p.arrival_time)
+        return self._apply(engine.priority(self.processes, priorities, aging, preemptive), show)
+
+    def save_trace(self, path):
+        # 把最後一次排程結果存成二進位 trace，之後不用重跑就能分析/畫圖
+        if self.result is None:
+            raise ValueError("Run a scheduling method before saving its trace")
+        trace.save(self.result, path)
+
     def reset(self):
         self.time_counter = 0
         self.schedule = []
@@ -183,17 +108,14 @@ class Scheduler:
     def display_gantt_chart(self, title):
         fig, ax = plt.subplots()
         fig.canvas.manager.set_window_title(title)
-        for pid, start, end in self.schedule:
-            ax.barh(pid, end - start, left=start)
-            ax.text((start + end) / 2, pid, pid, ha='center', va='center', color='white', fontsize=12, fontweight='bold')
-        plt.xlabel("Time")
-        plt.ylabel("Processes")
-        plt.title(f"Gantt Chart - {title}")
+        renderer = GanttRenderer(ax)
+        renderer.extend(self.schedule)
+        renderer.draw(f"Gantt Chart - {title}")
         plt.show()
 
     def display_avg_waiting_time(self, title):
         self.processes.sort(key=lambda p: p.pid)  # Ensure ordering before computing
-        avg_waiting_time = sum(p.waiting_time for p in self.processes) / len(self.processes)
+        avg_waiting_time = self.table.avg_waiting_time()
         print(f"{title} - Average Waiting Time: {avg_waiting_time:.2f}")
 
 
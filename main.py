@@ -1,6 +1,9 @@
 import pygame
 from consts import *
-from core import *
+from apps.task_manager import TaskManager
+from core.kernel import ProcessSimulation, SimulationThread
+from utils.desktop import Desktop
+
 # Initialize Pygame
 pygame.init()
 
@@ -9,15 +12,27 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_icon(pygame.image.load("resources/osIcon.png"))
 pygame.display.set_caption("Teri's Simulated Operating System")
 
-font = pygame.font.Font(None, 30)
+# 模擬在背景執行緒跑，桌面迴圈只讀它發佈的快照
+simulation = SimulationThread(ProcessSimulation(processes=100_000))
+simulation.start()
+
+desktop = Desktop(screen, simulation)
+
 
-running = True
-while running:
-    screen.fill((0, 0, 0))
-    pygame.display.flip()
+def open_task_manager():
+    # 已經開著就不重複開
+    if not any(isinstance(window, TaskManager) for window in desktop.windows):
+        task_manager = TaskManager()
+        task_manager.set_process_manager(simulation)
+        desktop.open(task_manager)
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
 
-pygame.quit()
+desktop.taskbar.add_button("Task Manager", open_task_manager)
+open_task_manager()
+try:
+    desktop.run()
+finally:
+    for window in list(desktop.windows):
+        desktop.close(window)
+    simulation.stop()
+    pygame.quit()
@@ -1,117 +1,86 @@
+import argparse
+import os
+import sys
 import time
-import threading
-import random
-from consts import *
-
-class CPU:
-    def __init__(self, cores, threads, clock_speed):
-        self.cores = cores
-        self.threads = threads
-        self.clock_speed = clock_speed  # GHz
-        self.utilization = [0] * cores  # Track CPU usage per core
-
-    def execute_task(self, process_name, cycles_required):
-        """Simulate execution of a process based on CPU speed."""
-        cycles_per_second = self.clock_speed * 1_000_000_000
-        execution_time = cycles_required / cycles_per_second
-        core = random.randint(0, self.cores - 1)  # Assign a random core
-        self.utilization[core] += 10  # Simulating CPU load
-        
-        print(f"Executing {process_name} on Core {core} ({cycles_required} cycles). ETA: {execution_time:.4f}s")
-        time.sleep(execution_time)
-        self.utilization[core] -= 10  # Free up CPU after execution
-
-    def get_usage(self):
-        return self.utilization
-
-# Initialize CPU
-cpu = CPU(CPU_CORES, CPU_THREADS, CPU_CLOCK)
-cpu.execute_task("Task_A", 2_000_000_000)  # Task requiring 2 billion cycles
-
-class RAM:
-    def __init__(self, size_gb):
-        self.total_memory = size_gb * 1024  # Convert GB to MB
-        self.used_memory = 0
-        self.memory_map = {}  # {pid: memory_allocated}
-
-    def allocate(self, pid, size_mb):
-        if self.used_memory + size_mb > self.total_memory:
-            print(f"Memory Allocation Failed: Not enough RAM for PID {pid}")
-            return False
-        self.memory_map[pid] = size_mb
-        self.used_memory += size_mb
-        print(f"Allocated {size_mb}MB to Process {pid}.")
-        return True
-
-    def deallocate(self, pid):
-        if pid in self.memory_map:
-            size_mb = self.memory_map.pop(pid)
-            self.used_memory -= size_mb
-            print(f"Deallocated {size_mb}MB from Process {pid}.")
-            return True
-        return False
-
-    def get_usage(self):
-        return self.used_memory, self.total_memory
 
-# Initialize RAM
-ram = RAM(RAM_CAP)
-ram.allocate(1, 512)  # Allocate 512MB to process 1
-ram.allocate(2, 1024) # Allocate 1GB to process 2
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-class Disk:
-    def __init__(self, size_gb, read_speed, write_speed, latency):
-        self.total_storage = size_gb * 1024  # Convert GB to MB
-        self.used_storage = 0
-        self.read_speed = read_speed
-        self.write_speed = write_speed
-        self.latency = latency
-        self.files = {}  # Simulated file system
-
-    def write(self, filename, size_mb):
-        if self.used_storage + size_mb > self.total_storage:
-            print(f"Disk Full: Cannot write {filename}")
-            return False
-        self.files[filename] = size_mb
-        self.used_storage += size_mb
-        write_time = size_mb / self.write_speed + (self.latency / 1000)
-        print(f"Writing {filename}... Time: {write_time:.2f}s")
-        time.sleep(write_time)
-        return True
-
-    def read(self, filename):
-        if filename not in self.files:
-            print("File Not Found!")
-            return False
-        size_mb = self.files[filename]
-        read_time = size_mb / self.read_speed + (self.latency / 1000)
-        print(f"Reading {filename}... Time: {read_time:.2f}s")
-        time.sleep(read_time)
-        return True
-
-    def delete(self, filename):
-        if filename in self.files:
-            self.used_storage -= self.files[filename]
-            del self.files[filename]
-            print(f"Deleted {filename}.")
-            return True
-        return False
-
-# Initialize SSD
-disk = Disk(SSD, SSD_READ_SPEED, SSD_WRITE_SPEED, DISK_LATENCY)
-disk.write("game.iso", 1024)  # Write 1GB file
-disk.read("game.iso")  # Read file
-
-class Network:
-    def __init__(self, bandwidth, latency):
-        self.bandwidth = bandwidth  # Mbps
-        self.latency = latency  # ms
-
-    def download(self, file_size_mb):
-        download_time = (file_size_mb * 8) / self.bandwidth  # Convert MB to Mb
-        download_time += self.latency / 1000  # Convert ms to seconds
-        print(f"Downloading {file_size_mb}MB... ETA: {download_time:.2f}s")
-        time.sleep(download_time)
-
-network = Network(NETWORK_BANDWIDTH, NETWORK_LATENCY)
-network.download(500)  # Simulate downloading a 500MB file
+from consts import *
+from core.hardware import CPU, RAM, Disk, Network, VirtualClock
+from core.network import Cluster, Topology
+
+# 硬體模型的 demo：CPU / RAM / Disk / Network 都在 core.hardware，共用一個虛擬時鐘，
+# import 這個檔案不會再執行任何東西。
+# Usage:
+#   python other/hardwareTest.py                      # 立刻算完，印出虛擬時間
+#   python other/hardwareTest.py --realtime --speed 4  # 以 4 倍速實際播放
+#   python other/hardwareTest.py --stress 10000       # 一萬個同時進行的讀寫 / 下載
+#   python other/hardwareTest.py --cluster 8          # 8 台節點同時從 node0 下載，分享 node0 的頻寬
+
+
+def demo(clock):
+    cpu = CPU(clock, CPU_CORES, CPU_THREADS, CPU_CLOCK, verbose=True)
+    ram = RAM(RAM_CAP, verbose=True)
+    disk = Disk(clock, SSD, SSD_READ_SPEED, SSD_WRITE_SPEED, DISK_LATENCY, verbose=True)
+    network = Network(clock, NETWORK_BANDWIDTH, NETWORK_LATENCY, verbose=True)
+
+    def report(op):
+        print(f"[{clock.now:.4f}s] {op.kind} {op.name} done in {op.duration:.4f}s")
+
+    cpu.execute_task("Task_A", 2_000_000_000).then(report)  # Task requiring 2 billion cycles
+    ram.allocate(1, 512)  # Allocate 512MB to process 1
+    ram.allocate(2, 1024)  # Allocate 1GB to process 2
+    # 先寫完再讀；讀的同時有另一個寫入在搶磁碟頻寬
+    disk.write("game.iso", 1024).then(report).then(lambda _: disk.read("game.iso").then(report))
+    clock.schedule(3.0, lambda: disk.write("save.dat", 256).then(report))
+    network.download(500).then(report)  # Simulate downloading a 500MB file
+    clock.run()
+    print(f"Finished at {clock.now:.4f}s virtual time; CPU usage per core: "
+          f"{[f'{u:.1f}%' for u in cpu.get_usage()]}, RAM used: {ram.get_usage()[0]}MB, "
+          f"disk busy {disk.utilization():.1%}, network busy {network.utilization():.1%}")
+
+
+def stress(clock, count):
+    cpu = CPU(clock)
+    disk = Disk(clock)
+    network = Network(clock)
+    for i in range(count):
+        disk.write(f"file_{i}", 1)
+        network.download(1)
+        cpu.execute_task(f"Task_{i}", 10_000_000)
+    start = time.perf_counter()
+    clock.run()
+    print(f"{3 * count} operations, {clock.processed} events: {clock.now:.2f}s virtual time "
+          f"in {time.perf_counter() - start:.3f}s real time")
+
+
+def cluster(clock, nodes):
+    # 每台節點有自己的 CPU / RAM / Disk；傳輸走 core.network 的 max-min 公平分享
+    machines = Cluster(Topology.star(nodes, NETWORK_BANDWIDTH), clock=clock)
+    alone = 500 * 8 / NETWORK_BANDWIDTH + NETWORK_LATENCY / 1000
+
+    def report(op):
+        print(f"[{clock.now:.4f}s] {op.name} done in {op.duration:.2f}s (alone: {alone:.2f}s)")
+
+    for i in range(1, nodes):
+        machines.transfer("node0", f"node{i}", 500, name=f"node0 -> node{i} 500MB").then(report)
+    machines.run()
+    busiest = max(machines.network.utilization().items(), key=lambda item: item[1])
+    print(f"Finished at {clock.now:.4f}s virtual time; busiest link {busiest[0][0]} -> {busiest[0][1]} "
+          f"at {busiest[1]:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hardware model demo on a virtual clock.")
+    parser.add_argument("--realtime", action="store_true", help="pace the virtual clock against the wall clock")
+    parser.add_argument("--speed", type=float, default=1.0, help="virtual seconds per real second in --realtime")
+    parser.add_argument("--stress", type=int, metavar="N", help="simulate N concurrent disk/network/CPU operations")
+    parser.add_argument("--cluster", type=int, metavar="N", help="N nodes downloading from node0 at the same time")
+    args = parser.parse_args()
+    clock = VirtualClock(realtime=args.realtime, speed=args.speed)
+    if args.stress:
+        stress(clock, args.stress)
+    elif args.cluster:
+        cluster(clock, args.cluster)
+    else:
+        demo(clock)
@@ -1,8 +1,15 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 from collections import deque
 import random
 import time
 
+# 讓直接執行時也能找到專案根目錄的 core 套件
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.gantt import GanttRenderer
+from core.pcb import ConsoleSink, PCBRegistry
+
 # 定義 Process 類別，代表一個行程
 class Process:
     def __init__(self, pid, arrival_time, burst_time):
@@ -23,6 +30,9 @@ class Process:
 class Scheduler:
     def __init__(self, processes):
         self.processes = sorted(processes, key=lambda p: p.arrival_time)  # 依到達時間排序
+        self.gantt = None  # 增量更新的甘特圖
+        # 每次狀態轉換印一行（interval=0、batch=1）；完整 PCB 用 self.pcb_log.pcb(pid) 查
+        self.pcb_log = PCBRegistry(capacity=1024, sinks=[ConsoleSink(interval=0, latest=1)], batch=1)
 
     def run_fcfs(self):
         time_counter = 0
@@ -42,35 +52,27 @@ class Scheduler:
             process.completion_time = time_counter + process.burst_time
             schedule.append((process.pid, time_counter, process.completion_time))
             
-            self.display_pcb(process)
+            self.display_pcb(process, time_counter)
             self.update_gantt_chart(ax, schedule)
             plt.pause(1)  # 暫停 1 秒來模擬執行過程
             
             time_counter += process.burst_time  # 更新當前時間
             process.state = "Terminated"
-            self.display_pcb(process)
+            self.display_pcb(process, time_counter)
         
         plt.ioff()
         plt.show()
 
     def update_gantt_chart(self, ax, schedule):
-        ax.clear()
-        for pid, start, end in schedule:
-            ax.barh(pid, end - start, left=start, color='blue')
-            ax.text((start + end) / 2, pid, pid, ha='center', va='center', color='white', fontsize=12, fontweight='bold')
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Processes")
-        ax.set_title("Gantt Chart - Execution in Progress")
-        plt.draw()
+        # 只加入新的區段，不再每一步 ax.clear() 重畫
+        if self.gantt is None or self.gantt.ax is not ax:
+            self.gantt = GanttRenderer(ax)
+        self.gantt.extend(schedule, color='blue')
+        self.gantt.draw("Gantt Chart - Execution in Progress")
 
-    def display_pcb(self, process):
-        print(f"\nPCB for Process {process.pid}: ")
-        print(f"  State: {process.state}")
-        print(f"  Process ID: {process.pid}")
-        print(f"  Program Counter: {process.program_counter}")
-        print(f"  Registers: {process.registers}")
-        print(f"  Memory Limit: {process.memory_limit}")
-        print(f"  Open Files: {process.open_files}")
+    def display_pcb(self, process, time=None):
+        # 狀態轉換記進 PCB 登錄表；暫存器等靜態欄位只在第一次登錄時存一份
+        self.pcb_log.record(process, time=time)
 
 # 測試行程資料
 processes = [
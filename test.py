@@ -1,6 +1,7 @@
-import time
-import threading
 import random
+import time
+
+from core.runtime import Runtime
 
 class Process:
     def __init__(self, pid, interactive=False):
@@ -12,26 +13,32 @@ class Process:
         self.burst_time = random.randint(2, 5) if not interactive else None  # Fixed burst time for non-interactive
         self.interactive = interactive  # True for long-running interactive processes
 
-    def run(self):
-        self.state = "Running"
-        self.start_time = time.time()
-        if self.interactive:
-            print(f"Process {self.pid} (Interactive) started and running indefinitely... Press Ctrl+C to stop.")
-            while True:
-                time.sleep(1)  # Simulating waiting for user input or events
-        else:
-            print(f"Process {self.pid} started. Running for {self.burst_time} seconds...")
-            time.sleep(self.burst_time)  # Simulate process execution time
-            self.completion_time = time.time()
-            self.state = "Terminated"
-            print(f"Process {self.pid} completed in {self.completion_time - self.start_time:.2f} seconds.")
-
-# Simulating two types of processes
-short_process = Process(1)  # Normal finite burst process
-interactive_process = Process(2, interactive=True)  # Infinite process like Word
-
-# Running short process in a thread
-threading.Thread(target=short_process.run).start()
-
-# Running interactive process (Simulates Word-like application)
-threading.Thread(target=interactive_process.run).start()
+
+def word(process, token):
+    # 互動式行程（像 Word）：等事件直到被取消；每個 yield 都是可以被切換或關閉的點
+    print(f"Process {process.pid} (Interactive) started; it stops when the runtime shuts down.")
+    while not token.cancelled:
+        token.sleep(0.5)  # Simulating waiting for user input or events
+        yield
+    print(f"Process {process.pid} (Interactive) closed.")
+
+
+def main():
+    # Simulating two types of processes
+    short_process = Process(1)  # Normal finite burst process
+    interactive_process = Process(2, interactive=True)  # Infinite process like Word
+
+    runtime = Runtime(workers=2, policy="RR", quantum=0.2)
+    print(f"Process {short_process.pid} started. Running for {short_process.burst_time} seconds...")
+    runtime.submit(short_process)
+    runtime.submit(interactive_process, word)
+
+    runtime.join()  # 等有限的行程做完
+    print(f"Process {short_process.pid} completed in {short_process.completion_time - short_process.start_time:.2f} seconds.")
+    runtime.shutdown(timeout=2)  # 取消互動式行程，worker 全部結束後才離開
+    for key, value in runtime.report().summary().items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
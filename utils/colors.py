@@ -0,0 +1,18 @@
+# 桌面 / 視窗共用的顏色（RGB）
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+DESKTOP = (24, 40, 64)
+TASKBAR = (32, 32, 36)
+TASKBAR_TEXT = (220, 220, 220)
+WINDOW = (240, 240, 240)
+WINDOW_BORDER = (90, 90, 100)
+TITLE_BAR = (60, 90, 150)
+TITLE_TEXT = (255, 255, 255)
+CLOSE = (200, 60, 60)
+TEXT = (20, 20, 20)
+ROW_ALT = (228, 232, 240)
+SELECTED = (180, 205, 245)
+HEADER = (210, 214, 222)
+GREEN = (70, 170, 90)
+YELLOW = (220, 180, 40)
+RED = (210, 70, 60)
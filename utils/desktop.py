@@ -0,0 +1,239 @@
+import time
+
+import pygame
+
+from consts import HEIGHT, TASKBAR_HEIGHT, WIDTH
+from utils import colors
+
+# 桌面 shell：事件迴圈只重畫「髒」的矩形（pygame.display.update(rects)），
+# 沒有輸入也沒有新快照時用 pygame.event.wait(timeout) 睡著，閒置時幾乎不吃 CPU。
+# 模擬跑在 core.kernel.SimulationThread，這裡只讀它的 buffer.front。
+
+TITLE_HEIGHT = 28
+
+
+class Window:
+    """Draggable window; apps subclass it and override draw_content / handle_content_event."""
+
+    def __init__(self, title, x, y, width, height):
+        self.title = title
+        self.rect = pygame.Rect(x, y, width, height)
+        self.close_rect = pygame.Rect(0, 0, TITLE_HEIGHT - 8, TITLE_HEIGHT - 8)
+        self.dragging = False
+        self.offset_x = 0
+        self.offset_y = 0
+        self.dirty = True
+        self.font = None
+
+    @property
+    def content_rect(self):
+        return pygame.Rect(self.rect.x + 1, self.rect.y + TITLE_HEIGHT, self.rect.width - 2,
+                           self.rect.height - TITLE_HEIGHT - 1)
+
+    def update(self, snapshot, version):
+        """Called once per frame with the latest simulation snapshot; set self.dirty to redraw."""
+
+    def draw(self, surface):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+        pygame.draw.rect(surface, colors.WINDOW, self.rect)
+        pygame.draw.rect(surface, colors.WINDOW_BORDER, self.rect, 1)
+        title = pygame.Rect(self.rect.x, self.rect.y, self.rect.width, TITLE_HEIGHT)
+        pygame.draw.rect(surface, colors.TITLE_BAR, title)
+        surface.blit(self.font.render(self.title, True, colors.TITLE_TEXT), (title.x + 8, title.y + 7))
+        self.close_rect.topright = (title.right - 4, title.y + 4)
+        pygame.draw.rect(surface, colors.CLOSE, self.close_rect)
+        surface.blit(self.font.render("X", True, colors.TITLE_TEXT), (self.close_rect.x + 6, self.close_rect.y + 3))
+        clip = surface.get_clip()
+        surface.set_clip(self.content_rect.clip(clip) if clip else self.content_rect)
+        self.draw_content(surface, self.content_rect)
+        surface.set_clip(clip)
+
+    def draw_content(self, surface, rect):
+        pass
+
+    def handle_event(self, event):
+        """Handles dragging and closing; returns "close", True if handled, or None."""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.close_rect.collidepoint(event.pos):
+                return "close"
+            if self.rect.collidepoint(event.pos) and event.pos[1] < self.rect.y + TITLE_HEIGHT:
+                self.dragging = True
+                self.offset_x = self.rect.x - event.pos[0]
+                self.offset_y = self.rect.y - event.pos[1]
+                return True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.dragging:
+            self.dragging = False
+            return True
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.rect.x = min(max(event.pos[0] + self.offset_x, -self.rect.width + 60), WIDTH - 60)
+            self.rect.y = min(max(event.pos[1] + self.offset_y, 0), HEIGHT - TASKBAR_HEIGHT - TITLE_HEIGHT)
+            return True
+        return self.handle_content_event(event)
+
+    def handle_content_event(self, event):
+        return None
+
+    def close(self):
+        """Called when the window is closed; release threads or snapshots here."""
+
+
+class Taskbar:
+    def __init__(self):
+        self.rect = pygame.Rect(0, HEIGHT - TASKBAR_HEIGHT, WIDTH, TASKBAR_HEIGHT)
+        self.font = pygame.font.Font(None, 26)
+        self.text = None
+        self.dirty = True
+        self.buttons = []  # [(label, callback, rect)]
+
+    def add_button(self, label, callback):
+        x = self.buttons[-1][2].right + 8 if self.buttons else 8
+        width = self.font.size(label)[0] + 20
+        self.buttons.append((label, callback, pygame.Rect(x, self.rect.y + 8, width, self.rect.height - 16)))
+        self.dirty = True
+
+    def click(self, pos):
+        for _, callback, rect in self.buttons:
+            if rect.collidepoint(pos):
+                callback()
+                return True
+        return False
+
+    def update(self, snapshot, frame_ms):
+        # 文字沒變就不重畫；CPU / RAM 取到整數百分比，時鐘到秒
+        text = time.strftime("%H:%M:%S")
+        if snapshot is not None:
+            cpu = snapshot["cpu"]
+            cpu = sum(cpu) / len(cpu) if cpu else 0.0
+            text = (f"sim {snapshot['time']:8.1f}s   CPU {cpu:3.0f}%   "
+                    f"RAM {snapshot['ram_used']:.0f}/{snapshot['ram_total']:.0f}MB   {text}")
+        if text != self.text:
+            self.text = text
+            self.dirty = True
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, colors.TASKBAR, self.rect)
+        for label, _, rect in self.buttons:
+            pygame.draw.rect(surface, colors.TITLE_BAR, rect)
+            text = self.font.render(label, True, colors.TITLE_TEXT)
+            surface.blit(text, (rect.x + 10, rect.y + (rect.height - text.get_height()) // 2))
+        label = self.font.render(self.text or "", True, colors.TASKBAR_TEXT)
+        surface.blit(label, (self.rect.right - label.get_width() - 16, self.rect.y + (self.rect.height - label.get_height()) // 2))
+
+
+class Desktop:
+    """Frame loop: events -> snapshot -> redraw dirty rects -> sleep.
+
+    fps caps the frame rate while something changes (dragging, new
+    snapshots); with nothing to do the loop blocks in pygame.event.wait for
+    up to idle_ms, so an idle desktop wakes a few times per second at most.
+    """
+
+    def __init__(self, screen, simulation=None, fps=60, idle_ms=250):
+        self.screen = screen
+        self.simulation = simulation
+        self.fps = fps
+        self.idle_ms = idle_ms
+        self.clock = pygame.time.Clock()
+        self.taskbar = Taskbar()
+        self.windows = []  # 最後一個在最上層
+        self.damage = [screen.get_rect()]  # 這一幀要重畫的區域
+        self.version = -1
+        self.running = False
+        self.frame_ms = 0.0
+
+    def open(self, window):
+        self.windows.append(window)
+        self.damage.append(window.rect.copy())
+        return window
+
+    def close(self, window):
+        self.windows.remove(window)
+        window.close()
+        self.damage.append(window.rect.copy())
+
+    def _dispatch(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.taskbar.rect.collidepoint(event.pos):
+            self.taskbar.click(event.pos)
+            return
+        for window in reversed(self.windows):
+            before = window.rect.copy()
+            result = window.handle_event(event)
+            if result == "close":
+                self.close(window)
+                return
+            if result:
+                if window is not self.windows[-1]:  # 點到的視窗移到最上層
+                    self.windows.remove(window)
+                    self.windows.append(window)
+                    window.dirty = True
+                if window.rect != before:
+                    self.damage.append(before)
+                    window.dirty = True
+                return
+            if event.type == pygame.MOUSEBUTTONDOWN and window.rect.collidepoint(event.pos):
+                return  # 點在視窗內但視窗沒處理：不要傳給下面的視窗
+
+    def _events(self):
+        busy = bool(self.damage) or any(w.dirty or w.dragging for w in self.windows)
+        if busy:
+            events = pygame.event.get()
+        else:
+            first = pygame.event.wait(self.idle_ms)  # 閒置：睡到有事件或 idle_ms
+            events = [first] if first.type != pygame.NOEVENT else []
+            events.extend(pygame.event.get())
+        return events
+
+    def frame(self):
+        for event in self._events():
+            if event.type == pygame.QUIT:
+                self.running = False
+                return
+            self._dispatch(event)
+
+        snapshot = None
+        version = self.version
+        if self.simulation is not None:
+            snapshot = self.simulation.buffer.front
+            version = self.simulation.buffer.version
+        self.taskbar.update(snapshot, self.frame_ms)
+        for window in self.windows:
+            window.update(snapshot, version)
+        self.version = version
+
+        if self.taskbar.dirty:
+            self.damage.append(self.taskbar.rect)
+        for window in self.windows:
+            if window.dirty:
+                self.damage.append(window.rect.copy())
+        if not self.damage:
+            return
+        self._redraw(self.damage)
+        self.damage = []
+        self.taskbar.dirty = False
+        for window in self.windows:
+            window.dirty = False
+
+    def _redraw(self, damage):
+        screen = self.screen
+        area = screen.get_rect()
+        rects = [rect.clip(area) for rect in damage]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        start = time.perf_counter()
+        for rect in rects:
+            screen.set_clip(rect)
+            screen.fill(colors.DESKTOP, rect)
+            for window in self.windows:
+                if window.rect.colliderect(rect):
+                    window.draw(screen)
+            if self.taskbar.rect.colliderect(rect):
+                self.taskbar.draw(screen)
+        screen.set_clip(None)
+        pygame.display.update(rects)
+        self.frame_ms = (time.perf_counter() - start) * 1000
+
+    def run(self):
+        self.running = True
+        while self.running:
+            self.frame()
+            self.clock.tick(self.fps)